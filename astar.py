@@ -1,29 +1,45 @@
 import heapq
+import time
+from array import array
+
+from instrument import SolveResult
+from maze import MAX_COST
 
 def heuristic(a, b):
     """Calculates the Manhattan distance between two points."""
     return abs(a[0] - b[0]) + abs(a[1] - b[1])
 
-def astar_animated(graph, start, end):
+def astar_animated(graph, start, end, result=None):
     """ 
     A* algorithm implementation that yields each visited node to visualize the process.
+
+    If `result`, a `SolveResult`, is given, it is filled in with the counters
+    of `astar_instrumented` once the search ends. Its timings only count time
+    spent searching, not the pauses between frames.
     """
+    resumed = time.perf_counter()
+    searching = 0.0
     frontier = [(0, start)]
     came_from = {start: None}
     cost_so_far = {start: 0}
+    visited = set()
+    heap_pushes, heap_pops, stale_pops, peak_frontier = 1, 0, 0, 1
+    found = False
 
     while frontier:
-        _, current = heapq.heappop(frontier)
+        priority, current = heapq.heappop(frontier)
+        heap_pops += 1
+        if priority > cost_so_far[current] + heuristic(current, end):
+            stale_pops += 1
+        visited.add(current)
 
         if current == end:
-            path = []
-            while current is not None:
-                path.append(current)
-                current = came_from[current]
-            yield path[::-1] # Yield the final path
-            return
+            found = True
+            break
 
+        searching += time.perf_counter() - resumed
         yield current # Yield the current node being processed
+        resumed = time.perf_counter()
 
         for neighbor in graph[current]:
             new_cost = cost_so_far[current] + 1 # Assuming cost of 1 for each step
@@ -31,9 +47,26 @@ def astar_animated(graph, start, end):
                 cost_so_far[neighbor] = new_cost
                 priority = new_cost + heuristic(neighbor, end)
                 heapq.heappush(frontier, (priority, neighbor))
+                heap_pushes += 1
                 came_from[neighbor] = current
+        if len(frontier) > peak_frontier:
+            peak_frontier = len(frontier)
 
-    yield [] # No path found
+    path_started = time.perf_counter()
+    path = []
+    if found:
+        current = end
+        while current is not None:
+            path.append(current)
+            current = came_from[current]
+        path.reverse()
+    if result is not None:
+        result.path, result.visited = path, visited
+        result.heap_pushes, result.heap_pops = heap_pushes, heap_pops
+        result.stale_pops, result.peak_frontier = stale_pops, peak_frontier
+        result.timings = {'search': searching + path_started - resumed,
+                          'path': time.perf_counter() - path_started}
+    yield path # Yield the final path, empty if there is none
 
 def astar(graph, start, end):
     """
@@ -67,3 +100,194 @@ def astar(graph, start, end):
                 came_from[neighbor] = current
 
     return [], visited
+
+def astar_csr(offsets, targets, width, start, end):
+    """
+    A* over a compressed sparse row graph, as returned by `Maze.to_csr`.
+    Nodes are integers numbered `x + y * width`; the Manhattan heuristic is
+    computed from them directly.
+
+    Returns:
+        (list, set): The final path and the set of visited nodes, as integers.
+    """
+    n_nodes = len(offsets) - 1
+    end_x, end_y = end % width, end // width
+    cost_so_far = array('i', [-1]) * n_nodes
+    came_from = array(offsets.typecode, [-1]) * n_nodes
+    cost_so_far[start] = 0
+    frontier = [(0, start)]
+    visited = set()
+
+    while frontier:
+        _, current = heapq.heappop(frontier)
+        visited.add(current)
+
+        if current == end:
+            path = []
+            while current != -1:
+                path.append(current)
+                current = came_from[current]
+            return path[::-1], visited
+
+        new_cost = cost_so_far[current] + 1
+        for i in range(offsets[current], offsets[current + 1]):
+            neighbor = targets[i]
+            old_cost = cost_so_far[neighbor]
+            if old_cost == -1 or new_cost < old_cost:
+                cost_so_far[neighbor] = new_cost
+                priority = (new_cost + abs(neighbor % width - end_x)
+                            + abs(neighbor // width - end_y))
+                heapq.heappush(frontier, (priority, neighbor))
+                came_from[neighbor] = current
+
+    return [], visited
+
+def astar_instrumented(graph, start, end, on_expand=None):
+    """
+    Same search as `astar`, counting heap traffic and timing each phase.
+    Kept separate so the plain solver pays nothing for it. A pop is stale
+    when its node was pushed again since with a lower cost.
+
+    Args:
+        on_expand (callable): Optional hook called as
+            `on_expand(node, cost, frontier_size)` for each expanded node.
+
+    Returns:
+        SolveResult: Unpacks as `(path, visited)`.
+    """
+    search_started = time.perf_counter()
+    frontier = [(0, start)]
+    came_from = {start: None}
+    cost_so_far = {start: 0}
+    visited = set()
+    heap_pushes, heap_pops, stale_pops, peak_frontier = 1, 0, 0, 1
+    found = False
+
+    while frontier:
+        priority, current = heapq.heappop(frontier)
+        heap_pops += 1
+        if priority > cost_so_far[current] + heuristic(current, end):
+            stale_pops += 1
+        visited.add(current)
+        if on_expand is not None:
+            on_expand(current, cost_so_far[current], len(frontier))
+
+        if current == end:
+            found = True
+            break
+
+        for neighbor in graph[current]:
+            new_cost = cost_so_far[current] + 1
+            if neighbor not in cost_so_far or new_cost < cost_so_far[neighbor]:
+                cost_so_far[neighbor] = new_cost
+                priority = new_cost + heuristic(neighbor, end)
+                heapq.heappush(frontier, (priority, neighbor))
+                heap_pushes += 1
+                came_from[neighbor] = current
+        if len(frontier) > peak_frontier:
+            peak_frontier = len(frontier)
+
+    path_started = time.perf_counter()
+    path = []
+    if found:
+        current = end
+        while current is not None:
+            path.append(current)
+            current = came_from[current]
+        path.reverse()
+    finished = time.perf_counter()
+
+    return SolveResult(path, visited, heap_pushes, heap_pops, stale_pops, peak_frontier,
+                       {'search': path_started - search_started,
+                        'path': finished - path_started})
+
+def astar_weighted(graph, start, end, min_cost=1):
+    """
+    A* on a weighted adjacency list, as returned by `Maze.to_weighted_graph`,
+    using a binary heap. The Manhattan distance scaled by `min_cost`, the
+    cheapest step, stays admissible.
+
+    Returns:
+        (list, set): A tuple containing the final path and the set of all visited nodes.
+    """
+    frontier = [(0, start)]
+    came_from = {start: None}
+    cost_so_far = {start: 0}
+    visited = set()
+
+    while frontier:
+        _, current = heapq.heappop(frontier)
+        if current in visited:
+            continue
+        visited.add(current)
+
+        if current == end:
+            path = []
+            while current is not None:
+                path.append(current)
+                current = came_from[current]
+            return path[::-1], visited
+
+        for neighbor, cost in graph[current]:
+            new_cost = cost_so_far[current] + cost
+            if neighbor not in cost_so_far or new_cost < cost_so_far[neighbor]:
+                cost_so_far[neighbor] = new_cost
+                priority = new_cost + min_cost * heuristic(neighbor, end)
+                heapq.heappush(frontier, (priority, neighbor))
+                came_from[neighbor] = current
+
+    return [], visited
+
+def dial_astar(graph, start, end, max_cost=MAX_COST, min_cost=1):
+    """
+    A* with a bucket queue, for weighted graphs whose costs are integers from
+    `min_cost` to `max_cost`.
+
+    The heuristic is consistent, so priorities never decrease and a step
+    raises them by at most `max_cost + min_cost`; a ring of that many buckets
+    plus one replaces the heap. Raises ValueError on a cost outside that
+    range.
+
+    Returns:
+        (list, set): A tuple containing the final path and the set of all visited nodes.
+    """
+    n_buckets = max_cost + min_cost + 1
+    buckets = [[] for _ in range(n_buckets)]
+    priority = min_cost * heuristic(start, end)
+    buckets[priority % n_buckets].append(start)
+    came_from = {start: None}
+    cost_so_far = {start: 0}
+    visited = set()
+    n_pending = 1
+
+    while n_pending:
+        bucket = buckets[priority % n_buckets]
+        while bucket:
+            current = bucket.pop()
+            n_pending -= 1
+            if current in visited:
+                continue
+            visited.add(current)
+
+            if current == end:
+                path = []
+                while current is not None:
+                    path.append(current)
+                    current = came_from[current]
+                return path[::-1], visited
+
+            for neighbor, cost in graph[current]:
+                if not min_cost <= cost <= max_cost:
+                    # Outside the bucket ring; the result would be wrong.
+                    raise ValueError('edge cost {} is not between {} and {}'.format(
+                        cost, min_cost, max_cost))
+                new_cost = cost_so_far[current] + cost
+                if neighbor not in cost_so_far or new_cost < cost_so_far[neighbor]:
+                    cost_so_far[neighbor] = new_cost
+                    new_priority = new_cost + min_cost * heuristic(neighbor, end)
+                    buckets[new_priority % n_buckets].append(neighbor)
+                    n_pending += 1
+                    came_from[neighbor] = current
+        priority += 1
+
+    return [], visited
@@ -0,0 +1,144 @@
+import os
+
+from maze import Maze
+from dijkstra import dijkstra, dijkstra_weighted, dial_dijkstra
+from astar import astar, astar_weighted, dial_astar
+from bidirectional import bidirectional_bfs, bidirectional_astar
+
+# Solvers available by name to batch and command line users. All take
+# `(graph, start, end)` and return `(path, visited)`.
+SOLVERS = {'dijkstra': dijkstra,
+           'astar': astar,
+           'dijkstra_weighted': dijkstra_weighted,
+           'astar_weighted': astar_weighted,
+           'dial_dijkstra': dial_dijkstra,
+           'dial_astar': dial_astar,
+           'bidirectional_bfs': bidirectional_bfs,
+           'bidirectional_astar': bidirectional_astar}
+
+# Solvers that expect `Maze.to_weighted_graph()` rather than `to_graph()`.
+WEIGHTED_SOLVERS = {'dijkstra_weighted', 'astar_weighted', 'dial_dijkstra', 'dial_astar'}
+
+# Per-process state, set once by `_init_worker`.
+_worker_graph = None
+_worker_solver = None
+_worker_include_visited = True
+
+def check_algorithm(maze, algorithm):
+    """
+    Raises ValueError for an unknown solver name, or for an unweighted
+    solver on a maze with terrain costs, which it would silently ignore.
+    """
+    if algorithm not in SOLVERS:
+        raise ValueError('unknown algorithm {!r}, expected one of: {}'.format(
+            algorithm, ', '.join(sorted(SOLVERS))))
+    if maze.costs is not None and algorithm not in WEIGHTED_SOLVERS:
+        raise ValueError('the maze has terrain costs, which {!r} ignores; use one of: {}'.format(
+            algorithm, ', '.join(sorted(WEIGHTED_SOLVERS))))
+
+def build_graph(maze, algorithm, lazy=False):
+    """
+    Returns the kind of graph the named solver expects for the maze. With
+    `lazy`, a `Maze.graph_view` is returned instead, which costs nothing up
+    front and suits a few short queries on a large maze.
+    """
+    check_algorithm(maze, algorithm)
+    weighted = algorithm in WEIGHTED_SOLVERS
+    if lazy:
+        return maze.graph_view(weighted)
+    if weighted:
+        return maze.to_weighted_graph()
+    return maze.to_graph()
+
+def _init_worker(maze, algorithm, include_visited, lazy_graph=False):
+    """
+    Runs once in each worker process: builds the graph for the maze it was
+    handed at start-up and picks the solver.
+    """
+    global _worker_graph, _worker_solver, _worker_include_visited
+    _worker_graph = build_graph(maze, algorithm, lazy_graph)
+    _worker_solver = SOLVERS[algorithm]
+    _worker_include_visited = include_visited
+
+def _solve_pair(pair):
+    """
+    Solves one (start, end) pair with the worker's graph and solver.
+    """
+    start, end = pair
+    path, visited = _worker_solver(_worker_graph, start, end)
+    return path, (visited if _worker_include_visited else None)
+
+def solve_many(maze, pairs, algorithm='dijkstra', workers=None, chunksize=None,
+               include_visited=True, lazy_graph=False):
+    """
+    Solves every (start, end) pair of `pairs` on the given maze, spreading the
+    work over `workers` processes (all CPUs by default). Workers attach to
+    the maze in shared memory when they start, rather than each receiving a
+    copy: a maze that is not shared yet is published for the duration of
+    the call.
+
+    Returns an iterator of `(path, visited)` for each pair, in the same
+    order as `pairs`, each as soon as it is available. With
+    `include_visited=False` the visited sets are not sent back and `None`
+    comes in their place.
+
+    With `lazy_graph=True` workers search a `Maze.graph_view` instead of
+    building the whole graph first, so the first results come back sooner
+    when the pairs are close together.
+
+    With `workers=1` everything runs in the current process.
+
+    Raises ValueError for an unknown or unsuitable `algorithm` straight
+    away, before the first result is asked for.
+    """
+    check_algorithm(maze, algorithm)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers == 1:
+        return _solve_inline(maze, pairs, algorithm, include_visited, lazy_graph)
+    return _solve_pooled(maze, pairs, algorithm, workers, chunksize,
+                         include_visited, lazy_graph)
+
+def _solve_inline(maze, pairs, algorithm, include_visited, lazy_graph):
+    """
+    `solve_many` in the current process, leaving the worker globals alone.
+    """
+    graph = build_graph(maze, algorithm, lazy_graph)
+    solver = SOLVERS[algorithm]
+    for start, end in pairs:
+        path, visited = solver(graph, start, end)
+        yield path, (visited if include_visited else None)
+
+def _solve_pooled(maze, pairs, algorithm, workers, chunksize, include_visited,
+                  lazy_graph):
+    """
+    `solve_many` over a pool of `workers` processes.
+    """
+    # Imported here so that single-process users, like the command line
+    # batch mode, do not pay for loading multiprocessing.
+    from concurrent.futures import ProcessPoolExecutor
+
+    pairs = list(pairs)
+    if chunksize is None:
+        # A few chunks per worker keeps them all busy without paying for
+        # one round trip per pair.
+        chunksize = max(1, len(pairs) // (workers * 4))
+
+    shared = None
+    if maze.shared_name is None:
+        # A view over the same walls that owns the shared copy, leaving the
+        # caller's maze as it is.
+        shared = Maze(maze.width, maze.height, maze.grid, maze.seed, maze.costs)
+        shared.share()
+        maze = shared
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(maze, algorithm, include_visited,
+                                           lazy_graph)) as executor:
+            for result in executor.map(_solve_pair, pairs, chunksize=chunksize):
+                yield result
+    finally:
+        if shared is not None:
+            shared.close()
@@ -0,0 +1,419 @@
+"""
+Headless benchmark suite for maze generation, graph building, solvers and
+rendering. Run with:
+
+    python benchmark.py [--sizes 50,200,1000] [--cases dijkstra,astar]
+                        [--json results.json] [--baseline baseline.json]
+
+Every case runs on square mazes of each size, generated from a fixed seed.
+Wall time, peak memory (traced separately, so it does not slow the timed
+run) and nodes expanded are reported, and can be written as JSON. When a
+baseline JSON file is given, cases that got slower by more than the
+threshold are flagged and the exit status is 1.
+"""
+import argparse
+import gc
+import heapq
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import maze as maze_module
+from maze import Maze
+from dijkstra import dijkstra, dijkstra_csr, dijkstra_weighted, dial_dijkstra
+from astar import astar, astar_csr, astar_weighted, dial_astar
+from bidirectional import bidirectional_bfs, bidirectional_astar
+from contraction import CorridorGraph
+from generators import generate_tiled
+from distance_field import distance_field
+from multi import multi_dijkstra, multi_astar
+
+DEFAULT_SIZES = [50, 200, 500, 1000, 2000]
+
+# Benchmark cases by name: (function, fixture attributes it needs). The
+# function receives a `Fixture` and returns the number of nodes expanded,
+# or None when that does not apply.
+CASES = {}
+
+def case(name, needs=()):
+    """
+    Registers a benchmark case. Attributes listed in `needs` are built on
+    the fixture before timing starts.
+    """
+    def register(function):
+        CASES[name] = (function, needs)
+        return function
+    return register
+
+
+class Fixture(object):
+    """
+    Inputs shared by the cases for one maze size, built lazily and reused.
+    """
+
+    def __init__(self, size, seed):
+        self.size = size
+        self.seed = seed
+        self.start = (0, 0)
+        self.end = (size - 1, size - 1)
+        self._maze = None
+        self._graph = None
+        self._csr = None
+        self._path = None
+        self._weighted_graph = None
+        self._corridor_graph = None
+        self._targets = None
+
+    @property
+    def maze(self):
+        if self._maze is None:
+            self._maze = Maze.generate(self.size, self.size, seed=self.seed)
+        return self._maze
+
+    @property
+    def graph(self):
+        if self._graph is None:
+            self._graph = self.maze.to_graph()
+        return self._graph
+
+    @property
+    def csr(self):
+        if self._csr is None:
+            self._csr = self.maze.to_csr()
+        return self._csr
+
+    @property
+    def weighted_graph(self):
+        """
+        Graph of the fixture maze with seeded random terrain costs from 1 to
+        9, in an open variant of the maze so costs change the best route.
+        """
+        if self._weighted_graph is None:
+            rng = random.Random(self.seed)
+            weighted = Maze(self.size, self.size, bytearray(self.maze.grid))
+            # Knock down a tenth of the remaining inner walls for loops.
+            for _ in range(self.size * self.size // 10):
+                cell = weighted.cells[rng.randrange(len(weighted.grid))]
+                neighbor = rng.choice(list(weighted.neighbors(cell)))
+                if cell._wall_to(neighbor) in cell:
+                    cell.connect(neighbor)
+            weighted.randomize_costs(rng=rng)
+            self._weighted_graph = weighted.to_weighted_graph()
+        return self._weighted_graph
+
+    @property
+    def corridor_graph(self):
+        if self._corridor_graph is None:
+            self._corridor_graph = CorridorGraph(self.graph)
+        return self._corridor_graph
+
+    @property
+    def targets(self):
+        """
+        Eight seeded random cells, the targets of the multi-target cases.
+        """
+        if self._targets is None:
+            rng = random.Random(self.seed)
+            self._targets = [(rng.randrange(self.size), rng.randrange(self.size))
+                             for _ in range(8)]
+        return self._targets
+
+    @property
+    def local_pair(self):
+        """
+        Two cells about 50 steps apart in the middle of `path`, for the
+        short query cases.
+        """
+        middle = len(self.path) // 2
+        return self.path[middle], self.path[min(middle + 50, len(self.path) - 1)]
+
+    @property
+    def path(self):
+        if self._path is None:
+            self._path = dijkstra(self.graph, self.start, self.end)[0]
+        return self._path
+
+
+def legacy_dijkstra(graph, start, end):
+    """
+    Previous `dijkstra` implementation, which keeps a full copy of the path in
+    every heap entry. Kept here only as a reference for benchmarks.
+    """
+    priority_queue = [(0, start, [])]
+    visited = set()
+
+    while priority_queue:
+        (distance, current_node, path) = heapq.heappop(priority_queue)
+
+        if current_node in visited:
+            continue
+
+        visited.add(current_node)
+        path = path + [current_node]
+
+        if current_node == end:
+            return path, visited
+
+        for neighbor in graph.get(current_node, []):
+            if neighbor not in visited:
+                heapq.heappush(priority_queue, (distance + 1, neighbor, path))
+
+    return [], visited
+
+
+@case('generate')
+def bench_generate(fixture):
+    Maze.generate(fixture.size, fixture.size, seed=fixture.seed)
+
+@case('generate_kruskal')
+def bench_generate_kruskal(fixture):
+    Maze.generate(fixture.size, fixture.size, 'kruskal', seed=fixture.seed)
+
+@case('generate_wilson')
+def bench_generate_wilson(fixture):
+    Maze.generate(fixture.size, fixture.size, 'wilson', seed=fixture.seed)
+
+@case('generate_tiled')
+def bench_generate_tiled(fixture):
+    generate_tiled(fixture.size, fixture.size, seed=fixture.seed)
+
+@case('to_graph', needs=('maze',))
+def bench_to_graph(fixture):
+    fixture.maze.to_graph()
+
+@case('to_csr', needs=('maze',))
+def bench_to_csr(fixture):
+    fixture.maze.to_csr()
+
+@case('dijkstra', needs=('graph',))
+def bench_dijkstra(fixture):
+    return len(dijkstra(fixture.graph, fixture.start, fixture.end)[1])
+
+@case('astar', needs=('graph',))
+def bench_astar(fixture):
+    return len(astar(fixture.graph, fixture.start, fixture.end)[1])
+
+@case('bidirectional_bfs', needs=('graph',))
+def bench_bidirectional_bfs(fixture):
+    return len(bidirectional_bfs(fixture.graph, fixture.start, fixture.end)[1])
+
+@case('bidirectional_astar', needs=('graph',))
+def bench_bidirectional_astar(fixture):
+    return len(bidirectional_astar(fixture.graph, fixture.start, fixture.end)[1])
+
+@case('dijkstra_csr', needs=('csr',))
+def bench_dijkstra_csr(fixture):
+    offsets, targets = fixture.csr
+    end = fixture.end[0] + fixture.end[1] * fixture.size
+    return len(dijkstra_csr(offsets, targets, 0, end)[1])
+
+@case('astar_csr', needs=('csr',))
+def bench_astar_csr(fixture):
+    offsets, targets = fixture.csr
+    end = fixture.end[0] + fixture.end[1] * fixture.size
+    return len(astar_csr(offsets, targets, fixture.size, 0, end)[1])
+
+@case('dijkstra_weighted', needs=('weighted_graph',))
+def bench_dijkstra_weighted(fixture):
+    return len(dijkstra_weighted(fixture.weighted_graph, fixture.start, fixture.end)[1])
+
+@case('dial_dijkstra', needs=('weighted_graph',))
+def bench_dial_dijkstra(fixture):
+    return len(dial_dijkstra(fixture.weighted_graph, fixture.start, fixture.end)[1])
+
+@case('astar_weighted', needs=('weighted_graph',))
+def bench_astar_weighted(fixture):
+    return len(astar_weighted(fixture.weighted_graph, fixture.start, fixture.end)[1])
+
+@case('dial_astar', needs=('weighted_graph',))
+def bench_dial_astar(fixture):
+    return len(dial_astar(fixture.weighted_graph, fixture.start, fixture.end)[1])
+
+@case('astar_graph_view', needs=('maze',))
+def bench_astar_graph_view(fixture):
+    return len(astar(fixture.maze.graph_view(), fixture.start, fixture.end)[1])
+
+@case('local_query', needs=('maze', 'local_pair'))
+def bench_local_query(fixture):
+    # Includes building the graph, which dominates for short queries.
+    return len(astar(fixture.maze.to_graph(), *fixture.local_pair)[1])
+
+@case('local_query_view', needs=('maze', 'local_pair'))
+def bench_local_query_view(fixture):
+    return len(astar(fixture.maze.graph_view(), *fixture.local_pair)[1])
+
+@case('multi_dijkstra_all', needs=('graph', 'targets'))
+def bench_multi_dijkstra_all(fixture):
+    return len(multi_dijkstra(fixture.graph, [fixture.start], fixture.targets, find_all=True)[1])
+
+@case('dijkstra_each_target', needs=('graph', 'targets'))
+def bench_dijkstra_each_target(fixture):
+    # One search per target, the baseline for `multi_dijkstra_all`.
+    return sum(len(dijkstra(fixture.graph, fixture.start, target)[1])
+               for target in fixture.targets)
+
+@case('multi_astar_nearest', needs=('graph', 'targets'))
+def bench_multi_astar_nearest(fixture):
+    return len(multi_astar(fixture.graph, [fixture.start], fixture.targets)[1])
+
+@case('astar_each_target', needs=('graph', 'targets'))
+def bench_astar_each_target(fixture):
+    # One search per target, the baseline for `multi_astar_nearest`; picking
+    # the shortest of the K paths afterwards is negligible.
+    results = [astar(fixture.graph, fixture.start, target) for target in fixture.targets]
+    return sum(len(visited) for _, visited in results)
+
+@case('distance_field', needs=('maze',))
+def bench_distance_field(fixture):
+    field = distance_field(fixture.maze, fixture.start)
+    return sum(1 for distance in field.flat_distances if distance >= 0)
+
+@case('corridor_build', needs=('graph',))
+def bench_corridor_build(fixture):
+    CorridorGraph(fixture.graph)
+
+@case('corridor_solve', needs=('corridor_graph',))
+def bench_corridor_solve(fixture):
+    return len(fixture.corridor_graph.solve(fixture.start, fixture.end)[1])
+
+@case('legacy_dijkstra', needs=('graph',))
+def bench_legacy_dijkstra(fixture):
+    return len(legacy_dijkstra(fixture.graph, fixture.start, fixture.end)[1])
+
+@case('repr', needs=('maze',))
+def bench_repr(fixture):
+    repr(fixture.maze)
+
+@case('draw_path', needs=('maze', 'path'))
+def bench_draw_path(fixture):
+    fixture.maze.draw_path(fixture.path)
+
+
+def run_case(name, fixture, repeat=1, measure_memory=True):
+    """
+    Runs one case and returns its result record. The fastest of `repeat`
+    timed runs is kept; memory is traced in one extra run.
+    """
+    function, needs = CASES[name]
+    for attribute in needs:
+        getattr(fixture, attribute)
+
+    seconds = None
+    for _ in range(repeat):
+        # Like timeit, keep garbage collection pauses out of the timings.
+        gc.collect()
+        gc.disable()
+        try:
+            start_time = time.perf_counter()
+            nodes_expanded = function(fixture)
+            elapsed = time.perf_counter() - start_time
+        finally:
+            gc.enable()
+        seconds = elapsed if seconds is None else min(seconds, elapsed)
+
+    peak_bytes = None
+    if measure_memory:
+        tracemalloc.start()
+        try:
+            function(fixture)
+            peak_bytes = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return {'case': name,
+            'size': fixture.size,
+            'seconds': seconds,
+            'peak_bytes': peak_bytes,
+            'nodes_expanded': nodes_expanded}
+
+
+def compare(results, baseline, threshold):
+    """
+    Returns the results that are slower than their baseline counterpart by
+    more than `threshold` (0.2 is 20%), as (result, baseline seconds) pairs.
+    """
+    previous = {(r['case'], r['size']): r['seconds'] for r in baseline['results']}
+    regressions = []
+    for result in results:
+        before = previous.get((result['case'], result['size']))
+        if before and result['seconds'] > before * (1 + threshold):
+            regressions.append((result, before))
+    return regressions
+
+
+def format_bytes(n_bytes):
+    if n_bytes is None:
+        return '-'
+    for unit in ('B', 'KB', 'MB'):
+        if n_bytes < 1024:
+            return '{:.0f}{}'.format(n_bytes, unit)
+        n_bytes /= 1024
+    return '{:.1f}GB'.format(n_bytes)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help='comma separated maze sizes (default: %(default)s)')
+    parser.add_argument('--cases', default=','.join(name for name in CASES if name != 'legacy_dijkstra'),
+                        help='comma separated cases, from: ' + ', '.join(CASES))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--no-memory', action='store_true',
+                        help='skip the traced run that measures peak memory')
+    parser.add_argument('--legacy-max-size', type=int, default=300,
+                        help='largest size to run legacy_dijkstra on; it is quadratic')
+    parser.add_argument('--json', help='write results as JSON to this file ("-" for stdout)')
+    parser.add_argument('--baseline', help='JSON results to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='slowdown ratio flagged as a regression (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    names = args.cases.split(',')
+    for name in names:
+        if name not in CASES:
+            parser.error('unknown case {!r}'.format(name))
+
+    log = sys.stderr if args.json == '-' else sys.stdout
+    results = []
+    for size in sizes:
+        fixture = Fixture(size, args.seed)
+        for name in names:
+            if name == 'legacy_dijkstra' and size > args.legacy_max_size:
+                continue
+            result = run_case(name, fixture, args.repeat, not args.no_memory)
+            results.append(result)
+            print('{:>20} {:>6}  {:9.4f}s  {:>8}  {}'.format(
+                name, size, result['seconds'], format_bytes(result['peak_bytes']),
+                '' if result['nodes_expanded'] is None else result['nodes_expanded']),
+                file=log)
+
+    report = {'meta': {'python': platform.python_version(),
+                       'platform': platform.platform(),
+                       'numpy': maze_module.load_numpy() is not None,
+                       'seed': args.seed},
+              'results': results}
+    if args.json == '-':
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.json:
+        with open(args.json, 'w') as stream:
+            json.dump(report, stream, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as stream:
+            regressions = compare(results, json.load(stream), args.threshold)
+        for result, before in regressions:
+            print('REGRESSION {} {}: {:.4f}s -> {:.4f}s'.format(
+                result['case'], result['size'], before, result['seconds']), file=log)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,153 @@
+import heapq
+
+from astar import heuristic
+
+def _join_paths(forward_parents, backward_parents, meeting):
+    """
+    Joins the path from the forward search's start to `meeting` with the path
+    from `meeting` to the backward search's start.
+    """
+    path = []
+    current = meeting
+    while current is not None:
+        path.append(current)
+        current = forward_parents[current]
+    path.reverse()
+    current = backward_parents[meeting]
+    while current is not None:
+        path.append(current)
+        current = backward_parents[current]
+    return path
+
+def bidirectional_bfs_animated(graph, start, end):
+    """
+    Breadth-first search from both ends at once, for unit cost graphs,
+    yielding each expanded node for animation purposes and finally the path
+    (an empty list if there is none).
+
+    Whole levels are expanded at a time, always on the side with the smaller
+    frontier. The first level that links the two searches holds a shortest
+    path; the best link of that level is kept.
+    """
+    if start == end:
+        yield start
+        yield [start]
+        return
+
+    parents = ({start: None}, {end: None})
+    distances = ({start: 0}, {end: 0})
+    frontiers = ([start], [end])
+
+    while frontiers[0] and frontiers[1]:
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        other = 1 - side
+        own_parents, other_parents = parents[side], parents[other]
+        own_distances, other_distances = distances[side], distances[other]
+
+        best_length, meeting = None, None
+        next_frontier = []
+        for node in frontiers[side]:
+            yield node
+            distance = own_distances[node] + 1
+            for neighbor in graph.get(node, []):
+                if neighbor in own_parents:
+                    continue
+                own_parents[neighbor] = node
+                own_distances[neighbor] = distance
+                next_frontier.append(neighbor)
+                if neighbor in other_parents:
+                    length = distance + other_distances[neighbor]
+                    if best_length is None or length < best_length:
+                        best_length, meeting = length, neighbor
+
+        if meeting is not None:
+            yield _join_paths(parents[0], parents[1], meeting)
+            return
+
+        frontiers = (next_frontier, frontiers[1]) if side == 0 else (frontiers[0], next_frontier)
+
+    yield []
+
+def bidirectional_astar_animated(graph, start, end):
+    """
+    A* from both ends at once, for unit cost graphs, yielding each expanded
+    node for animation purposes and finally the path (an empty list if there
+    is none).
+
+    The forward search aims at `end` and the backward one at `start`, each
+    with the Manhattan heuristic. Whenever a node reached by one side has
+    also been reached by the other, the best known path length `best` is
+    updated. The search stops as soon as the smallest priority on either
+    frontier is at least `best`: that priority is a lower bound on every
+    path still unexplored on its side, so none of them can be shorter.
+    """
+    if start == end:
+        yield start
+        yield [start]
+        return
+
+    goals = (end, start)
+    parents = ({start: None}, {end: None})
+    costs = ({start: 0}, {end: 0})
+    closed = (set(), set())
+    frontiers = ([(heuristic(start, end), start)], [(heuristic(end, start), end)])
+    best, meeting = None, None
+
+    while frontiers[0] and frontiers[1]:
+        if best is not None and (frontiers[0][0][0] >= best or frontiers[1][0][0] >= best):
+            break
+
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        own_costs, other_costs = costs[side], costs[1 - side]
+        own_parents, goal = parents[side], goals[side]
+
+        _, node = heapq.heappop(frontiers[side])
+        if node in closed[side]:
+            continue
+        closed[side].add(node)
+        yield node
+
+        new_cost = own_costs[node] + 1
+        for neighbor in graph.get(node, []):
+            if neighbor not in own_costs or new_cost < own_costs[neighbor]:
+                own_costs[neighbor] = new_cost
+                own_parents[neighbor] = node
+                heapq.heappush(frontiers[side], (new_cost + heuristic(neighbor, goal), neighbor))
+                if neighbor in other_costs:
+                    length = new_cost + other_costs[neighbor]
+                    if best is None or length < best:
+                        best, meeting = length, neighbor
+
+    if meeting is None:
+        yield []
+    else:
+        yield _join_paths(parents[0], parents[1], meeting)
+
+def _run(search):
+    """
+    Drives an animated search to the end and returns `(path, visited)`.
+    """
+    visited = set()
+    for item in search:
+        if isinstance(item, list):
+            return item, visited
+        visited.add(item)
+    return [], visited
+
+def bidirectional_bfs(graph, start, end):
+    """
+    Bidirectional breadth-first search for unit cost graphs.
+
+    Returns:
+        (list, set): A tuple containing the final path and the set of all nodes expanded by either side.
+    """
+    return _run(bidirectional_bfs_animated(graph, start, end))
+
+def bidirectional_astar(graph, start, end):
+    """
+    Bidirectional A* for unit cost graphs.
+
+    Returns:
+        (list, set): A tuple containing the final path and the set of all nodes expanded by either side.
+    """
+    return _run(bidirectional_astar_animated(graph, start, end))
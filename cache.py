@@ -0,0 +1,130 @@
+import sys
+from collections import OrderedDict
+
+from batch import SOLVERS, WEIGHTED_SOLVERS, check_algorithm
+
+def approximate_size(value):
+    """
+    Rough size in bytes of a graph, path or visited set: the container itself
+    plus its items, estimated from the first one. Good enough to bound a
+    cache, without walking every element.
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        if value:
+            key, item = next(iter(value.items()))
+            size += len(value) * (sys.getsizeof(key) + approximate_size(item))
+    elif isinstance(value, (list, set, frozenset, tuple)):
+        if value:
+            size += len(value) * approximate_size(next(iter(value)))
+    return size
+
+class LRUCache(object):
+    """
+    Least recently used cache bounded by number of entries, total size in
+    bytes, or both. Counts hits, misses and evictions.
+    """
+
+    def __init__(self, max_entries=128, max_bytes=None, sizeof=approximate_size):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._entries = OrderedDict()
+        self.n_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """
+        Returns the value for `key` and marks it as most recently used, or
+        `default` if missing.
+        """
+        try:
+            value, _ = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """
+        Stores `value`, evicting least recently used entries until the cache
+        fits its bounds again. A value larger than `max_bytes` on its own is
+        not stored.
+        """
+        size = self.sizeof(value) if self.max_bytes is not None else 0
+        if key in self._entries:
+            self.n_bytes -= self._entries.pop(key)[1]
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        self._entries[key] = (value, size)
+        self.n_bytes += size
+        while ((self.max_entries is not None and len(self._entries) > self.max_entries)
+               or (self.max_bytes is not None and self.n_bytes > self.max_bytes)):
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.n_bytes -= evicted_size
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+        self.n_bytes = 0
+
+    def stats(self):
+        """
+        Returns the counters as a dict.
+        """
+        return {'entries': len(self._entries),
+                'bytes': self.n_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions}
+
+class SolverCache(object):
+    """
+    Memoizes maze graphs and solver results, keyed by `Maze.fingerprint()`,
+    so repeated queries on an unchanged maze skip both `to_graph()` and the
+    search. Cached paths and visited sets are shared between callers and
+    must not be modified.
+    """
+
+    def __init__(self, max_entries=128, max_bytes=None):
+        self.cache = LRUCache(max_entries, max_bytes)
+
+    def graph(self, maze, weighted=False):
+        """
+        Returns `maze.to_graph()`, or `maze.to_weighted_graph()` when
+        `weighted`, built only once per maze content.
+        """
+        key = ('weighted_graph' if weighted else 'graph', maze.fingerprint())
+        graph = self.cache.get(key)
+        if graph is None:
+            graph = maze.to_weighted_graph() if weighted else maze.to_graph()
+            self.cache.put(key, graph)
+        return graph
+
+    def solve(self, maze, start, end, algorithm='dijkstra'):
+        """
+        Returns `(path, visited)` for the given endpoints, as computed by the
+        named solver from `batch.SOLVERS`. Raises ValueError as
+        `batch.check_algorithm` does.
+        """
+        check_algorithm(maze, algorithm)
+        key = ('solve', maze.fingerprint(), algorithm, start, end)
+        result = self.cache.get(key)
+        if result is None:
+            graph = self.graph(maze, algorithm in WEIGHTED_SOLVERS)
+            result = SOLVERS[algorithm](graph, start, end)
+            self.cache.put(key, result)
+        return result
+
+    def stats(self):
+        return self.cache.stats()
@@ -0,0 +1,161 @@
+"""
+Headless batch mode: generates mazes, solves pairs of cells on them and
+prints one row of stats per solve, without importing pygame. Run with:
+
+    python maze.py batch [--size 100] [--count 5] [--seed 1] [--pairs 10]
+                         [--pair 0,0:99,99] [--generator kruskal]
+                         [--algorithm astar] [--lazy-graph]
+                         [--format jsonl|csv]
+
+Maze `i` is generated from seed `seed + i`, and the random pairs come from
+their own generator seeded with `seed`, so a run is reproducible. Rows go
+to stdout; a summary with the time to the first result and the total time
+goes to stderr as one JSON object.
+"""
+import argparse
+import csv
+import json
+import random
+import sys
+import time
+
+from maze import Maze
+from batch import SOLVERS, WEIGHTED_SOLVERS, build_graph
+from generators import GENERATORS
+
+FIELDS = ['maze', 'seed', 'width', 'height', 'algorithm', 'start_x', 'start_y',
+          'end_x', 'end_y', 'path_length', 'visited', 'seconds']
+
+def parse_pair(text):
+    """
+    Parses a pair of cells written as `x1,y1:x2,y2`.
+    """
+    try:
+        start, end = text.split(':')
+        start = tuple(int(value) for value in start.split(','))
+        end = tuple(int(value) for value in end.split(','))
+    except ValueError:
+        raise argparse.ArgumentTypeError('expected x1,y1:x2,y2, got {!r}'.format(text))
+    if len(start) != 2 or len(end) != 2:
+        raise argparse.ArgumentTypeError('expected x1,y1:x2,y2, got {!r}'.format(text))
+    return start, end
+
+def random_pairs(rng, width, height, count):
+    """
+    Returns `count` pairs of random cells.
+    """
+    def cell():
+        return (rng.randrange(width), rng.randrange(height))
+    return [(cell(), cell()) for _ in range(count)]
+
+def run(args, stream, started):
+    """
+    Generates the mazes, solves every pair on each and writes the rows.
+    Returns the summary dict.
+    """
+    if args.format == 'csv':
+        writer = csv.DictWriter(stream, fieldnames=FIELDS, lineterminator='\n')
+        writer.writeheader()
+        write = writer.writerow
+    else:
+        def write(row):
+            stream.write(json.dumps(row) + '\n')
+
+    rng = random.Random(args.seed)
+    solver = SOLVERS[args.algorithm]
+    summary = {'mazes': 0, 'results': 0, 'first_result_seconds': None,
+               'generate_seconds': 0.0, 'graph_seconds': 0.0, 'solve_seconds': 0.0}
+
+    for index in range(args.count):
+        seed = args.seed + index
+        before = time.perf_counter()
+        maze = Maze.generate(args.width, args.height, args.generator, seed=seed)
+        if args.costs:
+            maze.randomize_costs(rng=random.Random(seed))
+        graph_start = time.perf_counter()
+        graph = build_graph(maze, args.algorithm, args.lazy_graph)
+        graph_end = time.perf_counter()
+        summary['generate_seconds'] += graph_start - before
+        summary['graph_seconds'] += graph_end - graph_start
+        summary['mazes'] += 1
+
+        pairs = args.pair or random_pairs(rng, args.width, args.height, args.pairs)
+        for start, end in pairs:
+            before = time.perf_counter()
+            path, visited = solver(graph, start, end)
+            seconds = time.perf_counter() - before
+            summary['solve_seconds'] += seconds
+            write({'maze': index, 'seed': seed, 'width': args.width,
+                   'height': args.height, 'algorithm': args.algorithm,
+                   'start_x': start[0], 'start_y': start[1],
+                   'end_x': end[0], 'end_y': end[1],
+                   'path_length': len(path), 'visited': len(visited),
+                   'seconds': round(seconds, 6)})
+            summary['results'] += 1
+            if summary['first_result_seconds'] is None:
+                # Make sure the first row actually reaches the reader before
+                # timing it.
+                stream.flush()
+                summary['first_result_seconds'] = time.perf_counter() - started
+
+    stream.flush()
+    return summary
+
+def main(argv=None, started=None):
+    """
+    Entry point. `started` is the `time.perf_counter()` value the time to
+    first result is measured from; defaults to the time `main` is called.
+    Returns the exit status.
+    """
+    if started is None:
+        started = time.perf_counter()
+
+    parser = argparse.ArgumentParser(prog='maze.py batch', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=50,
+                        help='width and height of the mazes (default: %(default)s)')
+    parser.add_argument('--width', type=int, help='maze width, overrides --size')
+    parser.add_argument('--height', type=int, help='maze height, overrides --size')
+    parser.add_argument('--count', type=int, default=1,
+                        help='number of mazes to generate (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='seed of the first maze and of the random pairs (default: %(default)s)')
+    parser.add_argument('--pairs', type=int, default=10,
+                        help='random pairs to solve per maze (default: %(default)s)')
+    parser.add_argument('--pair', type=parse_pair, action='append', metavar='X1,Y1:X2,Y2',
+                        help='pair to solve on every maze instead of random ones; repeatable')
+    parser.add_argument('--generator', choices=sorted(GENERATORS), default='backtracker',
+                        help='maze generation algorithm (default: %(default)s)')
+    parser.add_argument('--algorithm', choices=sorted(SOLVERS), default='dijkstra',
+                        help='solver to use (default: %(default)s)')
+    parser.add_argument('--costs', action='store_true',
+                        help='give cells random terrain costs, for the weighted solvers')
+    parser.add_argument('--lazy-graph', action='store_true',
+                        help='read neighbors from the walls on demand instead of '
+                             'building the graph first; faster for short queries on big mazes')
+    parser.add_argument('--format', choices=['jsonl', 'csv'], default='jsonl',
+                        help='output format (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    args.width = args.width if args.width is not None else args.size
+    args.height = args.height if args.height is not None else args.size
+    if args.width < 1 or args.height < 1:
+        parser.error('maze sizes must be positive')
+    if args.count < 0 or args.pairs < 0:
+        parser.error('--count and --pairs must not be negative')
+    for start, end in args.pair or ():
+        for x, y in (start, end):
+            if not (0 <= x < args.width and 0 <= y < args.height):
+                parser.error('cell {},{} is outside the {}x{} maze'.format(
+                    x, y, args.width, args.height))
+    if args.costs and args.algorithm not in WEIGHTED_SOLVERS:
+        parser.error('--costs needs one of the weighted solvers: {}'.format(
+            ', '.join(sorted(WEIGHTED_SOLVERS))))
+
+    summary = run(args, sys.stdout, started)
+    summary['total_seconds'] = time.perf_counter() - started
+    print(json.dumps(summary), file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
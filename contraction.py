@@ -0,0 +1,148 @@
+import heapq
+
+class CorridorGraph(object):
+    """
+    Reduced version of a maze graph where every chain of degree 2 corridor
+    cells is collapsed into one weighted edge between the junctions and dead
+    ends at its two ends. Most cells of a perfect maze are corridor cells,
+    so searches on this graph touch a fraction of the nodes; the full cell
+    path is expanded only once a route is found.
+
+    Corridor cells are not stored. Interior cells of an edge are recovered
+    by walking the corridor from the cell after the junction it starts at.
+    """
+
+    def __init__(self, graph):
+        """
+        Contracts the given unweighted adjacency list, as returned by
+        `Maze.to_graph()`.
+        """
+        self.graph = graph
+        self.junctions = {node for node, neighbors in graph.items() if len(neighbors) != 2}
+        # junction: [(other junction, corridor length, first cell after junction)]
+        self.edges = {junction: [] for junction in self.junctions}
+
+        seen = set()
+        for junction in list(self.junctions):
+            self._add_edges(junction, seen)
+
+        # Loops with no junction at all: promote one of their cells.
+        for node in graph:
+            if node not in self.junctions and node not in seen:
+                self.junctions.add(node)
+                self.edges[node] = []
+                self._add_edges(node, seen)
+
+    def _next(self, previous, current):
+        """
+        Returns the cell after `current` along a corridor entered from
+        `previous`.
+        """
+        a, b = self.graph[current]
+        return b if a == previous else a
+
+    def _add_edges(self, junction, seen):
+        for first in self.graph[junction]:
+            previous, current, length = junction, first, 1
+            while current not in self.junctions:
+                seen.add(current)
+                previous, current = current, self._next(previous, current)
+                length += 1
+            # Corridors looping back to the same junction never help.
+            if current != junction:
+                self.edges[junction].append((current, length, first))
+
+    def _walk(self, node, first, stop=None):
+        """
+        Walks from a corridor cell through `first` to the nearest junction.
+        Returns `(junction, length, last cell before it, steps to stop)`,
+        where the last value is None unless `stop` was passed on the way.
+        """
+        previous, current, length = node, first, 1
+        stop_length = None
+        while current not in self.junctions:
+            if current == stop:
+                stop_length = length
+            previous, current = current, self._next(previous, current)
+            length += 1
+        return current, length, previous, stop_length
+
+    def _expand(self, previous, first, target):
+        """
+        Returns the cells from `first` to `target`, inclusive, along the
+        corridor leaving `previous`.
+        """
+        cells = [first]
+        current = first
+        while current != target:
+            previous, current = current, self._next(previous, current)
+            cells.append(current)
+        return cells
+
+    def solve(self, start, end):
+        """
+        Finds the shortest path between any two cells with Dijkstra's
+        algorithm on the contracted graph.
+
+        Returns:
+            (list, set): The full cell path, and the set of nodes expanded
+            (junctions, plus `start` and `end`).
+        """
+        if start == end:
+            return [start], {start}
+
+        cost_so_far = {start: 0}
+        # node: (node it was reached from, first cell of the corridor taken)
+        came_from = {start: None}
+        priority_queue = []
+
+        def relax(node, distance, previous, first):
+            if node not in cost_so_far or distance < cost_so_far[node]:
+                cost_so_far[node] = distance
+                came_from[node] = (previous, first)
+                heapq.heappush(priority_queue, (distance, node))
+
+        if start in self.junctions:
+            priority_queue.append((0, start))
+        else:
+            for first in self.graph[start]:
+                junction, length, _, to_end = self._walk(start, first, end)
+                if to_end is not None:
+                    relax(end, to_end, start, first)
+                relax(junction, length, start, first)
+
+        # Ways into `end` from the junctions of its corridor.
+        into_end = {}
+        if end not in self.junctions:
+            for first in self.graph[end]:
+                junction, length, last, _ = self._walk(end, first)
+                into_end.setdefault(junction, []).append((length, last))
+
+        visited = set()
+        while priority_queue:
+            (distance, node) = heapq.heappop(priority_queue)
+            if node in visited:
+                continue
+            visited.add(node)
+
+            if node == end:
+                break
+
+            for other, length, first in self.edges.get(node, ()):
+                relax(other, distance + length, node, first)
+            for length, first in into_end.get(node, ()):
+                relax(end, distance + length, node, first)
+        else:
+            return [], visited
+
+        segments = []
+        node = end
+        while node != start:
+            previous, first = came_from[node]
+            segments.append(self._expand(previous, first, node))
+            node = previous
+
+        path = [start]
+        for segment in reversed(segments):
+            path.extend(segment)
+        return path, visited
@@ -1,6 +1,23 @@
 import heapq
+import time
+from array import array
 
-def dijkstra_animated(graph, start, end):
+from instrument import SolveResult
+from maze import MAX_COST
+
+def _reconstruct_path(came_from, end):
+    """
+    Walks the predecessor map back from `end` and returns the path from the
+    start node to `end`.
+    """
+    path = []
+    current = end
+    while current is not None:
+        path.append(current)
+        current = came_from[current]
+    return path[::-1]
+
+def dijkstra_animated(graph, start, end, result=None):
     """
     Finds the shortest path using Dijkstra's algorithm, yielding each visited
     node for animation purposes. When the end is found, it returns the path.
@@ -9,6 +26,9 @@ def dijkstra_animated(graph, start, end):
         graph (dict): An adjacency list representation of the graph.
         start (tuple): The starting node coordinates (x, y).
         end (tuple): The ending node coordinates (x, y).
+        result (SolveResult): Optional. Filled in with the counters of
+            `dijkstra_instrumented` once the search ends. Its timings only
+            count time spent searching, not the pauses between frames.
 
     Yields:
         tuple: The coordinates of the currently visited node.
@@ -16,55 +36,274 @@ def dijkstra_animated(graph, start, end):
     Returns:
         list: The final shortest path, or an empty list if no path is found.
     """
-    priority_queue = [(0, start, [])]
+    resumed = time.perf_counter()
+    searching = 0.0
+    priority_queue = [(0, start)]
+    came_from = {start: None}
+    cost_so_far = {start: 0}
     visited = set()
+    heap_pushes, heap_pops, stale_pops, peak_frontier = 1, 0, 0, 1
+    found = False
 
     while priority_queue:
-        (distance, current_node, path) = heapq.heappop(priority_queue)
+        (distance, current_node) = heapq.heappop(priority_queue)
+        heap_pops += 1
 
         if current_node in visited:
+            stale_pops += 1
             continue
 
         visited.add(current_node)
-        path = path + [current_node]
 
+        searching += time.perf_counter() - resumed
         yield current_node  # Yield the current node for visualization
+        resumed = time.perf_counter()
 
         if current_node == end:
-            yield path  # Yield the final path
-            return
+            found = True
+            break
 
         for neighbor in graph.get(current_node, []):
-            if neighbor not in visited:
-                # Assuming edge weight is always 1 for an unweighted maze grid
-                heapq.heappush(priority_queue, (distance + 1, neighbor, path))
+            # Assuming edge weight is always 1 for an unweighted maze grid
+            new_distance = distance + 1
+            if neighbor not in cost_so_far or new_distance < cost_so_far[neighbor]:
+                cost_so_far[neighbor] = new_distance
+                came_from[neighbor] = current_node
+                heapq.heappush(priority_queue, (new_distance, neighbor))
+                heap_pushes += 1
+        if len(priority_queue) > peak_frontier:
+            peak_frontier = len(priority_queue)
 
-    yield []  # Yield an empty list if no path is found
+    path_started = time.perf_counter()
+    path = _reconstruct_path(came_from, end) if found else []
+    if result is not None:
+        result.path, result.visited = path, visited
+        result.heap_pushes, result.heap_pops = heap_pushes, heap_pops
+        result.stale_pops, result.peak_frontier = stale_pops, peak_frontier
+        result.timings = {'search': searching + path_started - resumed,
+                          'path': time.perf_counter() - path_started}
+    yield path  # Yield the final path, empty if no path is found
 
 def dijkstra(graph, start, end):
     """
     Finds the shortest path using Dijkstra's algorithm.
 
+    Only the predecessor of each node is stored; the path is rebuilt once the
+    end is reached.
+
     Returns:
         (list, set): A tuple containing the final path and the set of all visited nodes.
     """
-    priority_queue = [(0, start, [])]
+    priority_queue = [(0, start)]
+    came_from = {start: None}
+    cost_so_far = {start: 0}
     visited = set()
 
     while priority_queue:
-        (distance, current_node, path) = heapq.heappop(priority_queue)
+        (distance, current_node) = heapq.heappop(priority_queue)
 
         if current_node in visited:
             continue
 
         visited.add(current_node)
-        path = path + [current_node]
 
         if current_node == end:
-            return path, visited
+            return _reconstruct_path(came_from, end), visited
 
         for neighbor in graph.get(current_node, []):
-            if neighbor not in visited:
-                heapq.heappush(priority_queue, (distance + 1, neighbor, path))
+            new_distance = distance + 1
+            if neighbor not in cost_so_far or new_distance < cost_so_far[neighbor]:
+                cost_so_far[neighbor] = new_distance
+                came_from[neighbor] = current_node
+                heapq.heappush(priority_queue, (new_distance, neighbor))
+
+    return [], visited
+
+def _reconstruct_csr_path(came_from, end):
+    """
+    Same as `_reconstruct_path`, for an integer predecessor array where -1
+    marks the start node.
+    """
+    path = []
+    current = end
+    while current != -1:
+        path.append(current)
+        current = came_from[current]
+    return path[::-1]
+
+def dijkstra_csr(offsets, targets, start, end):
+    """
+    Dijkstra's algorithm over a compressed sparse row graph, as returned by
+    `Maze.to_csr`. Nodes are plain integers and all bookkeeping lives in
+    typed arrays indexed by node.
+
+    Returns:
+        (list, set): The final path and the set of visited nodes, as integers.
+    """
+    n_nodes = len(offsets) - 1
+    cost_so_far = array('i', [-1]) * n_nodes
+    came_from = array(offsets.typecode, [-1]) * n_nodes
+    cost_so_far[start] = 0
+    priority_queue = [(0, start)]
+    visited = set()
+
+    while priority_queue:
+        (distance, current_node) = heapq.heappop(priority_queue)
+
+        if current_node in visited:
+            continue
+
+        visited.add(current_node)
+
+        if current_node == end:
+            return _reconstruct_csr_path(came_from, end), visited
+
+        new_distance = distance + 1
+        for i in range(offsets[current_node], offsets[current_node + 1]):
+            neighbor = targets[i]
+            old_distance = cost_so_far[neighbor]
+            if old_distance == -1 or new_distance < old_distance:
+                cost_so_far[neighbor] = new_distance
+                came_from[neighbor] = current_node
+                heapq.heappush(priority_queue, (new_distance, neighbor))
+
+    return [], visited
+
+def dijkstra_instrumented(graph, start, end, on_expand=None):
+    """
+    Same search as `dijkstra`, counting heap traffic and timing each phase.
+    Kept separate so the plain solver pays nothing for it.
+
+    Args:
+        on_expand (callable): Optional hook called as
+            `on_expand(node, distance, frontier_size)` for each expanded node.
+
+    Returns:
+        SolveResult: Unpacks as `(path, visited)`.
+    """
+    search_started = time.perf_counter()
+    priority_queue = [(0, start)]
+    came_from = {start: None}
+    cost_so_far = {start: 0}
+    visited = set()
+    heap_pushes, heap_pops, stale_pops, peak_frontier = 1, 0, 0, 1
+    found = False
+
+    while priority_queue:
+        (distance, current_node) = heapq.heappop(priority_queue)
+        heap_pops += 1
+
+        if current_node in visited:
+            stale_pops += 1
+            continue
+
+        visited.add(current_node)
+        if on_expand is not None:
+            on_expand(current_node, distance, len(priority_queue))
+
+        if current_node == end:
+            found = True
+            break
+
+        for neighbor in graph.get(current_node, []):
+            new_distance = distance + 1
+            if neighbor not in cost_so_far or new_distance < cost_so_far[neighbor]:
+                cost_so_far[neighbor] = new_distance
+                came_from[neighbor] = current_node
+                heapq.heappush(priority_queue, (new_distance, neighbor))
+                heap_pushes += 1
+        if len(priority_queue) > peak_frontier:
+            peak_frontier = len(priority_queue)
+
+    path_started = time.perf_counter()
+    path = _reconstruct_path(came_from, end) if found else []
+    finished = time.perf_counter()
+
+    return SolveResult(path, visited, heap_pushes, heap_pops, stale_pops, peak_frontier,
+                       {'search': path_started - search_started,
+                        'path': finished - path_started})
+
+def dijkstra_weighted(graph, start, end):
+    """
+    Dijkstra's algorithm on a weighted adjacency list, as returned by
+    `Maze.to_weighted_graph`, using a binary heap.
+
+    Returns:
+        (list, set): A tuple containing the final path and the set of all visited nodes.
+    """
+    priority_queue = [(0, start)]
+    came_from = {start: None}
+    cost_so_far = {start: 0}
+    visited = set()
+
+    while priority_queue:
+        (distance, current_node) = heapq.heappop(priority_queue)
+
+        if current_node in visited:
+            continue
+
+        visited.add(current_node)
+
+        if current_node == end:
+            return _reconstruct_path(came_from, end), visited
+
+        for neighbor, cost in graph.get(current_node, []):
+            new_distance = distance + cost
+            if neighbor not in cost_so_far or new_distance < cost_so_far[neighbor]:
+                cost_so_far[neighbor] = new_distance
+                came_from[neighbor] = current_node
+                heapq.heappush(priority_queue, (new_distance, neighbor))
+
+    return [], visited
+
+def dial_dijkstra(graph, start, end, max_cost=MAX_COST):
+    """
+    Dijkstra's algorithm with a bucket queue (Dial's algorithm), for weighted
+    graphs whose costs are integers from 1 to `max_cost`.
+
+    Every pending node lies within `max_cost` of the current distance, so a
+    ring of `max_cost + 1` buckets replaces the heap and each push and pop is
+    O(1), giving O(V + E + D) for a path of total cost D. Raises ValueError
+    on a cost outside that range.
+
+    Returns:
+        (list, set): A tuple containing the final path and the set of all visited nodes.
+    """
+    n_buckets = max_cost + 1
+    buckets = [[] for _ in range(n_buckets)]
+    buckets[0].append(start)
+    came_from = {start: None}
+    cost_so_far = {start: 0}
+    visited = set()
+    n_pending = 1
+    distance = 0
+
+    while n_pending:
+        bucket = buckets[distance % n_buckets]
+        while bucket:
+            current_node = bucket.pop()
+            n_pending -= 1
+
+            # Entries left behind by a later, cheaper push.
+            if current_node in visited:
+                continue
+
+            visited.add(current_node)
+
+            if current_node == end:
+                return _reconstruct_path(came_from, end), visited
+
+            for neighbor, cost in graph.get(current_node, []):
+                if not 1 <= cost <= max_cost:
+                    # Outside the bucket ring; the result would be wrong.
+                    raise ValueError('edge cost {} is not between 1 and {}'.format(
+                        cost, max_cost))
+                new_distance = distance + cost
+                if neighbor not in cost_so_far or new_distance < cost_so_far[neighbor]:
+                    cost_so_far[neighbor] = new_distance
+                    came_from[neighbor] = current_node
+                    buckets[new_distance % n_buckets].append(neighbor)
+                    n_pending += 1
+        distance += 1
 
     return [], visited
@@ -0,0 +1,137 @@
+from array import array
+
+from maze import N_BIT, S_BIT, W_BIT, E_BIT, MAX_COST, load_numpy
+
+class DistanceField(object):
+    """
+    Distances from one source cell to every cell of a maze, with the
+    predecessor of each cell on a shortest path, as computed by
+    `distance_field`. Once built, the path to and distance of any cell are
+    read without searching again.
+
+    Attributes:
+        source (tuple): The source cell (x, y).
+        flat_distances (array): Distance of each cell, in row-major order
+            like `Maze.grid`; -1 for cells that cannot be reached.
+        flat_parents (array): Index of the previous cell on a shortest path
+            from the source; -1 for the source and unreachable cells.
+        distances, parents: The same as `height x width` NumPy arrays,
+            indexed `[y, x]`, sharing memory with the flat arrays. Without
+            NumPy they are the flat arrays themselves.
+        max_distance (int): Largest finite distance.
+    """
+
+    def __init__(self, width, height, source, flat_distances, flat_parents):
+        self.width = width
+        self.height = height
+        self.source = source
+        self.flat_distances = flat_distances
+        self.flat_parents = flat_parents
+        self.max_distance = max(flat_distances) if flat_distances else 0
+        np = load_numpy()
+        if np is not None:
+            self.distances = np.frombuffer(flat_distances, dtype=np.int32).reshape(height, width)
+            self.parents = np.frombuffer(flat_parents, dtype=np.int32).reshape(height, width)
+        else:
+            self.distances = flat_distances
+            self.parents = flat_parents
+
+    def distance(self, node):
+        """
+        Returns the length of the shortest path from the source to `node`,
+        or None if it cannot be reached.
+        """
+        x, y = node
+        distance = self.flat_distances[x + y * self.width]
+        return distance if distance >= 0 else None
+
+    def path(self, node):
+        """
+        Returns the shortest path from the source to `node`, or an empty list
+        if there is none, in time proportional to its length.
+        """
+        x, y = node
+        width = self.width
+        index = x + y * width
+        if self.flat_distances[index] < 0:
+            return []
+        parents = self.flat_parents
+        path = []
+        while index >= 0:
+            path.append((index % width, index // width))
+            index = parents[index]
+        path.reverse()
+        return path
+
+def distance_field(maze, source):
+    """
+    Runs a single full search from `source` over the whole maze and returns
+    a `DistanceField`. Walls are read straight from `maze.grid`, without
+    building a graph.
+
+    Without terrain costs this is a breadth-first search; with them, every
+    step costs the cost of the cell stepped into, as in
+    `Maze.to_weighted_graph`, and Dijkstra's algorithm with a bucket queue
+    is used.
+    """
+    width, height = maze.width, maze.height
+    x, y = source
+    if not (0 <= x < width and 0 <= y < height):
+        raise ValueError('source {} is outside the {}x{} maze'.format(source, width, height))
+
+    grid = maze.grid
+    n_cells = len(grid)
+    distances = array('i', [-1]) * n_cells
+    parents = array('i', [-1]) * n_cells
+    start = x + y * width
+    distances[start] = 0
+    # (offset, wall bit) per direction, in the usual N, S, W, E order.
+    steps = [(-width, N_BIT), (width, S_BIT), (-1, W_BIT), (1, E_BIT)]
+
+    if maze.costs is None:
+        frontier = [start]
+        distance = 0
+        while frontier:
+            distance += 1
+            next_frontier = []
+            for cell in frontier:
+                walls = grid[cell]
+                for offset, bit in steps:
+                    if not walls & bit:
+                        neighbor = cell + offset
+                        if distances[neighbor] < 0:
+                            distances[neighbor] = distance
+                            parents[neighbor] = cell
+                            next_frontier.append(neighbor)
+            frontier = next_frontier
+    else:
+        costs = maze.costs
+        n_buckets = MAX_COST + 1
+        buckets = [[] for _ in range(n_buckets)]
+        buckets[0].append(start)
+        done = bytearray(n_cells)
+        n_pending = 1
+        distance = 0
+        while n_pending:
+            bucket = buckets[distance % n_buckets]
+            while bucket:
+                cell = bucket.pop()
+                n_pending -= 1
+                # Entries left behind by a later, cheaper push.
+                if done[cell]:
+                    continue
+                done[cell] = 1
+                walls = grid[cell]
+                for offset, bit in steps:
+                    if not walls & bit:
+                        neighbor = cell + offset
+                        new_distance = distance + costs[neighbor]
+                        old_distance = distances[neighbor]
+                        if old_distance < 0 or new_distance < old_distance:
+                            distances[neighbor] = new_distance
+                            parents[neighbor] = cell
+                            buckets[new_distance % n_buckets].append(neighbor)
+                            n_pending += 1
+            distance += 1
+
+    return DistanceField(width, height, source, distances, parents)
@@ -0,0 +1,80 @@
+"""
+Streaming perfect maze generation with Eller's algorithm.
+
+Rows are produced one at a time and only the set membership of the current
+row is remembered, so memory depends on the width alone and mazes far larger
+than RAM can be written straight to disk.
+
+Algorithm from http://www.neocomputer.org/projects/eller.html
+"""
+import random
+
+import mazefile
+from maze import N_BIT, S_BIT, W_BIT, E_BIT, ALL_WALLS
+
+def eller_rows(width, height, seed=None):
+    """
+    Yields the rows of a random perfect maze, top to bottom, each as a
+    `bytearray` of wall flags in the `Maze.grid` layout.
+    """
+    rng = random.Random(seed)
+
+    # Set id of each cell in the current row, and the cells of each set.
+    sets = list(range(width))
+    next_set_id = width
+    open_south = bytearray(width)
+
+    for y in range(height):
+        is_last_row = y == height - 1
+        row = bytearray([ALL_WALLS]) * width
+        for x in range(width):
+            if open_south[x]:
+                row[x] &= ~N_BIT
+
+        members = {}
+        for x, set_id in enumerate(sets):
+            members.setdefault(set_id, []).append(x)
+
+        # Randomly join adjacent cells of different sets. The last row must
+        # join everything that is still apart.
+        for x in range(width - 1):
+            a, b = sets[x], sets[x + 1]
+            if a != b and (is_last_row or rng.random() < 0.5):
+                row[x] &= ~E_BIT
+                row[x + 1] &= ~W_BIT
+                if len(members[a]) < len(members[b]):
+                    a, b = b, a
+                for member in members[b]:
+                    sets[member] = a
+                members[a].extend(members.pop(b))
+
+        if not is_last_row:
+            # Every set must extend down at least once so that no region is
+            # sealed off.
+            open_south = bytearray(width)
+            for set_cells in members.values():
+                down = [x for x in set_cells if rng.random() < 0.5]
+                if not down:
+                    down = [rng.choice(set_cells)]
+                for x in down:
+                    open_south[x] = 1
+                    row[x] &= ~S_BIT
+
+            for x in range(width):
+                if not open_south[x]:
+                    sets[x] = next_set_id
+                    next_set_id += 1
+
+        yield row
+
+def generate_to_file(path, width, height, seed=None):
+    """
+    Generates a perfect maze with Eller's algorithm and writes it to `path`
+    in the `mazefile` format, one row at a time, ready for `Maze.load`.
+    Returns the seed used, which is chosen at random if not given and
+    recorded in the file.
+    """
+    if seed is None:
+        seed = random.randrange(2 ** 63)
+    mazefile.write_rows(path, width, height, eller_rows(width, height, seed), seed)
+    return seed
@@ -0,0 +1,221 @@
+"""
+Perfect maze generation algorithms for `Maze.generate(..., algorithm=...)`.
+
+Every generator takes a maze with all walls standing and a random number
+generator (a `random.Random` instance, or the `random` module itself) and
+knocks down walls in place until the maze is a spanning tree of its cells.
+
+- backtracker: randomized depth-first search, long winding corridors.
+- kruskal: randomized Kruskal, many short dead ends.
+- wilson: loop-erased random walks, a uniform pick among all spanning
+  trees, without the bias of the other two.
+
+`generate_tiled` spreads any of them over several processes for very large
+mazes.
+"""
+import os
+import random
+
+from maze import Maze, N_BIT, S_BIT, W_BIT, E_BIT, load_numpy
+
+def backtracker(maze, rng):
+    """
+    Randomized depth-first search, see `Maze.randomize`.
+    """
+    maze.randomize(rng)
+
+def _shuffled_edges(width, height, rng):
+    """
+    Returns every inner wall of the grid in random order, as `2 * cell` for
+    the wall east of `cell` and `2 * cell + 1` for the wall south of it.
+
+    NumPy, when available, only builds the list of walls; the order always
+    comes from `rng.shuffle`, so a seed gives the same maze either way.
+    """
+    n_cells = width * height
+    np = load_numpy()
+    if np is not None:
+        edges = np.arange(2 * n_cells, dtype=np.int64)
+        cells = edges >> 1
+        valid = np.where(edges & 1, cells < n_cells - width, cells % width != width - 1)
+        edges = edges[valid].tolist()
+    else:
+        edges = [edge for edge in range(2 * n_cells)
+                 if ((edge >> 1) < n_cells - width if edge & 1
+                     else (edge >> 1) % width != width - 1)]
+    rng.shuffle(edges)
+    return edges
+
+def kruskal(maze, rng):
+    """
+    Randomized Kruskal: walls are visited in random order and knocked down
+    whenever the cells on both sides are not connected yet. Connectivity is
+    tracked by a union-find over a flat list of parent indexes, with path
+    halving and union by size.
+    """
+    width, grid = maze.width, maze.grid
+    n_cells = len(grid)
+    parent = list(range(n_cells))
+    size = [1] * n_cells
+    remaining = n_cells - 1
+
+    for edge in _shuffled_edges(width, maze.height, rng):
+        if not remaining:
+            break
+        cell = edge >> 1
+        other = cell + width if edge & 1 else cell + 1
+
+        a = cell
+        while parent[a] != a:
+            parent[a] = parent[parent[a]]
+            a = parent[a]
+        b = other
+        while parent[b] != b:
+            parent[b] = parent[parent[b]]
+            b = parent[b]
+        if a == b:
+            continue
+
+        if size[a] < size[b]:
+            a, b = b, a
+        parent[b] = a
+        size[a] += size[b]
+        remaining -= 1
+
+        if edge & 1:
+            grid[cell] &= ~S_BIT
+            grid[other] &= ~N_BIT
+        else:
+            grid[cell] &= ~E_BIT
+            grid[other] &= ~W_BIT
+
+    maze.version += 1
+
+def wilson(maze, rng):
+    """
+    Wilson's algorithm: from each cell not yet in the maze, random walk
+    until the maze is hit, then add the walk with its loops erased. Only the
+    last direction taken out of each cell is remembered, which erases loops
+    for free.
+
+    Algorithm from https://doi.org/10.1145/237814.237880
+    """
+    width, height, grid = maze.width, maze.height, maze.grid
+    n_cells = len(grid)
+    # Per direction: cell offset, wall bit on this side, wall bit opposite.
+    steps = [(-width, N_BIT, S_BIT), (width, S_BIT, N_BIT),
+             (-1, W_BIT, E_BIT), (1, E_BIT, W_BIT)]
+    getrandbits = rng.getrandbits
+
+    in_maze = bytearray(n_cells)
+    direction = bytearray(n_cells)
+    in_maze[rng.randrange(n_cells)] = 1
+
+    for start in range(n_cells):
+        if in_maze[start]:
+            continue
+
+        cell = start
+        while not in_maze[cell]:
+            x = cell % width
+            while True:
+                d = getrandbits(2)
+                if ((d == 0 and cell >= width) or (d == 1 and cell < n_cells - width)
+                        or (d == 2 and x > 0) or (d == 3 and x < width - 1)):
+                    break
+            direction[cell] = d
+            cell += steps[d][0]
+
+        cell = start
+        while not in_maze[cell]:
+            offset, wall, opposite = steps[direction[cell]]
+            in_maze[cell] = 1
+            grid[cell] &= ~wall
+            cell += offset
+            grid[cell] &= ~opposite
+
+    maze.version += 1
+
+# Generators available to `Maze.generate`, by name.
+GENERATORS = {'backtracker': backtracker,
+              'kruskal': kruskal,
+              'wilson': wilson}
+
+def _generate_tile(task):
+    """
+    Runs in a worker process: returns the wall grid of one tile.
+    """
+    width, height, algorithm, seed = task
+    return bytes(Maze.generate(width, height, algorithm, seed=seed).grid)
+
+def generate_tiled(width, height, algorithm='backtracker', seed=None, workers=None,
+                   tile_size=256):
+    """
+    Returns a random perfect maze built from `tile_size` square tiles (smaller
+    along the right and bottom edges), each generated independently with the
+    named algorithm in a pool of `workers` processes (all CPUs by default).
+
+    The tiles are then joined along a random spanning tree of the tile grid,
+    itself a small maze built with the same algorithm: each of its open walls
+    becomes one opening at a random spot of the boundary between the two
+    tiles. Trees joined by the edges of a tree form a tree, so the result is
+    still connected and free of cycles.
+
+    With the same `seed` and `tile_size`, the maze is the same whatever the
+    number of workers, but it differs from `Maze.generate` with that seed.
+    """
+    if tile_size < 1:
+        raise ValueError('tile_size must be positive, got {}'.format(tile_size))
+    if algorithm not in GENERATORS:
+        raise ValueError('unknown algorithm {!r}, expected one of: {}'.format(
+            algorithm, ', '.join(sorted(GENERATORS))))
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    rng = random.Random(seed)
+    n_columns = -(-width // tile_size)
+    n_rows = -(-height // tile_size)
+    # (x, y, width, height) of each tile, in row-major order.
+    tiles = [(column * tile_size, row * tile_size,
+              min(tile_size, width - column * tile_size),
+              min(tile_size, height - row * tile_size))
+             for row in range(n_rows) for column in range(n_columns)]
+    tasks = [(tile_width, tile_height, algorithm, rng.getrandbits(64))
+             for _, _, tile_width, tile_height in tiles]
+    layout = Maze.generate(n_columns, n_rows, algorithm, seed=rng.getrandbits(64))
+
+    if workers == 1 or len(tasks) == 1:
+        tile_grids = map(_generate_tile, tasks)
+        executor = None
+    else:
+        # Imported here, as in `batch.solve_many`, to keep imports cheap.
+        from concurrent.futures import ProcessPoolExecutor
+
+        executor = ProcessPoolExecutor(max_workers=workers)
+        tile_grids = executor.map(_generate_tile, tasks,
+                                  chunksize=max(1, len(tasks) // (workers * 4)))
+
+    grid = bytearray(width * height)
+    try:
+        for (x, y, tile_width, tile_height), tile_grid in zip(tiles, tile_grids):
+            for row in range(tile_height):
+                start = (y + row) * width + x
+                grid[start:start + tile_width] = tile_grid[row * tile_width:(row + 1) * tile_width]
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    for index, (x, y, tile_width, tile_height) in enumerate(tiles):
+        walls = layout.grid[index]
+        if not walls & E_BIT:
+            # Opening at a random row of the boundary with the tile on the
+            # right.
+            cell = (y + rng.randrange(tile_height)) * width + x + tile_width - 1
+            grid[cell] &= ~E_BIT
+            grid[cell + 1] &= ~W_BIT
+        if not walls & S_BIT:
+            cell = (y + tile_height - 1) * width + x + rng.randrange(tile_width)
+            grid[cell] &= ~S_BIT
+            grid[cell + width] &= ~N_BIT
+
+    return Maze(width, height, grid=grid, seed=seed)
@@ -0,0 +1,163 @@
+"""
+Incremental replanning with Lifelong Planning A* (LPA*).
+
+Algorithm from Koenig, Likhachev and Furcy, "Lifelong Planning A*",
+https://doi.org/10.1016/j.artint.2003.12.001
+"""
+import heapq
+
+from astar import heuristic
+from maze import N_BIT, S_BIT, W_BIT, E_BIT
+
+INFINITY = float('inf')
+
+class LPAStar(object):
+    """
+    Shortest path between two fixed cells of a maze that stays up to date as
+    walls are opened and closed. The solver subscribes to the maze's wall
+    edits and, on the next `solve`, only re-expands the cells whose distance
+    from the start actually changed, instead of searching again from
+    scratch.
+
+    Neighbors are read from the wall grid directly, so no graph has to be
+    rebuilt after an edit. Every step costs 1.
+    """
+
+    def __init__(self, maze, start, end):
+        self.maze = maze
+        self.start = start
+        self.end = end
+        # Distance from the start as of the last expansion, and one-step
+        # lookahead value; missing entries are infinite.
+        self.g = {}
+        self.rhs = {start: 0}
+        # Heap of (key, node) with lazy deletion: an entry is current only if
+        # `queued[node]` still holds its key.
+        self.queue = []
+        self.queued = {}
+        # Path of the last `solve`, while it is known to still be valid.
+        self._path_cache = None
+        self._push(start)
+        maze.subscribe(self._on_wall_change)
+
+    def close(self):
+        """
+        Stops following the maze's wall edits.
+        """
+        self.maze.unsubscribe(self._on_wall_change)
+
+    def _neighbors(self, node):
+        """
+        Yields the cells reachable from `node` in one step.
+        """
+        x, y = node
+        walls = self.maze.grid[x + y * self.maze.width]
+        if not walls & N_BIT:
+            yield (x, y - 1)
+        if not walls & S_BIT:
+            yield (x, y + 1)
+        if not walls & W_BIT:
+            yield (x - 1, y)
+        if not walls & E_BIT:
+            yield (x + 1, y)
+
+    def _key(self, node):
+        best = min(self.g.get(node, INFINITY), self.rhs.get(node, INFINITY))
+        return (best + heuristic(node, self.end), best)
+
+    def _push(self, node):
+        key = self._key(node)
+        self.queued[node] = key
+        heapq.heappush(self.queue, (key, node))
+
+    def _top_key(self):
+        """
+        Returns the smallest current key in the queue, dropping stale
+        entries on the way.
+        """
+        while self.queue:
+            key, node = self.queue[0]
+            if self.queued.get(node) == key:
+                return key
+            heapq.heappop(self.queue)
+        return (INFINITY, INFINITY)
+
+    def _update(self, node):
+        """
+        Recomputes the lookahead value of `node` and (re)queues it if it is
+        locally inconsistent.
+        """
+        if node != self.start:
+            g = self.g
+            self.rhs[node] = min((g.get(neighbor, INFINITY) + 1
+                                  for neighbor in self._neighbors(node)), default=INFINITY)
+        self.queued.pop(node, None)
+        if self.g.get(node, INFINITY) != self.rhs.get(node, INFINITY):
+            self._push(node)
+
+    def _on_wall_change(self, a, b, is_open):
+        # The step cost between `a` and `b` changed in both directions.
+        if not is_open:
+            # The cached path may go through the new wall.
+            self._path_cache = None
+        self._update(a)
+        self._update(b)
+
+    def solve(self):
+        """
+        Brings the solution up to date with the maze.
+
+        Returns:
+            (list, set): The path from start to end (an empty list if there
+            is none), and the set of nodes expanded by this call only. The
+            path may be shared with earlier calls and must not be modified.
+        """
+        visited = set()
+        end = self.end
+        while (self._top_key() < self._key(end)
+               or self.rhs.get(end, INFINITY) != self.g.get(end, INFINITY)):
+            _, node = heapq.heappop(self.queue)
+            del self.queued[node]
+            visited.add(node)
+
+            g, rhs = self.g.get(node, INFINITY), self.rhs.get(node, INFINITY)
+            if g > rhs:
+                # Got shorter: settle it, and let neighbors pick it up.
+                self.g[node] = rhs
+                for neighbor in self._neighbors(node):
+                    self._update(neighbor)
+            else:
+                # Got longer: forget it, and let it and its neighbors look
+                # for another way in.
+                self.g.pop(node, None)
+                self._update(node)
+                for neighbor in self._neighbors(node):
+                    self._update(neighbor)
+
+        if visited or self._path_cache is None:
+            self._path_cache = self._path()
+        return self._path_cache, visited
+
+    def _path(self):
+        """
+        Follows the smallest distances back from the end to the start.
+        """
+        g = self.g
+        if g.get(self.end, INFINITY) == INFINITY:
+            return []
+        path = [self.end]
+        node = self.end
+        while node != self.start:
+            # Any neighbor one step closer to the start will do.
+            distance = g[node] - 1
+            for neighbor in self._neighbors(node):
+                if g.get(neighbor) == distance:
+                    break
+            else:
+                # Only reachable if `g` was left inconsistent by an update.
+                raise AssertionError('no neighbor of {} is one step closer to {}'.format(
+                    node, self.start))
+            node = neighbor
+            path.append(node)
+        path.reverse()
+        return path
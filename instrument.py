@@ -0,0 +1,54 @@
+class SolveResult(object):
+    """
+    Outcome of an instrumented search: the usual path and visited set plus
+    counters describing the work done. Unpacks like the `(path, visited)`
+    tuple returned by the plain solvers.
+
+    Attributes:
+        path (list): The final path, or an empty list if there is none.
+        visited (set): Every node expanded.
+        heap_pushes (int): Entries pushed on the priority queue.
+        heap_pops (int): Entries popped from the priority queue.
+        stale_pops (int): Popped entries that were outdated, because the node
+            had already been expanded or was pushed again with a lower cost.
+        peak_frontier (int): Largest size reached by the priority queue.
+        timings (dict): Seconds spent in each phase, 'search' and 'path'.
+    """
+
+    __slots__ = ('path', 'visited', 'heap_pushes', 'heap_pops', 'stale_pops',
+                 'peak_frontier', 'timings')
+
+    def __init__(self, path, visited, heap_pushes=0, heap_pops=0, stale_pops=0,
+                 peak_frontier=0, timings=None):
+        self.path = path
+        self.visited = visited
+        self.heap_pushes = heap_pushes
+        self.heap_pops = heap_pops
+        self.stale_pops = stale_pops
+        self.peak_frontier = peak_frontier
+        self.timings = timings if timings is not None else {}
+
+    def __iter__(self):
+        # path, visited = result
+        yield self.path
+        yield self.visited
+
+    def __repr__(self):
+        return ('<SolveResult path={} visited={} pushes={} pops={} stale={} '
+                'peak_frontier={}>'.format(len(self.path), len(self.visited),
+                                           self.heap_pushes, self.heap_pops,
+                                           self.stale_pops, self.peak_frontier))
+
+    def counters(self):
+        """
+        Returns the counters and timings as a flat dict, e.g. for JSON.
+        """
+        counters = {'path_length': len(self.path),
+                    'visited': len(self.visited),
+                    'heap_pushes': self.heap_pushes,
+                    'heap_pops': self.heap_pops,
+                    'stale_pops': self.stale_pops,
+                    'peak_frontier': self.peak_frontier}
+        for phase, seconds in self.timings.items():
+            counters[phase + '_seconds'] = seconds
+        return counters
@@ -1,31 +1,103 @@
+if __name__ == '__main__':
+    # Run as a script: hand over to the `maze` module right away, so that
+    # this file is not executed a second time when other modules import it.
+    import sys
+    import time
+
+    _started = time.perf_counter()
+    import maze
+    sys.exit(maze.main(sys.argv[1:], _started))
+
+import hashlib
 import random
+from array import array
+from collections.abc import Mapping
+
+import mazefile
+
+# NumPy is optional, and imported on first use by `load_numpy` so that
+# headless startup does not pay for it.
+_numpy = False
+
+def load_numpy():
+    """
+    Returns the numpy module, or None if it is not installed. It is only
+    imported by the first call.
+    """
+    global _numpy
+    if _numpy is False:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _numpy = numpy
+    return _numpy
 
 # Easy to read representation for each cardinal direction.
 N, S, W, E = ('n', 's', 'w', 'e')
 
+# Bit flag for each wall in the packed wall grid. A cell with all walls
+# standing is stored as ALL_WALLS.
+WALL_BITS = {N: 1, S: 2, W: 4, E: 8}
+# The same flags by name, for the loops that work on the packed grid.
+N_BIT, S_BIT, W_BIT, E_BIT = WALL_BITS[N], WALL_BITS[S], WALL_BITS[W], WALL_BITS[E]
+ALL_WALLS = 0b1111
+
+# Highest terrain cost a cell may have; weights stay small integers so the
+# bucket queue solvers can use one bucket per distance.
+MAX_COST = mazefile.MAX_COST
+
 class Cell(object):
     """
-    Class for each individual cell. Knows only its position and which walls are
-    still standing.
+    Thin view on an individual cell of a maze. Knows only its position and
+    reads which walls are still standing from the maze's packed wall grid.
     """
-    def __init__(self, x, y, walls):
+    __slots__ = ('maze', 'x', 'y')
+
+    def __init__(self, maze, x, y):
+        self.maze = maze
         self.x = x
         self.y = y
-        self.walls = set(walls)
 
     def __repr__(self):
         # <15, 25 (es  )>
         return '<{}, {} ({:4})>'.format(self.x, self.y, ''.join(sorted(self.walls)))
 
+    def __eq__(self, other):
+        return (isinstance(other, Cell) and self.maze is other.maze
+                and self.x == other.x and self.y == other.y)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((self.x, self.y))
+
     def __contains__(self, item):
         # N in cell
-        return item in self.walls
+        return bool(self.maze.grid[self.index] & WALL_BITS[item])
+
+    @property
+    def index(self):
+        """
+        Position of this cell in the maze's wall grid.
+        """
+        return self.x + self.y * self.maze.width
+
+    @property
+    def walls(self):
+        """
+        Frozen set of the walls still standing. Use `connect` to knock them
+        down.
+        """
+        bits = self.maze.grid[self.index]
+        return frozenset(d for d, bit in WALL_BITS.items() if bits & bit)
 
     def is_full(self):
         """
         Returns True if all walls are still standing.
         """
-        return len(self.walls) == 4
+        return self.maze.grid[self.index] == ALL_WALLS
 
     def _wall_to(self, other):
         """
@@ -48,8 +120,117 @@ class Cell(object):
         """
         Removes the wall between two adjacent cells.
         """
-        other.walls.remove(other._wall_to(self))
-        self.walls.remove(self._wall_to(other))
+        grid = self.maze.grid
+        wall = self._wall_to(other)
+        if not grid[self.index] & WALL_BITS[wall]:
+            raise KeyError(wall)
+        grid[other.index] &= ~WALL_BITS[other._wall_to(self)]
+        grid[self.index] &= ~WALL_BITS[wall]
+        self.maze.version += 1
+        self.maze._notify((self.x, self.y), (other.x, other.y), True)
+
+class _CellSequence(object):
+    """
+    Read-only sequence of `Cell` views over a maze, in row-major order. Views
+    are created on access, so no per-cell objects are kept alive.
+    """
+    __slots__ = ('maze',)
+
+    def __init__(self, maze):
+        self.maze = maze
+
+    def __len__(self):
+        return len(self.maze.grid)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        width = self.maze.width
+        return Cell(self.maze, index % width, index // width)
+
+    def __iter__(self):
+        maze = self.maze
+        for y in range(maze.height):
+            for x in range(maze.width):
+                yield Cell(maze, x, y)
+
+class _GraphView(Mapping):
+    """
+    Read-only adjacency mapping over a maze, interchangeable with
+    `Maze.to_graph()` (or `to_weighted_graph()` when `weighted`) for the
+    solvers: `view[(x, y)]` and `view.get((x, y), [])` return the open
+    neighbors in the same N, S, W, E order, computed from the wall flags on
+    each access. Nothing is built up front, so a short search in a huge maze
+    only pays for the cells it touches, and wall edits show up at once.
+    """
+    __slots__ = ('maze', 'weighted')
+
+    def __init__(self, maze, weighted=False):
+        self.maze = maze
+        self.weighted = weighted
+
+    def _neighbors(self, node):
+        """
+        Returns the neighbor list of `node`, or None if it is not a cell of
+        the maze.
+        """
+        try:
+            x, y = node
+            maze = self.maze
+            if not (0 <= x < maze.width and 0 <= y < maze.height):
+                return None
+        except (TypeError, ValueError):
+            return None
+        bits = maze.grid[x + y * maze.width]
+        neighbors = []
+        if not bits & N_BIT:
+            neighbors.append((x, y - 1))
+        if not bits & S_BIT:
+            neighbors.append((x, y + 1))
+        if not bits & W_BIT:
+            neighbors.append((x - 1, y))
+        if not bits & E_BIT:
+            neighbors.append((x + 1, y))
+        if self.weighted:
+            costs, width = maze.costs, maze.width
+            if costs is None:
+                return [(neighbor, 1) for neighbor in neighbors]
+            return [(neighbor, costs[neighbor[0] + neighbor[1] * width])
+                    for neighbor in neighbors]
+        return neighbors
+
+    def __getitem__(self, node):
+        neighbors = self._neighbors(node)
+        if neighbors is None:
+            raise KeyError(node)
+        return neighbors
+
+    def get(self, node, default=None):
+        neighbors = self._neighbors(node)
+        return default if neighbors is None else neighbors
+
+    def __contains__(self, node):
+        try:
+            x, y = node
+            return 0 <= x < self.maze.width and 0 <= y < self.maze.height
+        except (TypeError, ValueError):
+            return False
+
+    def __len__(self):
+        return len(self.maze.grid)
+
+    def __iter__(self):
+        width, height = self.maze.width, self.maze.height
+        for y in range(height):
+            for x in range(width):
+                yield (x, y)
+
+    def __repr__(self):
+        return '<{} of {}x{} maze>'.format(
+            'weighted graph view' if self.weighted else 'graph view',
+            self.maze.width, self.maze.height)
 
 class Maze(object):
     """
@@ -73,16 +254,179 @@ class Maze(object):
                               'n': '╵',
                               'w': '╴'}
 
-    def __init__(self, width=20, height=10):
+    def __init__(self, width=20, height=10, grid=None, seed=None, costs=None):
         """
         Creates a new maze with the given sizes, with all walls standing.
+
+        Walls are kept as 4-bit flags (see `WALL_BITS`) in one contiguous
+        `bytearray`, one byte per cell in row-major order. An existing grid
+        in that layout can be passed instead, along with the seed it was
+        generated from, if known.
+
+        `costs` is an optional grid in the same layout holding the terrain
+        cost of stepping into each cell, from 1 to MAX_COST. Without it every
+        step costs 1.
         """
         self.width = width
         self.height = height
-        self.cells = []
-        for y in range(self.height):
-            for x in range(self.width):
-                self.cells.append(Cell(x, y, [N, S, E, W]))
+        if grid is None:
+            grid = bytearray([ALL_WALLS]) * (width * height)
+        elif len(grid) != width * height:
+            raise ValueError('wall grid has {} cells, expected {}x{}'.format(
+                len(grid), width, height))
+        if costs is not None:
+            mazefile.check_costs(costs, width, height)
+        self.grid = grid
+        self.costs = costs
+        self.seed = seed
+        # Path and `mmap` of the file backing `grid`, when memory-mapped.
+        self._mapped_from = None
+        self._mmap = None
+        # Shared memory block holding `grid`, see `share` and `attach`, and
+        # whether this process created it.
+        self._shm = None
+        self._shm_owner = False
+        # Bumped every time walls or costs change, so derived data can be
+        # invalidated.
+        self.version = 0
+        self._fingerprint = None
+        # Callbacks told about wall edits, see `subscribe`.
+        self._listeners = []
+
+    def __getstate__(self):
+        """
+        Pickles the wall and cost grids by value, except for shared mazes,
+        which are attached again by name when unpickled, and unmodified
+        memory-mapped mazes, which are mapped again from their file.
+        """
+        state = self.__dict__.copy()
+        state['_mmap'] = None
+        state['_listeners'] = []
+        state['_shm'] = None
+        state['_shm_owner'] = False
+        if self._shm is not None:
+            state['grid'] = None
+            state['costs'] = None
+            state['_mapped_from'] = None
+            state['_shared_name'] = self._shm.name
+        elif self._mmap is not None and self.version == 0:
+            state['grid'] = None
+            state['costs'] = None
+        else:
+            state['_mapped_from'] = None
+            if not isinstance(self.grid, bytearray):
+                state['grid'] = bytearray(self.grid)
+            if self.costs is not None and not isinstance(self.costs, bytearray):
+                state['costs'] = bytearray(self.costs)
+        return state
+
+    def __setstate__(self, state):
+        shared_name = state.pop('_shared_name', None)
+        self.__dict__.update(state)
+        if shared_name is not None:
+            _, _, _, self.grid, self.costs, self._shm = mazefile.attach_shared(shared_name)
+        elif self.grid is None:
+            _, _, _, self.grid, self.costs, self._mmap = mazefile.read_grid(
+                self._mapped_from, use_mmap=True)
+
+    def save(self, path):
+        """
+        Writes the maze to `path` in the binary `mazefile` format.
+        """
+        mazefile.write_grid(path, self.width, self.height, self.grid, self.seed,
+                            self.costs)
+
+    @staticmethod
+    def load(path, mmap=False):
+        """
+        Reads a maze written by `save` or by the streaming generators.
+
+        With `mmap=True` the file is memory-mapped copy-on-write and the maze
+        reads its walls straight from the mapped pages, so opening is
+        instant whatever the size and only the pages that are touched are
+        ever read. Changes to such a maze stay in memory. Call `close` to
+        release the mapping early.
+        """
+        width, height, seed, grid, costs, mapping = mazefile.read_grid(path, use_mmap=mmap)
+        maze = Maze(width, height, grid, seed, costs)
+        if mapping is not None:
+            maze._mapped_from = path
+            maze._mmap = mapping
+        return maze
+
+    def share(self, name=None):
+        """
+        Publishes the maze in a new shared memory block, in the `mazefile`
+        layout, and returns the block's name. Other processes get a view of
+        it, without copying, with `Maze.attach(name)`; pickling a shared maze
+        sends only the name, so process pools get it for free.
+
+        From then on this maze reads and writes its walls in the block, and
+        wall edits made by any process show up in all of them. Only the
+        editing process bumps its `version`, though, so edit before sharing
+        or coordinate readers yourself.
+
+        This maze owns the block: `close` unlinks it. Processes already
+        attached keep working until they close their own view, but new
+        attaches fail. Calling `share` again returns the same name.
+        """
+        if self._shm is not None:
+            return self._shm.name
+        shared, grid, costs = mazefile.create_shared(self.width, self.height, self.grid,
+                                                     self.seed, self.costs, name)
+        self.close()
+        self.grid, self.costs = grid, costs
+        self._shm = shared
+        self._shm_owner = True
+        self._mapped_from = None
+        return shared.name
+
+    @staticmethod
+    def attach(name):
+        """
+        Returns a maze viewing the shared memory block published by `share`
+        under `name`. Nothing is copied, so this takes the same time whatever
+        the size. Call `close` when done; the block stays available to the
+        others.
+        """
+        width, height, seed, grid, costs, shared = mazefile.attach_shared(name)
+        maze = Maze(width, height, grid, seed, costs)
+        maze._shm = shared
+        return maze
+
+    @property
+    def shared_name(self):
+        """
+        Name of the shared memory block holding this maze, or None.
+        """
+        return self._shm.name if self._shm is not None else None
+
+    def close(self):
+        """
+        Releases the file mapping of a maze opened with `load(mmap=True)`,
+        or this process's view of a shared maze, unlinking the block too if
+        this maze published it. The maze must not be used afterwards.
+        """
+        if self._mmap is not None or self._shm is not None:
+            self.grid.release()
+            if self.costs is not None:
+                self.costs.release()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._shm is not None:
+            self._shm.close()
+            if self._shm_owner:
+                self._shm.unlink()
+            self._shm = None
+            self._shm_owner = False
+
+    @property
+    def cells(self):
+        """
+        Sequence of `Cell` views over every cell, in row-major order.
+        """
+        return _CellSequence(self)
 
     def __getitem__(self, index):
         """
@@ -90,10 +434,124 @@ class Maze(object):
         """
         x, y = index
         if 0 <= x < self.width and 0 <= y < self.height:
-            return self.cells[x + y * self.width]
+            return Cell(self, x, y)
         else:
             return None
 
+    def fingerprint(self):
+        """
+        Returns a hex digest of the maze size, walls and costs. Equal mazes
+        have equal fingerprints, and it changes whenever walls are opened or
+        closed or costs are changed. Recomputed only after such a change.
+        """
+        if self._fingerprint is None or self._fingerprint[0] != self.version:
+            digest = hashlib.blake2b(digest_size=16)
+            digest.update('{}x{}:'.format(self.width, self.height).encode('ascii'))
+            digest.update(self.grid)
+            if self.costs is not None:
+                digest.update(b'costs:')
+                digest.update(self.costs)
+            self._fingerprint = (self.version, digest.hexdigest())
+        return self._fingerprint[1]
+
+    def subscribe(self, callback):
+        """
+        Registers `callback(a, b, is_open)` to be called after every single
+        wall edit, that is `open_wall`, `close_wall` and `Cell.connect`, with
+        the two cells as (x, y) tuples. Bulk changes like `randomize` are not
+        reported.
+        """
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        """
+        Removes a callback registered with `subscribe`.
+        """
+        self._listeners.remove(callback)
+
+    def _notify(self, a, b, is_open):
+        for callback in list(self._listeners):
+            callback(a, b, is_open)
+
+    def _wall_between(self, a, b):
+        """
+        Returns `(index, bit, other index, other bit)` for the wall between
+        the adjacent cells `a` and `b`, given as (x, y) tuples.
+        """
+        (ax, ay), (bx, by) = a, b
+        if not (0 <= ax < self.width and 0 <= ay < self.height
+                and 0 <= bx < self.width and 0 <= by < self.height):
+            raise ValueError('cells {} and {} must be inside the {}x{} maze'.format(
+                a, b, self.width, self.height))
+        if abs(ax - bx) + abs(ay - by) != 1:
+            raise ValueError('cells {} and {} are not adjacent'.format(a, b))
+        wall = Cell(self, ax, ay)._wall_to(Cell(self, bx, by))
+        opposite = Cell(self, bx, by)._wall_to(Cell(self, ax, ay))
+        return (ax + ay * self.width, WALL_BITS[wall],
+                bx + by * self.width, WALL_BITS[opposite])
+
+    def has_wall(self, a, b):
+        """
+        Returns True if a wall stands between the adjacent cells `a` and `b`.
+        """
+        index, bit, _, _ = self._wall_between(a, b)
+        return bool(self.grid[index] & bit)
+
+    def open_wall(self, a, b):
+        """
+        Removes the wall between the adjacent cells `a` and `b`, given as
+        (x, y) tuples, and notifies subscribers. Returns False, without
+        notifying, if there was no wall.
+        """
+        index, bit, other, other_bit = self._wall_between(a, b)
+        if not self.grid[index] & bit:
+            return False
+        self.grid[index] &= ~bit
+        self.grid[other] &= ~other_bit
+        self.version += 1
+        self._notify(a, b, True)
+        return True
+
+    def close_wall(self, a, b):
+        """
+        Puts back the wall between the adjacent cells `a` and `b`, the
+        opposite of `open_wall`. Returns False, without notifying, if the
+        wall was already there.
+        """
+        index, bit, other, other_bit = self._wall_between(a, b)
+        if self.grid[index] & bit:
+            return False
+        self.grid[index] |= bit
+        self.grid[other] |= other_bit
+        self.version += 1
+        self._notify(a, b, False)
+        return True
+
+    def cost(self, x, y):
+        """
+        Returns the cost of stepping into the cell at (x, y).
+        """
+        if self.costs is None:
+            return 1
+        return self.costs[x + y * self.width]
+
+    def set_costs(self, costs):
+        """
+        Sets the terrain cost grid (see `__init__`), or removes it with None.
+        """
+        if costs is not None:
+            mazefile.check_costs(costs, self.width, self.height)
+        self.costs = costs
+        self.version += 1
+
+    def randomize_costs(self, low=1, high=MAX_COST, rng=random):
+        """
+        Gives every cell a random terrain cost between `low` and `high`,
+        drawn from `rng`, a `random.Random` instance (the `random` module by
+        default).
+        """
+        self.set_costs(bytearray(rng.randint(low, high) for _ in range(len(self.grid))))
+
     def neighbors(self, cell):
         """
         Returns the list of neighboring cells, not counting diagonals. Cells on
@@ -126,13 +584,14 @@ class Maze(object):
         str_matrix = [['O'] * (self.width * 2 + 1)
                       for i in range(self.height * 2 + 1)]
 
-        for cell in self.cells:
-            x = cell.x * 2 + 1
-            y = cell.y * 2 + 1
+        for i, bits in enumerate(self.grid):
+            cell_x, cell_y = i % self.width, i // self.width
+            x = cell_x * 2 + 1
+            y = cell_y * 2 + 1
             str_matrix[y][x] = ' '
-            if N not in cell and cell.y > 0:
+            if not bits & N_BIT and cell_y > 0:
                 str_matrix[y - 1][x + 0] = ' '
-            if W not in cell and cell.x > 0:
+            if not bits & W_BIT and cell_x > 0:
                 str_matrix[y][x - 1] = ' '
 
         return str_matrix
@@ -154,6 +613,9 @@ class Maze(object):
         │   │               │
         └───┴───────────────┘
         """
+        if load_numpy() is not None:
+            return ''.join(self.iter_lines())
+
         # Starts with regular representation. Looks stretched because chars are
         # twice as high as they are wide (look at docs example in
         # `Maze._to_str_matrix`).
@@ -209,69 +671,159 @@ class Maze(object):
                 str_connections = ''.join(sorted(connections))
                 # Note we are changing the matrix we are reading. We need to be
                 # careful as to not break the `g` function implementation.
-                matrix[y][x] = Maze.UNICODE_BY_CONNECTIONS[str_connections]
+                matrix[y][x] = Maze.UNICODE_BY_CONNECTIONS.get(str_connections, ' ')
 
         # Simple double join to transform list of lists into string.
         return '\n'.join(''.join(line) for line in matrix) + '\n'
 
-    def randomize(self):
+    def randomize(self, rng=None):
         """
-        Knocks down random walls to build a random perfect maze.
+        Knocks down random walls to build a random perfect maze, drawing
+        random numbers from `rng`, a `random.Random` instance (the `random`
+        module by default).
 
         Algorithm from http://mazeworks.com/mazegen/mazetut/index.htm
+
+        Works on cell indexes in the wall grid directly; neighbors are tried in
+        the same N, S, W, E order as `neighbors`.
         """
+        if rng is None:
+            rng = random
+        width, height = self.width, self.height
+        grid = self.grid
         cell_stack = []
-        cell = random.choice(self.cells)
+        cell = rng.randrange(len(grid))
         n_visited_cells = 1
 
-        while n_visited_cells < len(self.cells):
-            neighbors = [c for c in self.neighbors(cell) if c.is_full()]
+        while n_visited_cells < len(grid):
+            x, y = cell % width, cell // width
+            neighbors = []
+            if y > 0 and grid[cell - width] == ALL_WALLS:
+                neighbors.append((cell - width, N_BIT, S_BIT))
+            if y < height - 1 and grid[cell + width] == ALL_WALLS:
+                neighbors.append((cell + width, S_BIT, N_BIT))
+            if x > 0 and grid[cell - 1] == ALL_WALLS:
+                neighbors.append((cell - 1, W_BIT, E_BIT))
+            if x < width - 1 and grid[cell + 1] == ALL_WALLS:
+                neighbors.append((cell + 1, E_BIT, W_BIT))
             if len(neighbors):
-                neighbor = random.choice(neighbors)
-                cell.connect(neighbor)
+                neighbor, wall, opposite = rng.choice(neighbors)
+                grid[cell] &= ~wall
+                grid[neighbor] &= ~opposite
                 cell_stack.append(cell)
                 cell = neighbor
                 n_visited_cells += 1
             else:
                 cell = cell_stack.pop()
 
+        self.version += 1
+
     def to_graph(self):
         """
         Returns a graph representation of the maze, suitable for pathfinding
         algorithms. The graph is an adjacency list, where keys are cell
         coordinates (tuples) and values are lists of reachable neighbor
         coordinates (tuples).
+
+        Every step counts as 1: terrain costs are left out. Mazes with costs
+        need `to_weighted_graph` and a weighted solver; `batch`, the solver
+        cache and the server refuse unweighted solvers on them.
         """
+        width = self.width
         graph = {}
-        for cell in self.cells:
-            x, y = cell.x, cell.y
+        for i, bits in enumerate(self.grid):
+            x, y = i % width, i // width
             graph[(x, y)] = []
-            
+
             # Check for path to the North
-            if N not in cell.walls:
+            if not bits & N_BIT:
                 graph[(x, y)].append((x, y - 1))
-            
+
             # Check for path to the South
-            if S not in cell.walls:
+            if not bits & S_BIT:
                 graph[(x, y)].append((x, y + 1))
 
             # Check for path to the West
-            if W not in cell.walls:
+            if not bits & W_BIT:
                 graph[(x, y)].append((x - 1, y))
 
             # Check for path to the East
-            if E not in cell.walls:
+            if not bits & E_BIT:
                 graph[(x, y)].append((x + 1, y))
-        
+
         return graph
 
+    def graph_view(self, weighted=False):
+        """
+        Returns a lazy, read-only view usable wherever `to_graph()` (or
+        `to_weighted_graph()` when `weighted`) is, which reads neighbors
+        from the wall grid on demand instead of building the whole graph.
+        Creating it is O(1); each lookup is a little slower than a dict's,
+        so `to_graph()` still pays off for many full searches on an
+        unchanged maze.
+        """
+        return _GraphView(self, weighted)
+
+    def to_weighted_graph(self):
+        """
+        Returns the same adjacency list as `to_graph`, with each neighbor
+        paired with the cost of stepping into it: `{(x, y): [((nx, ny),
+        cost), ...]}`. Without a cost grid every cost is 1.
+        """
+        width = self.width
+        costs = self.costs
+        graph = self.to_graph()
+        if costs is None:
+            return {node: [(neighbor, 1) for neighbor in neighbors]
+                    for node, neighbors in graph.items()}
+        return {node: [(neighbor, costs[neighbor[0] + neighbor[1] * width])
+                       for neighbor in neighbors]
+                for node, neighbors in graph.items()}
+
+    def to_csr(self):
+        """
+        Returns a compressed sparse row representation of the maze graph as
+        two flat integer arrays, `(offsets, targets)`. Cells are numbered
+        `x + y * width`; the open neighbors of cell `i` are
+        `targets[offsets[i]:offsets[i + 1]]`, in the same N, S, W, E order as
+        `to_graph`.
+        """
+        width = self.width
+        typecode = 'i' if len(self.grid) < 2 ** 31 else 'q'
+        offsets = array(typecode, [0]) * (len(self.grid) + 1)
+        targets = array(typecode)
+        append = targets.append
+        for i, bits in enumerate(self.grid):
+            if not bits & N_BIT:
+                append(i - width)
+            if not bits & S_BIT:
+                append(i + width)
+            if not bits & W_BIT:
+                append(i - 1)
+            if not bits & E_BIT:
+                append(i + 1)
+            offsets[i + 1] = len(targets)
+        return offsets, targets
+
     @staticmethod
-    def generate(width=20, height=10):
+    def generate(width=20, height=10, algorithm='backtracker', seed=None):
         """
-        Returns a new random perfect maze with the given sizes.
+        Returns a new random perfect maze with the given sizes, built by the
+        named algorithm from `generators.GENERATORS`: 'backtracker'
+        (the default), 'kruskal' or 'wilson'.
+
+        The same `seed` always gives the same maze. Without one, random
+        numbers come from the `random` module.
         """
-        m = Maze(width, height)
-        m.randomize()
+        from generators import GENERATORS
+
+        try:
+            generator = GENERATORS[algorithm]
+        except KeyError:
+            raise ValueError('unknown algorithm {!r}, expected one of: {}'.format(
+                algorithm, ', '.join(sorted(GENERATORS))))
+        m = Maze(width, height, seed=seed)
+        generator(m, random if seed is None else random.Random(seed))
         return m
 
 
@@ -279,6 +831,9 @@ class Maze(object):
         """
         Draws the given path on the maze, represented by the given character.
         """
+        if load_numpy() is not None and len(char) == 1:
+            return ''.join(self.iter_lines(path, char))
+
         matrix = self._to_str_matrix()
         for x, y in path:
             matrix[y * 2 + 1][x * 2 + 1] = char
@@ -320,21 +875,117 @@ class Maze(object):
 
         return '\n'.join(''.join(line) for line in matrix) + '\n'
 
-if __name__ == '__main__':
+    def iter_lines(self, path=(), char='*', band_height=256):
+        """
+        Yields the lines of `repr(self)`, or of `draw_path(path, char)` when a
+        path is given, each ending in a newline. Without NumPy this simply
+        splits the full rendering.
+
+        With NumPy, walls are worked out with array operations on bands of
+        `band_height` rows of cells, so memory stays bounded by the width
+        and the whole text never needs to exist at once.
+        """
+        np = load_numpy()
+        if np is None or len(char) != 1:
+            text = self.draw_path(path, char) if path else repr(self)
+            for line in text.splitlines(True):
+                yield line
+            return
+
+        width, height = self.width, self.height
+        grid = np.frombuffer(self.grid, dtype=np.uint8).reshape(height, width)
+        on_path = np.zeros((height, width), dtype=bool)
+        if len(path):
+            xs, ys = zip(*path)
+            on_path[list(ys), list(xs)] = True
+
+        # Code point to print for each kind of wall, indexed by its
+        # connections as E=1, N=2, S=4, W=8 (sorted letter order), followed
+        # by the code points for a space and for the path character.
+        glyphs = []
+        for bits in range(16):
+            letters = ''.join(d for i, d in enumerate((E, N, S, W)) if bits & (1 << i))
+            glyphs.append(ord(Maze.UNICODE_BY_CONNECTIONS.get(letters, ' ')))
+        code_points = np.array(glyphs + [ord(' '), ord(char)], dtype='<u4')
+
+        for y0 in range(0, height, band_height):
+            y1 = min(y0 + band_height, height)
+            # One extra row of cells around the band, so walls on its edges
+            # see their neighbors.
+            top, bottom = max(y0 - 1, 0), min(y1 + 1, height)
+            codes = self._render_band(grid, on_path, top, bottom, char)
+            first = 2 * (y0 - top)
+            last = 2 * (y1 - top) + (1 if y1 == height else 0)
+            for row in code_points[codes[first:last]]:
+                yield row.tobytes().decode('utf-32-le') + '\n'
+
+    def _render_band(self, grid, on_path, top, bottom, char):
+        """
+        Renders cell rows `top` to `bottom` (exclusive) with NumPy, following
+        the same steps as `__repr__` and `draw_path`. Returns a matrix of
+        indexes into the code point table built by `iter_lines`.
+        """
+        np = load_numpy()
+        width, height = self.width, self.height
+        n_rows = 2 * (bottom - top) + 1
+
+        # Skinny matrix, as in `_to_str_matrix`: walls, spaces and path cells.
+        wall = np.ones((n_rows, width * 2 + 1), dtype=bool)
+        wall[1::2, 1::2] = False
+        wall[1::2, 2:width * 2:2] = (grid[top:bottom, 1:] & W_BIT) != 0
+        first_y, last_y = max(top, 1), min(bottom, height - 1)
+        if first_y <= last_y:
+            wall[2 * (first_y - top):2 * (last_y - top) + 1:2, 1::2] = (
+                (grid[first_y:last_y + 1] & N_BIT) != 0)
+        marked_path = np.zeros_like(wall)
+        marked_path[1::2, 1::2] = on_path[top:bottom]
+
+        # Each char means a wall to the helper `g` unless it is a space, and
+        # is left untouched when it equals the path character.
+        solid = wall | (marked_path & (char != ' '))
+        marked = marked_path | (wall & (char == 'O'))
+
+        # Duplicate each character, then drop the last one of each line.
+        solid = np.repeat(solid, 2, axis=1)[:, :-1]
+        marked = np.repeat(marked, 2, axis=1)[:, :-1]
+
+        # Fix double wide walls: a wall followed by a space becomes a space.
+        solid[:, :-1] &= solid[:, 1:] | marked[:, :-1]
+
+        # Pick each wall's glyph from the walls it connects to.
+        linked = (solid & ~marked).astype(np.uint8)
+        connections = np.zeros_like(linked)
+        connections[:, :-1] |= linked[:, 1:]
+        connections[1:, :] |= linked[:-1, :] << 1
+        connections[:-1, :] |= linked[1:, :] << 2
+        connections[:, 1:] |= linked[:, :-1] << 3
+
+        return np.where(~solid, 16, np.where(marked, 17, connections))
+
+    def write(self, stream, path=(), char='*'):
+        """
+        Writes the rendering of `iter_lines` to a text stream, line by line.
+        """
+        stream.writelines(self.iter_lines(path, char))
+
+def main(argv, started=None):
+    """
+    Entry point of `python maze.py [width [height]]`, which opens the
+    visualizer, and of `python maze.py batch ...`, the headless mode of
+    cli.py. `started` is when the script started, for the batch mode's time
+    to first result.
+    """
+    if argv and argv[0] == 'batch':
+        # pygame is never imported.
+        import cli
+        return cli.main(argv[1:], started)
+
     from visualizer import MazeVisualizer
-    import sys
 
-    if len(sys.argv) > 1:
-        width = int(sys.argv[1])
-        if len(sys.argv) > 2:
-            height = int(sys.argv[2])
-        else:
-            height = width
-    else:
-        width = 25
-        height = 25
+    width = int(argv[0]) if argv else 25
+    height = int(argv[1]) if len(argv) > 1 else width
 
-    # Generate the maze
-    # The new visualizer creates its own maze instance
+    # The visualizer creates its own maze instance.
     app = MazeVisualizer(maze_width=width, maze_height=height)
     app.run()
+    return 0
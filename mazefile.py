@@ -0,0 +1,240 @@
+"""
+Binary maze file format.
+
+A fixed 32 byte little-endian header followed by the wall grid, row by row,
+one byte of `WALL_BITS` flags per cell (the same layout as `Maze.grid`),
+then, if FLAG_HAS_COSTS is set, one byte of terrain cost per cell in the
+same order (`Maze.costs`):
+
+    magic     4s   b'MAZE'
+    version   u16  FORMAT_VERSION
+    flags     u16  FLAG_HAS_SEED if the seed field is meaningful,
+                   FLAG_HAS_COSTS if a cost grid follows the walls
+    width     u32
+    height    u32
+    seed      i64
+    reserved  8x
+
+The cell bytes are exactly `Maze.grid` and `Maze.costs`, so a file can be
+memory-mapped and used by a `Maze` without decoding. Shared memory blocks
+published by `Maze.share` use the same layout.
+"""
+import mmap
+import os
+import struct
+
+try:
+    import _posixshmem
+except ImportError:
+    # Windows, where attaching to a block registers nothing.
+    _posixshmem = None
+
+MAGIC = b'MAZE'
+FORMAT_VERSION = 1
+FLAG_HAS_SEED = 1
+FLAG_HAS_COSTS = 2
+
+HEADER = struct.Struct('<4sHHIIq8x')
+
+# Highest terrain cost a cell may have, see `Maze.costs`. Costs stay small
+# integers so the bucket queue solvers can use one bucket per distance.
+MAX_COST = 9
+_VALID_COSTS = bytes(range(1, MAX_COST + 1))
+
+def check_costs(costs, width, height):
+    """
+    Raises ValueError unless `costs` holds one cost from 1 to MAX_COST per
+    cell of a `width x height` maze.
+    """
+    if len(costs) != width * height:
+        raise ValueError('cost grid has {} cells, expected {}x{}'.format(
+            len(costs), width, height))
+    if bytes(costs).translate(None, _VALID_COSTS):
+        raise ValueError('costs must be between 1 and {}'.format(MAX_COST))
+
+def pack_header(width, height, seed=None, has_costs=False):
+    """
+    Returns the header for a maze of the given size, as bytes.
+    """
+    flags = ((FLAG_HAS_SEED if seed is not None else 0)
+             | (FLAG_HAS_COSTS if has_costs else 0))
+    return HEADER.pack(MAGIC, FORMAT_VERSION, flags, width, height,
+                       seed if seed is not None else 0)
+
+def unpack_header(data):
+    """
+    Validates a header and returns `(width, height, seed, has_costs)`, with
+    `seed` None if it was not recorded.
+    """
+    if len(data) < HEADER.size:
+        raise ValueError('truncated maze file header')
+    magic, version, flags, width, height, seed = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError('not a maze file (bad magic {!r})'.format(magic))
+    if version != FORMAT_VERSION:
+        raise ValueError('unsupported maze file version {}'.format(version))
+    return (width, height, (seed if flags & FLAG_HAS_SEED else None),
+            bool(flags & FLAG_HAS_COSTS))
+
+def write_header(stream, width, height, seed=None, has_costs=False):
+    """
+    Writes the file header for a maze of the given size to a binary stream.
+    Rows of wall flags are expected to follow, then the costs if any.
+    """
+    stream.write(pack_header(width, height, seed, has_costs))
+
+def read_header(stream):
+    """
+    Reads and validates a file header from a binary stream. Returns
+    `(width, height, seed, has_costs)`, with `seed` None if it was not
+    recorded.
+    """
+    return unpack_header(stream.read(HEADER.size))
+
+def write_rows(path, width, height, rows, seed=None):
+    """
+    Writes a maze file from an iterable of rows of wall flags, without ever
+    holding more than one row in memory.
+    """
+    with open(path, 'wb') as stream:
+        write_header(stream, width, height, seed)
+        n_rows = 0
+        for row in rows:
+            if len(row) != width:
+                raise ValueError('row {} has {} cells, expected {}'.format(
+                    n_rows, len(row), width))
+            stream.write(row)
+            n_rows += 1
+    if n_rows != height:
+        raise ValueError('got {} rows, expected {}'.format(n_rows, height))
+
+def write_grid(path, width, height, grid, seed=None, costs=None):
+    """
+    Writes a whole wall grid, as found in `Maze.grid`, and the optional cost
+    grid to a maze file.
+    """
+    with open(path, 'wb') as stream:
+        write_header(stream, width, height, seed, costs is not None)
+        stream.write(grid)
+        if costs is not None:
+            stream.write(costs)
+
+def read_grid(path, use_mmap=False):
+    """
+    Reads a maze file and returns `(width, height, seed, grid, costs,
+    mapping)`, with `costs` None when the file has no cost grid.
+
+    Normally `grid` and `costs` are `bytearray`s and `mapping` is None. With
+    `use_mmap=True` the file is mapped copy-on-write instead: they are
+    writable `memoryview`s over the mapped pages, so nothing is read until
+    it is touched and changes never reach the file, and `mapping` is the
+    underlying `mmap` object.
+    """
+    with open(path, 'rb') as stream:
+        width, height, seed, has_costs = read_header(stream)
+        n_cells = width * height
+        n_bytes = n_cells * (2 if has_costs else 1)
+        if use_mmap and n_cells:
+            mapping = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_COPY)
+            size = len(mapping)
+            if size < HEADER.size + n_bytes:
+                mapping.close()
+                raise ValueError('truncated maze file: {} of {} bytes'.format(
+                    size - HEADER.size, n_bytes))
+            view = memoryview(mapping)[HEADER.size:HEADER.size + n_bytes]
+            grid = view[:n_cells]
+            costs = view[n_cells:] if has_costs else None
+            if costs is not None:
+                try:
+                    check_costs(costs, width, height)
+                except ValueError:
+                    grid.release()
+                    costs.release()
+                    view.release()
+                    mapping.close()
+                    raise
+            return width, height, seed, grid, costs, mapping
+        data = bytearray(stream.read(n_bytes))
+    if len(data) != n_bytes:
+        raise ValueError('truncated maze file: {} of {} bytes'.format(
+            len(data), n_bytes))
+    if has_costs:
+        costs = data[n_cells:]
+        check_costs(costs, width, height)
+        return width, height, seed, data[:n_cells], costs, None
+    return width, height, seed, data, None, None
+
+def create_shared(width, height, grid, seed=None, costs=None, name=None):
+    """
+    Copies a maze into a new shared memory block, header first, and returns
+    `(shared, grid, costs)`: the `SharedMemory` object and writable
+    `memoryview`s of the walls and costs in it (`costs` None without a cost
+    grid). The caller owns the block and must unlink it.
+    """
+    # Imported here, as loading multiprocessing slows down startup.
+    from multiprocessing import shared_memory
+
+    n_cells = width * height
+    size = HEADER.size + n_cells * (2 if costs is not None else 1)
+    shared = shared_memory.SharedMemory(name=name, create=True, size=size)
+    shared.buf[:HEADER.size] = pack_header(width, height, seed, costs is not None)
+    shared.buf[HEADER.size:HEADER.size + n_cells] = grid
+    if costs is not None:
+        shared.buf[HEADER.size + n_cells:size] = costs
+    return (shared,) + _shared_views(shared, n_cells, costs is not None)
+
+def attach_shared(name):
+    """
+    Attaches to a shared memory block made by `create_shared`, without
+    copying, and returns `(width, height, seed, grid, costs, shared)`.
+    """
+    from multiprocessing import shared_memory
+
+    try:
+        # Python 3.13 and later.
+        shared = shared_memory.SharedMemory(name, track=False)
+    except TypeError:
+        shared = (_AttachedBlock(name) if _posixshmem is not None
+                  else shared_memory.SharedMemory(name))
+    try:
+        width, height, seed, has_costs = unpack_header(bytes(shared.buf[:HEADER.size]))
+        n_cells = width * height
+        if shared.size < HEADER.size + n_cells * (2 if has_costs else 1):
+            raise ValueError('truncated shared maze {!r}'.format(name))
+    except ValueError:
+        shared.close()
+        raise
+    return (width, height, seed) + _shared_views(shared, n_cells, has_costs) + (shared,)
+
+class _AttachedBlock(object):
+    """
+    An existing POSIX shared memory block, mapped like `SharedMemory(name)`
+    but never registered with the resource tracker, for Python versions
+    before 3.13, whose `SharedMemory` has no `track=False`.
+
+    A registered reader would have the tracker unlink the block when the
+    reader exits, and since child processes share their parent's tracker,
+    unregistering it again would drop the owner's own registration. Only
+    the owner may unlink, so readers stay out of the tracker altogether.
+    """
+
+    def __init__(self, name):
+        fd = _posixshmem.shm_open('/' + name, os.O_RDWR, mode=0o600)
+        try:
+            self.size = os.fstat(fd).st_size
+            self._mmap = mmap.mmap(fd, self.size)
+        finally:
+            os.close(fd)
+        self.name = name
+        self.buf = memoryview(self._mmap)
+
+    def close(self):
+        if self.buf is not None:
+            self.buf.release()
+            self.buf = None
+            self._mmap.close()
+
+def _shared_views(shared, n_cells, has_costs):
+    grid = shared.buf[HEADER.size:HEADER.size + n_cells]
+    costs = shared.buf[HEADER.size + n_cells:HEADER.size + 2 * n_cells] if has_costs else None
+    return grid, costs
@@ -0,0 +1,158 @@
+"""
+Searches between a set of sources and a set of targets in a single pass,
+instead of one search per source/target pair: the nearest of several exits,
+or the nearest spawn point of every target.
+
+Every source starts at distance 0, so each target is reached from the
+source closest to it, and the search stops at the first target reached, or
+once every target has been reached.
+"""
+import heapq
+
+from astar import heuristic
+
+class PairPath(object):
+    """
+    Shortest path found by a multi-source, multi-target search, with the
+    source/target pair it links.
+
+    Attributes:
+        source (tuple): The source the path starts from, nearest to `target`.
+        target (tuple): The target reached.
+        path (list): The cells from `source` to `target`, both included.
+    """
+
+    __slots__ = ('source', 'target', 'path')
+
+    def __init__(self, source, target, path):
+        self.source = source
+        self.target = target
+        self.path = path
+
+    @property
+    def distance(self):
+        return len(self.path) - 1
+
+    def __repr__(self):
+        return '<PairPath {} -> {} distance={}>'.format(self.source, self.target, self.distance)
+
+def _check_ends(sources, targets):
+    """
+    Returns the sources as a list and the targets as a set, without
+    duplicates.
+    """
+    sources = list(dict.fromkeys(sources))
+    targets = set(targets)
+    if not sources or not targets:
+        raise ValueError('at least one source and one target are needed')
+    return sources, targets
+
+def _pair_path(came_from, target):
+    """
+    Walks the predecessor map back from `target` to the source it was
+    reached from.
+    """
+    path = []
+    current = target
+    while current is not None:
+        path.append(current)
+        current = came_from[current]
+    path.reverse()
+    return PairPath(path[0], target, path)
+
+def multi_dijkstra(graph, sources, targets, find_all=False):
+    """
+    Dijkstra's algorithm started from every source at once.
+
+    Args:
+        graph (dict): An adjacency list representation of the graph.
+        sources (iterable): The starting nodes.
+        targets (iterable): The nodes to reach.
+        find_all (bool): Keep going until every reachable target is found,
+            instead of stopping at the nearest one.
+
+    Returns:
+        (list, set): A `PairPath` per target reached, nearest first (at most
+        one unless `find_all`), and the set of all visited nodes. Targets
+        that cannot be reached are left out.
+    """
+    sources, remaining = _check_ends(sources, targets)
+    priority_queue = [(0, source) for source in sources]
+    came_from = dict.fromkeys(sources)
+    cost_so_far = dict.fromkeys(sources, 0)
+    visited = set()
+    results = []
+
+    while priority_queue:
+        (distance, current_node) = heapq.heappop(priority_queue)
+
+        if current_node in visited:
+            continue
+
+        visited.add(current_node)
+
+        if current_node in remaining:
+            results.append(_pair_path(came_from, current_node))
+            remaining.discard(current_node)
+            if not find_all or not remaining:
+                break
+
+        for neighbor in graph.get(current_node, []):
+            new_distance = distance + 1
+            if neighbor not in cost_so_far or new_distance < cost_so_far[neighbor]:
+                cost_so_far[neighbor] = new_distance
+                came_from[neighbor] = current_node
+                heapq.heappush(priority_queue, (new_distance, neighbor))
+
+    return results, visited
+
+def multi_astar(graph, sources, targets, find_all=False):
+    """
+    A* started from every source at once, guided towards the nearest
+    target: the heuristic of a node is its smallest Manhattan distance to a
+    target not reached yet. It never overestimates the distance to any of
+    them, so the first target reached is the nearest one, and with
+    `find_all` each later one is still reached along a shortest path. Each
+    push costs O(number of targets left).
+
+    Arguments and return value as for `multi_dijkstra`.
+    """
+    sources, remaining = _check_ends(sources, targets)
+    remaining_list = list(remaining)
+
+    def estimate(node):
+        return min(heuristic(node, target) for target in remaining_list)
+
+    frontier = [(estimate(source), 0, source) for source in sources]
+    heapq.heapify(frontier)
+    came_from = dict.fromkeys(sources)
+    cost_so_far = dict.fromkeys(sources, 0)
+    visited = set()
+    results = []
+
+    while frontier:
+        _, cost, current = heapq.heappop(frontier)
+
+        # Entries left behind by a later, cheaper push.
+        if cost > cost_so_far[current]:
+            continue
+
+        visited.add(current)
+
+        if current in remaining:
+            results.append(_pair_path(came_from, current))
+            remaining.discard(current)
+            if not find_all or not remaining:
+                break
+            # Estimates only grow as targets drop out; entries already
+            # queued keep their lower, still admissible, priority.
+            remaining_list = list(remaining)
+
+        for neighbor in graph[current]:
+            new_cost = cost + 1
+            if neighbor not in cost_so_far or new_cost < cost_so_far[neighbor]:
+                cost_so_far[neighbor] = new_cost
+                came_from[neighbor] = current
+                heapq.heappush(frontier, (new_cost + estimate(neighbor), new_cost, neighbor))
+
+    return results, visited
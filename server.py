@@ -0,0 +1,610 @@
+"""
+Maze query server speaking newline-delimited JSON over TCP or a Unix
+socket, plus a load generator to measure it. Run with:
+
+    python server.py serve [--host 127.0.0.1] [--port 8765] [--unix PATH]
+                           [--workers 4]
+    python server.py load [--port 8765] [--unix PATH] [--size 200]
+                          [--requests 1000] [--concurrency 16]
+
+Every request is one JSON object on one line, with an `op` and an optional
+`id` echoed back in the response. Responses carry `"ok": true` and the
+result fields, or `"ok": false` and an `error` message. Requests sent on
+one connection are handled concurrently, up to `--max-in-flight` at a
+time, so responses may come back in a different order; match them by `id`.
+
+Operations:
+
+- generate: name, width, height, [generator], [seed]. Registers a new maze.
+- load: name, path. Registers a maze read from a `Maze.save` file.
+- attach: name, shared_name. Registers a maze another process published
+  with `Maze.share`, without copying it.
+- drop: name. Forgets a maze.
+- list: every registered maze.
+- solve: name, start [x, y], end [x, y], [algorithm], [include_path].
+  Returns path_length, visited and, unless include_path is false, path.
+- stats: request latency percentiles per operation, and cache counters.
+- ping.
+
+Mazes stay in memory, so requests never regenerate or reload them. Searches
+on mazes larger than `inline_max_cells` run in a process pool, where every
+worker keeps the graphs it built, so the event loop stays responsive. Such
+mazes are published in shared memory, so workers attach to them by name
+instead of receiving a copy with every request.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from maze import Maze
+from batch import SOLVERS, WEIGHTED_SOLVERS, check_algorithm
+from cache import LRUCache, SolverCache
+from generators import GENERATORS
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+# Longest accepted request or response line, in bytes.
+LINE_LIMIT = 1 << 26
+
+class LatencyStats(object):
+    """
+    Counts requests and errors and keeps the latencies of the most recent
+    `window` requests, for percentiles.
+    """
+
+    def __init__(self, window=10000):
+        self.count = 0
+        self.errors = 0
+        self.latencies = deque(maxlen=window)
+
+    def add(self, seconds, ok=True):
+        self.count += 1
+        if not ok:
+            self.errors += 1
+        self.latencies.append(seconds)
+
+    def summary(self):
+        """
+        Returns the counters and the p50, p90 and p99 latencies in
+        milliseconds as a dict.
+        """
+        summary = {'count': self.count, 'errors': self.errors}
+        summary.update(percentiles(self.latencies))
+        return summary
+
+def percentiles(latencies, points=(50, 90, 99)):
+    """
+    Returns `{'p50_ms': ..., ...}` for the given latencies in seconds, using
+    the nearest rank method.
+    """
+    ordered = sorted(latencies)
+    result = {}
+    for point in points:
+        if ordered:
+            rank = max(1, -(-len(ordered) * point // 100))
+            result['p{}_ms'.format(point)] = round(ordered[rank - 1] * 1000, 3)
+        else:
+            result['p{}_ms'.format(point)] = None
+    return result
+
+# Per-process graphs of the mazes seen by a worker, by fingerprint.
+_worker_graphs = LRUCache(max_entries=8)
+
+def _worker_solve(maze, algorithm, start, end):
+    """
+    Runs in a worker process: solves one pair, building the graph only the
+    first time this worker sees the maze.
+    """
+    weighted = algorithm in WEIGHTED_SOLVERS
+    key = (maze.fingerprint(), weighted)
+    graph = _worker_graphs.get(key)
+    if graph is None:
+        graph = maze.to_weighted_graph() if weighted else maze.to_graph()
+        _worker_graphs.put(key, graph)
+    path, visited = SOLVERS[algorithm](graph, start, end)
+    return path, len(visited)
+
+def _worker_generate(width, height, generator, seed):
+    return Maze.generate(width, height, generator, seed=seed)
+
+class RequestError(Exception):
+    """
+    A request the server cannot serve; reported back to the client.
+    """
+
+class MazeServer(object):
+    """
+    Registry of named mazes and the request handlers working on them.
+    """
+
+    def __init__(self, workers=None, inline_max_cells=4096, max_in_flight=64):
+        self.mazes = {}
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.inline_max_cells = inline_max_cells
+        # Requests served at once per connection; past that, the connection
+        # is not read until one finishes, so a client pipelining faster
+        # than it is served gets pushed back by TCP.
+        self.max_in_flight = max_in_flight
+        self.pool = None
+        # Offloaded requests still using each maze, and mazes dropped or
+        # replaced while in use, closed once their last request is done.
+        self.in_flight = {}
+        self.retired = set()
+        self.cache = SolverCache()
+        self.metrics = {}
+        self.started = time.time()
+        self.handlers = {'generate': self.op_generate,
+                         'load': self.op_load,
+                         'attach': self.op_attach,
+                         'drop': self.op_drop,
+                         'list': self.op_list,
+                         'solve': self.op_solve,
+                         'stats': self.op_stats,
+                         'ping': self.op_ping}
+
+    def _maze(self, request):
+        name = self._string(request, 'name')
+        try:
+            return self.mazes[name]
+        except KeyError:
+            raise RequestError('unknown maze {!r}'.format(name))
+
+    @staticmethod
+    def _field(request, name, default=KeyError):
+        try:
+            return request[name]
+        except KeyError:
+            if default is KeyError:
+                raise RequestError('missing field {!r}'.format(name))
+            return default
+
+    @staticmethod
+    def _int(request, name, default=KeyError):
+        value = MazeServer._field(request, name, default)
+        if value is not default and (not isinstance(value, int) or isinstance(value, bool)):
+            raise RequestError('{} must be an integer, got {!r}'.format(name, value))
+        return value
+
+    @staticmethod
+    def _string(request, name, default=KeyError):
+        value = MazeServer._field(request, name, default)
+        if value is not default and not isinstance(value, str):
+            raise RequestError('{} must be a string, got {!r}'.format(name, value))
+        return value
+
+    @staticmethod
+    def _cell(request, name, maze):
+        value = MazeServer._field(request, name)
+        if (not isinstance(value, (list, tuple)) or len(value) != 2
+                or not all(isinstance(v, int) and not isinstance(v, bool) for v in value)):
+            raise RequestError('{} must be [x, y], got {!r}'.format(name, value))
+        x, y = value
+        if not (0 <= x < maze.width and 0 <= y < maze.height):
+            raise RequestError('{} {} is outside the {}x{} maze'.format(
+                name, [x, y], maze.width, maze.height))
+        return (x, y)
+
+    def _describe(self, name, maze):
+        return {'name': name, 'width': maze.width, 'height': maze.height,
+                'seed': maze.seed, 'fingerprint': maze.fingerprint(),
+                'shared_name': maze.shared_name}
+
+    def _register(self, name, maze):
+        """
+        Adds a maze to the registry, replacing any maze of the same name,
+        and publishes it in shared memory if workers will search it.
+        """
+        if len(maze.grid) > self.inline_max_cells:
+            maze.share()
+        old = self.mazes.get(name)
+        self.mazes[name] = maze
+        if old is not None and old is not maze:
+            self._retire(old)
+        return self._describe(name, maze)
+
+    def _retire(self, maze):
+        """
+        Closes a maze that left the registry, or defers it until the
+        offloaded requests using it are done: workers attach to shared mazes
+        by name when they unpickle a request, which may be well after it was
+        sent.
+        """
+        if maze in self.in_flight:
+            self.retired.add(maze)
+        else:
+            maze.close()
+
+    def _release(self, maze):
+        count = self.in_flight.pop(maze) - 1
+        if count:
+            self.in_flight[maze] = count
+        elif maze in self.retired:
+            self.retired.discard(maze)
+            maze.close()
+
+    def _discard_pool(self, pool):
+        """
+        Forgets a pool whose workers died, so the next request starts a new
+        one.
+        """
+        if self.pool is pool:
+            self.pool = None
+        pool.shutdown(wait=False)
+
+    async def _offload(self, function, *args, maze=None):
+        """
+        Runs `function(*args)` in the process pool, started on first use and
+        started again if a worker died. `maze`, if given, is kept open until
+        the worker is done with it.
+        """
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        pool = self.pool
+        try:
+            future = pool.submit(function, *args)
+        except BrokenProcessPool:
+            self._discard_pool(pool)
+            pool = self.pool = ProcessPoolExecutor(max_workers=self.workers)
+            future = pool.submit(function, *args)
+
+        if maze is not None:
+            self.in_flight[maze] = self.in_flight.get(maze, 0) + 1
+            loop = asyncio.get_running_loop()
+
+            def done(_):
+                # Called in the pool's thread, and even if the request was
+                # cancelled meanwhile.
+                try:
+                    loop.call_soon_threadsafe(self._release, maze)
+                except RuntimeError:
+                    # The loop is closed; `close` took care of the maze.
+                    pass
+            future.add_done_callback(done)
+
+        try:
+            return await asyncio.wrap_future(future)
+        except BrokenProcessPool:
+            self._discard_pool(pool)
+            raise RequestError('a worker process died; retry the request')
+
+    async def op_generate(self, request):
+        name = self._string(request, 'name')
+        width, height = self._int(request, 'width'), self._int(request, 'height')
+        generator = self._string(request, 'generator', 'backtracker')
+        seed = self._int(request, 'seed', None)
+        if width < 1 or height < 1:
+            raise RequestError('maze sizes must be positive')
+        if generator not in GENERATORS:
+            raise RequestError('unknown generator {!r}'.format(generator))
+        if width * height > self.inline_max_cells:
+            maze = await self._offload(_worker_generate, width, height, generator, seed)
+        else:
+            maze = Maze.generate(width, height, generator, seed=seed)
+        return self._register(name, maze)
+
+    async def op_load(self, request):
+        name = self._string(request, 'name')
+        path = self._string(request, 'path')
+        try:
+            # Reading a large file would stall the event loop; a thread
+            # will do, the work is all I/O.
+            maze = await asyncio.get_running_loop().run_in_executor(None, Maze.load, path)
+        except (OSError, ValueError) as error:
+            raise RequestError(str(error))
+        return self._register(name, maze)
+
+    async def op_attach(self, request):
+        name = self._string(request, 'name')
+        try:
+            maze = Maze.attach(self._string(request, 'shared_name'))
+        except (OSError, ValueError) as error:
+            raise RequestError(str(error))
+        return self._register(name, maze)
+
+    async def op_drop(self, request):
+        self._maze(request)
+        self._retire(self.mazes.pop(request['name']))
+        return {}
+
+    async def op_list(self, request):
+        return {'mazes': [self._describe(name, maze) for name, maze in self.mazes.items()]}
+
+    async def op_solve(self, request):
+        maze = self._maze(request)
+        start = self._cell(request, 'start', maze)
+        end = self._cell(request, 'end', maze)
+        algorithm = self._string(request, 'algorithm', 'astar')
+        try:
+            check_algorithm(maze, algorithm)
+        except (TypeError, ValueError) as error:
+            raise RequestError(str(error))
+
+        if len(maze.grid) > self.inline_max_cells:
+            path, n_visited = await self._offload(_worker_solve, maze, algorithm, start, end,
+                                                  maze=maze)
+        else:
+            path, visited = self.cache.solve(maze, start, end, algorithm)
+            n_visited = len(visited)
+
+        response = {'path_length': len(path), 'visited': n_visited}
+        if self._field(request, 'include_path', True):
+            response['path'] = path
+        return response
+
+    async def op_stats(self, request):
+        return {'uptime_seconds': round(time.time() - self.started, 3),
+                'mazes': len(self.mazes),
+                'workers': self.workers,
+                'operations': {op: stats.summary() for op, stats in self.metrics.items()},
+                'cache': self.cache.stats()}
+
+    async def op_ping(self, request):
+        return {}
+
+    async def handle_line(self, line):
+        """
+        Serves one request line and returns the response dict.
+        """
+        received = time.perf_counter()
+        request_id, op = None, None
+        try:
+            try:
+                request = json.loads(line)
+            except ValueError as error:
+                raise RequestError('invalid JSON: {}'.format(error))
+            if not isinstance(request, dict):
+                raise RequestError('requests must be JSON objects')
+            request_id = request.get('id')
+            op = request.get('op')
+            try:
+                handler = self.handlers[op]
+            except (KeyError, TypeError):
+                raise RequestError('unknown op {!r}, expected one of: {}'.format(
+                    op, ', '.join(sorted(self.handlers))))
+            response = await handler(request)
+            response['ok'] = True
+        except RequestError as error:
+            response = {'ok': False, 'error': str(error)}
+        except Exception as error:
+            response = {'ok': False, 'error': '{}: {}'.format(type(error).__name__, error)}
+        response['id'] = request_id
+
+        key = op if isinstance(op, str) and op in self.handlers else 'invalid'
+        self.metrics.setdefault(key, LatencyStats()).add(
+            time.perf_counter() - received, response['ok'])
+        return response
+
+    async def handle_connection(self, reader, writer):
+        """
+        Reads request lines until the client disconnects, serving them
+        concurrently and writing each response as soon as it is ready.
+        """
+        tasks = set()
+        slots = asyncio.Semaphore(self.max_in_flight)
+
+        async def serve(line):
+            try:
+                response = await self.handle_line(line)
+                writer.write(json.dumps(response).encode('utf-8') + b'\n')
+                await writer.drain()
+            finally:
+                slots.release()
+
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Over LINE_LIMIT; the stream cannot be resynchronized.
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                await slots.acquire()
+                task = asyncio.ensure_future(serve(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            writer.close()
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None):
+        """
+        Starts listening and returns the asyncio server.
+        """
+        if unix_path is not None:
+            return await asyncio.start_unix_server(self.handle_connection, unix_path,
+                                                   limit=LINE_LIMIT)
+        return await asyncio.start_server(self.handle_connection, host, port,
+                                          limit=LINE_LIMIT)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+        for maze in list(self.mazes.values()) + list(self.retired):
+            maze.close()
+        self.mazes.clear()
+        self.retired.clear()
+        self.in_flight.clear()
+
+class MazeClient(object):
+    """
+    Client for `MazeServer` that can have many requests in flight on one
+    connection.
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.next_id = 0
+        self.pending = {}
+        self.receiver = asyncio.ensure_future(self._receive())
+
+    @classmethod
+    async def connect(cls, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None):
+        if unix_path is not None:
+            reader, writer = await asyncio.open_unix_connection(unix_path, limit=LINE_LIMIT)
+        else:
+            reader, writer = await asyncio.open_connection(host, port, limit=LINE_LIMIT)
+        return cls(reader, writer)
+
+    async def _receive(self):
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                response = json.loads(line)
+                future = self.pending.pop(response.get('id'), None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        finally:
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError('connection closed'))
+            self.pending.clear()
+
+    async def request(self, op, **fields):
+        """
+        Sends one request and returns the response dict.
+        """
+        self.next_id += 1
+        fields['op'] = op
+        fields['id'] = self.next_id
+        future = asyncio.get_running_loop().create_future()
+        self.pending[self.next_id] = future
+        self.writer.write(json.dumps(fields).encode('utf-8') + b'\n')
+        await self.writer.drain()
+        return await future
+
+    async def close(self):
+        self.writer.close()
+        await self.receiver
+
+async def load_test(host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None, size=200,
+                    requests=1000, concurrency=16, connections=1, algorithm='astar',
+                    seed=0, include_path=False):
+    """
+    Registers a `size` square maze on the server, then sends `requests`
+    solves between random cells, `concurrency` at a time spread over
+    `connections` connections. Returns the summary dict: throughput and
+    client-side latency percentiles, with the server's own stats.
+    """
+    clients = [await MazeClient.connect(host, port, unix_path) for _ in range(connections)]
+    name = 'load-{}-{}'.format(size, seed)
+    response = await clients[0].request('generate', name=name, width=size,
+                                        height=size, seed=seed)
+    if not response['ok']:
+        raise RuntimeError(response['error'])
+
+    rng = random.Random(seed)
+    pairs = [([rng.randrange(size), rng.randrange(size)],
+              [rng.randrange(size), rng.randrange(size)]) for _ in range(requests)]
+    pending = deque(pairs)
+    latencies = []
+    errors = 0
+
+    async def run(client):
+        nonlocal errors
+        while pending:
+            start, end = pending.popleft()
+            sent = time.perf_counter()
+            response = await client.request('solve', name=name, start=start, end=end,
+                                            algorithm=algorithm, include_path=include_path)
+            latencies.append(time.perf_counter() - sent)
+            if not response['ok']:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(run(clients[i % connections]) for i in range(concurrency)))
+    seconds = time.perf_counter() - started
+
+    server_stats = await clients[0].request('stats')
+    await clients[0].request('drop', name=name)
+    for client in clients:
+        await client.close()
+
+    summary = {'requests': len(latencies), 'errors': errors,
+               'concurrency': concurrency, 'connections': connections,
+               'size': size, 'algorithm': algorithm,
+               'seconds': round(seconds, 3),
+               'throughput_rps': round(len(latencies) / seconds, 1) if seconds else None}
+    summary.update(percentiles(latencies))
+    summary['server'] = server_stats
+    return summary
+
+async def serve(args):
+    server = MazeServer(args.workers, args.inline_max_cells, args.max_in_flight)
+    listener = await server.start(args.host, args.port, args.unix)
+    where = args.unix or '{}:{}'.format(args.host, args.port)
+    print('listening on {}'.format(where), file=sys.stderr)
+    try:
+        # Stop cleanly on SIGTERM too, so shared mazes get unlinked.
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM,
+                                                      asyncio.current_task().cancel)
+    except NotImplementedError:
+        pass
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+    for name in ('serve', 'load'):
+        command = commands.add_parser(name)
+        command.add_argument('--host', default=DEFAULT_HOST)
+        command.add_argument('--port', type=int, default=DEFAULT_PORT)
+        command.add_argument('--unix', help='Unix socket path, instead of TCP')
+
+    serve_command = commands.choices['serve']
+    serve_command.add_argument('--workers', type=int,
+                               help='worker processes for searches (default: all CPUs)')
+    serve_command.add_argument('--inline-max-cells', type=int, default=4096,
+                               help='largest maze solved on the event loop itself '
+                                    '(default: %(default)s)')
+    serve_command.add_argument('--max-in-flight', type=int, default=64,
+                               help='requests served at once per connection; further '
+                                    'lines wait unread (default: %(default)s)')
+
+    load_command = commands.choices['load']
+    load_command.add_argument('--size', type=int, default=200)
+    load_command.add_argument('--requests', type=int, default=1000)
+    load_command.add_argument('--concurrency', type=int, default=16)
+    load_command.add_argument('--connections', type=int, default=1)
+    load_command.add_argument('--algorithm', choices=sorted(SOLVERS), default='astar')
+    load_command.add_argument('--seed', type=int, default=0)
+    load_command.add_argument('--include-path', action='store_true',
+                              help='ask for full paths, to include serialization costs')
+
+    args = parser.parse_args(argv)
+    if args.command == 'serve':
+        try:
+            asyncio.run(serve(args))
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            pass
+        return 0
+
+    summary = asyncio.run(load_test(args.host, args.port, args.unix, args.size,
+                                    args.requests, args.concurrency, args.connections,
+                                    args.algorithm, args.seed, args.include_path))
+    print(json.dumps(summary, indent=2))
+    return 1 if summary['errors'] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
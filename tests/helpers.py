@@ -0,0 +1,89 @@
+"""
+Reference implementations and maze builders shared by the tests.
+"""
+import heapq
+import random
+from collections import deque
+
+from maze import Maze
+
+def looped_maze(width, height, seed, loops=0.2, algorithm='backtracker', costs=False):
+    """
+    Returns a perfect maze with about `loops * width * height` more walls
+    knocked down, so that most pairs of cells are linked by several paths.
+    With `costs`, cells also get seeded random terrain costs.
+    """
+    rng = random.Random(seed)
+    maze = Maze.generate(width, height, algorithm, seed=seed)
+    for _ in range(int(loops * width * height)):
+        x, y = rng.randrange(width), rng.randrange(height)
+        options = []
+        if x + 1 < width:
+            options.append((x + 1, y))
+        if y + 1 < height:
+            options.append((x, y + 1))
+        if options:
+            maze.open_wall((x, y), rng.choice(options))
+    if costs:
+        maze.set_costs(bytearray(rng.randint(1, 9) for _ in range(width * height)))
+    return maze
+
+def bfs_distances(graph, start):
+    """
+    Returns the number of steps from `start` to every reachable node.
+    """
+    distances = {start: 0}
+    queue = deque([start])
+    while queue:
+        node = queue.popleft()
+        for neighbor in graph[node]:
+            if neighbor not in distances:
+                distances[neighbor] = distances[node] + 1
+                queue.append(neighbor)
+    return distances
+
+def weighted_distances(maze, start):
+    """
+    Returns the cost of the cheapest path from `start` to every reachable
+    cell, where each step costs the cost of the cell entered.
+    """
+    graph = maze.to_graph()
+    distances = {start: 0}
+    queue = [(0, start)]
+    while queue:
+        distance, node = heapq.heappop(queue)
+        if distance > distances[node]:
+            continue
+        for neighbor in graph[node]:
+            new_distance = distance + maze.cost(*neighbor)
+            if new_distance < distances.get(neighbor, new_distance + 1):
+                distances[neighbor] = new_distance
+                heapq.heappush(queue, (new_distance, neighbor))
+    return distances
+
+def path_cost(maze, path):
+    """
+    Returns the cost of a path: the cost of every cell entered.
+    """
+    return sum(maze.cost(*node) for node in path[1:])
+
+def assert_valid_path(graph, path, start, end):
+    """
+    Checks that `path` goes from `start` to `end` through open passages only.
+    """
+    assert path[0] == start and path[-1] == end
+    for a, b in zip(path, path[1:]):
+        assert b in graph[a]
+
+def assert_perfect_maze(maze):
+    """
+    Checks that the maze is a spanning tree of its cells: connected, without
+    cycles, with walls that agree on both sides and a closed border.
+    """
+    graph = maze.to_graph()
+    for node, neighbors in graph.items():
+        for neighbor in neighbors:
+            assert node in graph[neighbor]
+    n_edges = sum(len(neighbors) for neighbors in graph.values()) // 2
+    assert n_edges == maze.width * maze.height - 1
+    assert len(bfs_distances(graph, (0, 0))) == maze.width * maze.height
@@ -0,0 +1,56 @@
+import random
+
+import pytest
+
+import batch
+from maze import Maze
+from batch import solve_many, SOLVERS, WEIGHTED_SOLVERS
+from cli import random_pairs
+from helpers import looped_maze
+
+def test_bad_algorithm_raises_before_iteration():
+    maze = looped_maze(6, 6, seed=1)
+    with pytest.raises(ValueError):
+        solve_many(maze, [((0, 0), (5, 5))], 'no_such_solver', workers=1)
+    with pytest.raises(ValueError):
+        solve_many(maze, [((0, 0), (5, 5))], 'no_such_solver', workers=2)
+    costed = looped_maze(6, 6, seed=1, costs=True)
+    with pytest.raises(ValueError):
+        solve_many(costed, [((0, 0), (5, 5))], 'astar', workers=1)
+
+def test_single_worker_leaves_module_state_alone():
+    maze = looped_maze(6, 6, seed=2)
+    list(solve_many(maze, [((0, 0), (5, 5))], 'astar', workers=1))
+    assert batch._worker_graph is None
+    assert batch._worker_solver is None
+
+@pytest.mark.parametrize('algorithm', sorted(SOLVERS))
+@pytest.mark.parametrize('lazy_graph', [False, True])
+def test_results_follow_the_pairs_on_a_single_row(algorithm, lazy_graph):
+    maze = Maze.generate(8, 1, seed=3)
+    if algorithm in WEIGHTED_SOLVERS:
+        maze.set_costs(bytearray([2]) * 8)
+    pairs = [((0, 0), (7, 0)), ((3, 0), (3, 0)), ((7, 0), (5, 0))]
+    results = list(solve_many(maze, pairs, algorithm, workers=1, lazy_graph=lazy_graph))
+    assert [path for path, _ in results] == [[(x, 0) for x in range(8)], [(3, 0)],
+                                             [(7, 0), (6, 0), (5, 0)]]
+    for (start, _), (_, visited) in zip(pairs, results):
+        assert start in visited
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_no_pairs_and_unreachable_pairs(workers):
+    assert list(solve_many(Maze(3, 1), [], 'astar', workers=workers)) == []
+    # No walls are open, so only the start is ever reached.
+    results = solve_many(Maze(3, 1), [((0, 0), (2, 0))], 'astar', workers=workers,
+                         include_visited=False)
+    assert list(results) == [([], None)]
+
+def test_pool_matches_single_process():
+    rng = random.Random(5)
+    maze = looped_maze(15, 15, seed=5)
+    pairs = random_pairs(rng, maze.width, maze.height, 12)
+    serial = list(solve_many(maze, pairs, 'dijkstra', workers=1))
+    pooled = list(solve_many(maze, pairs, 'dijkstra', workers=2, chunksize=3))
+    assert pooled == serial
+    # The temporary shared copy is gone and the caller's maze is untouched.
+    assert maze.shared_name is None
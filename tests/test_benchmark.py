@@ -0,0 +1,64 @@
+import json
+import random
+
+import pytest
+
+import benchmark
+from benchmark import CASES, Fixture, run_case, compare, legacy_dijkstra
+from dijkstra import dijkstra
+
+@pytest.fixture(scope='module')
+def fixture():
+    return Fixture(12, seed=3)
+
+@pytest.mark.parametrize('name', list(CASES))
+def test_every_case_runs(fixture, name):
+    result = run_case(name, fixture, measure_memory=(name == 'dijkstra'))
+    assert result['case'] == name and result['size'] == 12
+    assert result['seconds'] >= 0
+    assert (result['peak_bytes'] is not None) == (name == 'dijkstra')
+    assert result['nodes_expanded'] is None or result['nodes_expanded'] > 0
+
+def test_fixture_is_seeded():
+    assert Fixture(10, 1).maze.grid == Fixture(10, 1).maze.grid
+    assert Fixture(10, 1).targets == Fixture(10, 1).targets
+    assert Fixture(10, 1).weighted_graph == Fixture(10, 1).weighted_graph
+
+def test_fixture_leaves_the_global_random_state_alone():
+    random.seed(1)
+    state = random.getstate()
+    fixture = Fixture(10, 2)
+    fixture.weighted_graph
+    run_case('generate', fixture, measure_memory=False)
+    assert random.getstate() == state
+
+def test_legacy_dijkstra_matches(fixture):
+    path, _ = legacy_dijkstra(fixture.graph, fixture.start, fixture.end)
+    assert path == dijkstra(fixture.graph, fixture.start, fixture.end)[0]
+
+def test_compare_flags_slowdowns_over_the_threshold():
+    baseline = {'results': [{'case': 'a', 'size': 10, 'seconds': 1.0},
+                            {'case': 'b', 'size': 10, 'seconds': 1.0}]}
+    results = [{'case': 'a', 'size': 10, 'seconds': 1.1},
+               {'case': 'b', 'size': 10, 'seconds': 1.3},
+               {'case': 'c', 'size': 10, 'seconds': 9.0}]
+    assert compare(results, baseline, 0.2) == [(results[1], 1.0)]
+
+def test_main_writes_json_and_checks_the_baseline(tmp_path, capsys):
+    output = str(tmp_path / 'results.json')
+    argv = ['--sizes', '10', '--cases', 'generate,dijkstra', '--no-memory']
+    assert benchmark.main(argv + ['--json', output]) == 0
+    with open(output) as stream:
+        report = json.load(stream)
+    assert [r['case'] for r in report['results']] == ['generate', 'dijkstra']
+
+    for result in report['results']:
+        result['seconds'] = 1e-9
+    fast = str(tmp_path / 'fast_baseline.json')
+    with open(fast, 'w') as stream:
+        json.dump(report, stream)
+    assert benchmark.main(argv + ['--baseline', fast]) == 1
+    assert 'REGRESSION' in capsys.readouterr().out
+
+    with pytest.raises(SystemExit):
+        benchmark.main(['--cases', 'no_such_case'])
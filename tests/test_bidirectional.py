@@ -0,0 +1,35 @@
+import pytest
+
+from maze import Maze
+from bidirectional import bidirectional_bfs, bidirectional_astar
+from helpers import looped_maze, bfs_distances, assert_valid_path
+
+SOLVERS = [bidirectional_bfs, bidirectional_astar]
+
+@pytest.mark.parametrize('solver', SOLVERS)
+def test_open_grid(solver):
+    # Many ties between equally short paths.
+    maze = looped_maze(12, 12, seed=1, loops=5)
+    graph = maze.to_graph()
+    path, _ = solver(graph, (0, 0), (11, 11))
+    assert_valid_path(graph, path, (0, 0), (11, 11))
+    assert len(path) - 1 == bfs_distances(graph, (0, 0))[(11, 11)]
+
+@pytest.mark.parametrize('solver', SOLVERS)
+def test_edge_cases(solver):
+    graph = {(0, 0): [(1, 0)], (1, 0): [(0, 0)], (2, 0): []}
+    assert solver(graph, (0, 0), (2, 0))[0] == []
+    assert solver(graph, (0, 0), (0, 0))[0] == [(0, 0)]
+    assert solver(graph, (0, 0), (1, 0))[0] == [(0, 0), (1, 0)]
+
+@pytest.mark.parametrize('solver', SOLVERS)
+@pytest.mark.parametrize('width, height', [(9, 1), (1, 9)])
+def test_fronts_meet_along_a_corridor(solver, width, height):
+    # Odd and even numbers of steps, so the fronts meet on a cell or
+    # between two.
+    graph = Maze.generate(width, height, seed=5).to_graph()
+    cells = sorted(graph, key=lambda cell: cell[0] + cell[1])
+    for length in (8, 7, 1):
+        path, visited = solver(graph, cells[0], cells[length])
+        assert path == cells[:length + 1]
+        assert cells[0] in visited
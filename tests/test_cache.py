@@ -0,0 +1,88 @@
+import pytest
+
+from maze import Maze
+from cache import LRUCache, SolverCache
+from dijkstra import dijkstra
+from helpers import looped_maze
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert 'b' not in cache
+    assert 'a' in cache and 'c' in cache
+    assert cache.get('b', 'missing') == 'missing'
+    assert cache.stats() == {'entries': 2, 'bytes': 0, 'hits': 1, 'misses': 1, 'evictions': 1}
+
+def test_lru_byte_bound():
+    cache = LRUCache(max_entries=None, max_bytes=10, sizeof=len)
+    cache.put('a', 'xxxx')
+    cache.put('b', 'yyyy')
+    cache.put('a', 'xxxxxx')
+    assert cache.n_bytes == 10 and len(cache) == 2
+    cache.put('c', 'z')
+    assert 'b' not in cache and cache.n_bytes == 7
+    # Too large to ever fit: not stored, nothing else evicted.
+    cache.put('d', 'w' * 11)
+    assert 'd' not in cache and len(cache) == 2
+    cache.clear()
+    assert len(cache) == 0 and cache.n_bytes == 0
+
+def test_fingerprint_follows_content():
+    maze = Maze.generate(8, 6, seed=1)
+    same = Maze(8, 6, bytearray(maze.grid))
+    assert maze.fingerprint() == same.fingerprint()
+    assert maze.fingerprint() != Maze(6, 8, bytearray(maze.grid)).fingerprint()
+
+    before = maze.fingerprint()
+    a, b = (0, 0), (1, 0)
+    if maze.has_wall(a, b):
+        maze.open_wall(a, b)
+    else:
+        maze.close_wall(a, b)
+    assert maze.fingerprint() != before
+
+    before = maze.fingerprint()
+    maze.randomize_costs()
+    assert maze.fingerprint() != before
+
+def test_solver_cache_reuses_results_until_the_maze_changes():
+    maze = looped_maze(10, 10, seed=2)
+    cache = SolverCache()
+    first = cache.solve(maze, (0, 0), (9, 9), 'astar')
+    assert cache.solve(maze, (0, 0), (9, 9), 'astar') is first
+    assert len(first[0]) == len(dijkstra(maze.to_graph(), (0, 0), (9, 9))[0])
+    # A second query on the same maze reuses the graph.
+    cache.solve(maze, (0, 0), (5, 5), 'dijkstra')
+    assert cache.stats()['hits'] == 2
+
+    a, b = first[0][0], first[0][1]
+    maze.close_wall(a, b)
+    path, _ = cache.solve(maze, (0, 0), (9, 9), 'astar')
+    assert len(path) == len(dijkstra(maze.to_graph(), (0, 0), (9, 9))[0])
+    assert (a, b) not in zip(path, path[1:])
+
+def test_solver_cache_edge_cases():
+    cache = SolverCache()
+    assert cache.solve(Maze(3, 1), (1, 0), (1, 0))[0] == [(1, 0)]
+    assert cache.solve(Maze(3, 1), (0, 0), (2, 0)) == ([], {(0, 0)})
+
+def test_solver_cache_follows_cost_changes():
+    # A ring of four cells: two equally long ways from (0, 0) to (1, 1).
+    maze = Maze(2, 2)
+    for a, b in [((0, 0), (1, 0)), ((1, 0), (1, 1)), ((1, 1), (0, 1)), ((0, 1), (0, 0))]:
+        maze.open_wall(a, b)
+    cache = SolverCache()
+    maze.set_costs(bytearray([1, 9, 1, 1]))
+    assert cache.solve(maze, (0, 0), (1, 1), 'dial_dijkstra')[0] == [(0, 0), (0, 1), (1, 1)]
+    maze.set_costs(bytearray([1, 1, 9, 1]))
+    assert cache.solve(maze, (0, 0), (1, 1), 'dial_dijkstra')[0] == [(0, 0), (1, 0), (1, 1)]
+
+def test_solver_cache_rejects_bad_algorithms():
+    cache = SolverCache()
+    with pytest.raises(ValueError):
+        cache.solve(Maze.generate(4, 4, seed=3), (0, 0), (3, 3), 'no_such_solver')
+    with pytest.raises(ValueError):
+        cache.solve(looped_maze(4, 4, seed=3, costs=True), (0, 0), (3, 3), 'astar')
@@ -0,0 +1,75 @@
+import csv
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+
+import pytest
+
+import cli
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def run_batch(*args):
+    return subprocess.run([sys.executable, '-X', 'importtime', os.path.join(ROOT, 'maze.py'),
+                           'batch'] + list(args), capture_output=True, text=True, cwd=ROOT)
+
+def imported(stderr):
+    return [line.rsplit('|', 1)[-1].strip() for line in stderr.splitlines()
+            if line.startswith('import time:')]
+
+def test_batch_mode_starts_without_pygame_numpy_or_a_second_maze_import():
+    result = run_batch('--size', '12', '--pairs', '3', '--seed', '4')
+    assert result.returncode == 0, result.stderr
+    modules = imported(result.stderr)
+    assert 'maze' in modules and modules.count('maze') == 1
+    assert not any(name.split('.')[0] in ('pygame', 'numpy', 'multiprocessing')
+                   for name in modules)
+    rows = [json.loads(line) for line in result.stdout.splitlines()]
+    assert len(rows) == 3 and rows[0]['width'] == 12
+    summary = json.loads(result.stderr.splitlines()[-1])
+    assert summary['results'] == 3 and summary['first_result_seconds'] > 0
+
+def test_rows_match_the_solvers(capsys):
+    assert cli.main(['--size', '10', '--count', '2', '--pair', '0,0:9,9',
+                     '--generator', 'wilson', '--algorithm', 'astar', '--format', 'csv']) == 0
+    output = capsys.readouterr()
+    rows = list(csv.DictReader(io.StringIO(output.out)))
+    assert [row['seed'] for row in rows] == ['0', '1']
+    from maze import Maze
+    from astar import astar
+    for row in rows:
+        maze = Maze.generate(10, 10, 'wilson', seed=int(row['seed']))
+        assert int(row['path_length']) == len(astar(maze.to_graph(), (0, 0), (9, 9))[0])
+
+def test_same_seed_same_rows(capsys):
+    cli.main(['--size', '15', '--pairs', '5', '--seed', '9'])
+    first = [dict(json.loads(line), seconds=None) for line in capsys.readouterr().out.splitlines()]
+    cli.main(['--size', '15', '--pairs', '5', '--seed', '9'])
+    second = [dict(json.loads(line), seconds=None) for line in capsys.readouterr().out.splitlines()]
+    assert first == second
+
+@pytest.mark.parametrize('args', [
+    ['--size', '0'],
+    ['--pair', '0,0:10,10', '--size', '10'],
+    ['--pair', 'nonsense'],
+    ['--costs', '--algorithm', 'astar'],
+])
+def test_bad_arguments_exit_with_an_error(args, capsys):
+    with pytest.raises(SystemExit) as error:
+        cli.main(args)
+    assert error.value.code == 2
+
+def test_costs_leave_the_global_random_state_alone(capsys):
+    args = ['--size', '8', '--count', '2', '--pairs', '2', '--costs', '--algorithm', 'dial_dijkstra']
+    random.seed(1)
+    state = random.getstate()
+    assert cli.main(args) == 0
+    assert random.getstate() == state
+    first = [dict(json.loads(line), seconds=None) for line in capsys.readouterr().out.splitlines()]
+    random.seed(2)
+    cli.main(args)
+    second = [dict(json.loads(line), seconds=None) for line in capsys.readouterr().out.splitlines()]
+    assert first == second
@@ -0,0 +1,47 @@
+from maze import Maze
+from contraction import CorridorGraph
+from helpers import looped_maze, bfs_distances, assert_valid_path
+
+def test_only_junctions_and_ends_are_visited():
+    graph = looped_maze(16, 16, seed=3, loops=0.1).to_graph()
+    corridors = CorridorGraph(graph)
+    for start, end in [((0, 0), (15, 15)), ((7, 3), (8, 12)), ((15, 0), (0, 15))]:
+        path, visited = corridors.solve(start, end)
+        assert_valid_path(graph, path, start, end)
+        assert visited <= corridors.junctions | {start, end}
+
+def test_single_row_ends_inside_one_corridor():
+    graph = Maze.generate(8, 1, seed=4).to_graph()
+    corridors = CorridorGraph(graph)
+    # Only the two dead ends are junctions.
+    assert corridors.junctions == {(0, 0), (7, 0)}
+    assert corridors.solve((2, 0), (5, 0))[0] == [(x, 0) for x in range(2, 6)]
+    assert corridors.solve((5, 0), (2, 0))[0] == [(x, 0) for x in range(5, 1, -1)]
+    assert corridors.solve((3, 0), (3, 0))[0] == [(3, 0)]
+    assert corridors.solve((7, 0), (6, 0))[0] == [(7, 0), (6, 0)]
+
+def test_corridor_cells_are_not_junctions():
+    maze = Maze.generate(30, 30, seed=1)
+    graph = maze.to_graph()
+    corridors = CorridorGraph(graph)
+    assert corridors.junctions == {node for node, neighbors in graph.items()
+                                   if len(neighbors) != 2}
+    # Edge lengths add up to the number of passages of the tree.
+    n_edges = sum(length for edges in corridors.edges.values() for _, length, _ in edges) // 2
+    assert n_edges == 30 * 30 - 1
+
+def test_ring_without_junctions():
+    maze = Maze(2, 2)
+    for a, b in [((0, 0), (1, 0)), ((1, 0), (1, 1)), ((1, 1), (0, 1)), ((0, 1), (0, 0))]:
+        maze.open_wall(a, b)
+    corridors = CorridorGraph(maze.to_graph())
+    for start, end in [((0, 0), (1, 1)), ((1, 0), (0, 0)), ((0, 1), (0, 1))]:
+        path, _ = corridors.solve(start, end)
+        assert path[0] == start and path[-1] == end
+        assert len(path) - 1 == bfs_distances(maze.to_graph(), start)[end]
+
+def test_unreachable_end():
+    maze = Maze(3, 1)
+    maze.open_wall((0, 0), (1, 0))
+    path, _ = CorridorGraph(maze.to_graph()).solve((0, 0), (2, 0))
+    assert path == []
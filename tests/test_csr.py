@@ -0,0 +1,39 @@
+import random
+
+import pytest
+
+from maze import Maze
+from dijkstra import dijkstra_csr
+from astar import astar_csr
+from helpers import looped_maze
+
+@pytest.mark.parametrize('seed', range(10))
+def test_csr_matches_the_graph(seed):
+    rng = random.Random(seed)
+    maze = looped_maze(rng.randint(1, 12), rng.randint(1, 12), seed)
+    width = maze.width
+    graph = maze.to_graph()
+    offsets, targets = maze.to_csr()
+    assert len(offsets) == len(maze.grid) + 1
+    for (x, y), neighbors in graph.items():
+        i = x + y * width
+        assert [(t % width, t // width) for t in targets[offsets[i]:offsets[i + 1]]] == neighbors
+
+def test_csr_solvers_without_a_path():
+    # Two cells with the wall between them standing.
+    offsets, targets = Maze(2, 1).to_csr()
+    assert dijkstra_csr(offsets, targets, 0, 1) == ([], {0})
+    assert astar_csr(offsets, targets, 2, 0, 1) == ([], {0})
+
+def test_csr_solvers_start_is_end():
+    offsets, targets = Maze.generate(3, 3, seed=1).to_csr()
+    assert dijkstra_csr(offsets, targets, 4, 4) == ([4], {4})
+    assert astar_csr(offsets, targets, 3, 4, 4) == ([4], {4})
+
+@pytest.mark.parametrize('width, height', [(7, 1), (1, 7)])
+def test_csr_solvers_on_a_single_row_or_column(width, height):
+    # Node numbers run along the corridor either way; A* must still get the
+    # coordinates right when the width is 1.
+    offsets, targets = Maze.generate(width, height, seed=2).to_csr()
+    assert dijkstra_csr(offsets, targets, 5, 1)[0] == [5, 4, 3, 2, 1]
+    assert astar_csr(offsets, targets, width, 5, 1)[0] == [5, 4, 3, 2, 1]
@@ -0,0 +1,29 @@
+import pytest
+
+from maze import Maze
+from dijkstra import dijkstra, dijkstra_animated
+
+def run_animated(graph, start, end):
+    steps = list(dijkstra_animated(graph, start, end))
+    return steps[-1], set(steps[:-1])
+
+@pytest.mark.parametrize('solver', [dijkstra, run_animated])
+def test_unreachable_end_returns_no_path(solver):
+    graph = {(0, 0): [(1, 0)], (1, 0): [(0, 0)], (2, 0): []}
+    path, visited = solver(graph, (0, 0), (2, 0))
+    assert path == []
+    assert visited == {(0, 0), (1, 0)}
+
+@pytest.mark.parametrize('solver', [dijkstra, run_animated])
+def test_start_is_end(solver):
+    path, visited = solver({(0, 0): []}, (0, 0), (0, 0))
+    assert path == [(0, 0)]
+    assert visited == {(0, 0)}
+
+@pytest.mark.parametrize('solver', [dijkstra, run_animated])
+def test_single_row_maze(solver):
+    # A perfect 1xN maze is one corridor; the search spreads both ways.
+    graph = Maze.generate(6, 1, seed=0).to_graph()
+    path, visited = solver(graph, (4, 0), (1, 0))
+    assert path == [(4, 0), (3, 0), (2, 0), (1, 0)]
+    assert visited == {(x, 0) for x in range(1, 6)}
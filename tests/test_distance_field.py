@@ -0,0 +1,53 @@
+import random
+
+import pytest
+
+import maze as maze_module
+from maze import Maze
+from distance_field import distance_field
+from helpers import looped_maze, bfs_distances, weighted_distances, path_cost, assert_valid_path
+
+@pytest.mark.parametrize('seed', range(15))
+@pytest.mark.parametrize('costs', [False, True])
+def test_distances_and_paths_match_the_references(seed, costs):
+    rng = random.Random(seed)
+    maze = looped_maze(rng.randint(1, 16), rng.randint(1, 16), seed, loops=0.3, costs=costs)
+    graph = maze.to_graph()
+    source = (rng.randrange(maze.width), rng.randrange(maze.height))
+    expected = weighted_distances(maze, source) if costs else bfs_distances(graph, source)
+    field = distance_field(maze, source)
+    assert field.max_distance == max(expected.values())
+    for node, distance in expected.items():
+        assert field.distance(node) == distance
+        path = field.path(node)
+        assert_valid_path(graph, path, source, node)
+        assert (path_cost(maze, path) if costs else len(path) - 1) == distance
+
+def test_unreachable_cells():
+    maze = Maze(3, 2)
+    maze.open_wall((0, 0), (1, 0))
+    field = distance_field(maze, (0, 0))
+    assert field.distance((1, 0)) == 1
+    assert field.distance((2, 1)) is None
+    assert field.path((2, 1)) == []
+    assert field.path((0, 0)) == [(0, 0)]
+    assert list(field.flat_parents) == [-1, 0, -1, -1, -1, -1]
+
+def test_source_outside_the_maze():
+    with pytest.raises(ValueError):
+        distance_field(Maze(3, 3), (3, 0))
+
+def test_numpy_arrays_share_the_flat_arrays():
+    pytest.importorskip('numpy')
+    maze = Maze.generate(7, 4, seed=1)
+    field = distance_field(maze, (6, 3))
+    assert field.distances.shape == (4, 7) and field.parents.shape == (4, 7)
+    assert field.distances[3, 6] == 0
+    assert field.distances[1, 2] == field.distance((2, 1))
+    field.flat_distances[5] = 99
+    assert field.distances[0, 5] == 99
+
+def test_without_numpy(monkeypatch):
+    monkeypatch.setattr(maze_module, '_numpy', None)
+    field = distance_field(Maze.generate(5, 5, seed=2), (0, 0))
+    assert field.distances is field.flat_distances
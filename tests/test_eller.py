@@ -0,0 +1,33 @@
+import pytest
+
+from maze import Maze
+from eller import eller_rows, generate_to_file
+from helpers import bfs_distances
+
+@pytest.mark.parametrize('width, height', [(1, 1), (1, 9), (9, 1), (13, 7), (30, 30)])
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_rows_make_a_perfect_maze(width, height, seed):
+    rows = list(eller_rows(width, height, seed))
+    assert len(rows) == height and all(len(row) == width for row in rows)
+    maze = Maze(width, height, bytearray(b''.join(rows)))
+    graph = maze.to_graph()
+    n_edges = sum(len(neighbors) for neighbors in graph.values()) // 2
+    assert n_edges == width * height - 1
+    assert len(bfs_distances(graph, (0, 0))) == width * height
+    # Walls agree on both sides, and the border is closed.
+    for (x, y), neighbors in graph.items():
+        for neighbor in neighbors:
+            assert (x, y) in graph[neighbor]
+            assert 0 <= neighbor[0] < width and 0 <= neighbor[1] < height
+
+def test_generate_to_file_round_trip(tmp_path):
+    path = str(tmp_path / 'eller.maze')
+    seed = generate_to_file(path, 17, 11, seed=5)
+    assert seed == 5
+    maze = Maze.load(path)
+    assert (maze.width, maze.height, maze.seed) == (17, 11, 5)
+    assert bytes(maze.grid) == b''.join(eller_rows(17, 11, 5))
+
+    other = str(tmp_path / 'random.maze')
+    seed = generate_to_file(other, 17, 11)
+    assert Maze.load(other).grid == bytearray(b''.join(eller_rows(17, 11, seed)))
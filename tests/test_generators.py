@@ -0,0 +1,42 @@
+import collections
+
+import pytest
+
+import maze as maze_module
+from maze import Maze
+from generators import GENERATORS
+from helpers import assert_perfect_maze
+
+@pytest.mark.parametrize('algorithm', sorted(GENERATORS))
+@pytest.mark.parametrize('width, height', [(1, 1), (1, 8), (8, 1), (2, 2), (17, 11), (40, 40)])
+@pytest.mark.parametrize('use_numpy', [True, False])
+def test_generators_build_perfect_mazes(monkeypatch, algorithm, width, height, use_numpy):
+    if not use_numpy:
+        monkeypatch.setattr(maze_module, '_numpy', None)
+    for seed in range(3):
+        assert_perfect_maze(Maze.generate(width, height, algorithm, seed=seed))
+
+@pytest.mark.parametrize('algorithm', sorted(GENERATORS))
+def test_same_seed_same_maze(algorithm):
+    first = Maze.generate(20, 15, algorithm, seed=9)
+    assert first.seed == 9
+    assert first.grid == Maze.generate(20, 15, algorithm, seed=9).grid
+    assert first.grid != Maze.generate(20, 15, algorithm, seed=10).grid
+
+def test_kruskal_does_not_depend_on_numpy(monkeypatch):
+    pytest.importorskip('numpy')
+    with_numpy = [Maze.generate(23, 17, 'kruskal', seed=seed).grid for seed in range(5)]
+    monkeypatch.setattr(maze_module, '_numpy', None)
+    assert [Maze.generate(23, 17, 'kruskal', seed=seed).grid for seed in range(5)] == with_numpy
+
+def test_unknown_algorithm():
+    with pytest.raises(ValueError):
+        Maze.generate(4, 4, 'prim')
+
+@pytest.mark.parametrize('algorithm', ['kruskal', 'wilson'])
+def test_spanning_trees_are_picked_uniformly(algorithm):
+    # A 2x2 grid has four spanning trees, one per missing inner wall.
+    counts = collections.Counter(bytes(Maze.generate(2, 2, algorithm, seed=seed).grid)
+                                 for seed in range(2000))
+    assert len(counts) == 4
+    assert all(400 <= count <= 600 for count in counts.values())
@@ -0,0 +1,47 @@
+import random
+
+import pytest
+
+from batch import SOLVERS, WEIGHTED_SOLVERS
+from cli import random_pairs
+from helpers import looped_maze
+
+@pytest.mark.parametrize('seed', range(10))
+@pytest.mark.parametrize('costs', [False, True])
+def test_view_equals_the_built_graph(seed, costs):
+    rng = random.Random(seed)
+    maze = looped_maze(rng.randint(1, 12), rng.randint(1, 12), seed, costs=costs)
+    assert dict(maze.graph_view()) == maze.to_graph()
+    assert dict(maze.graph_view(weighted=True)) == maze.to_weighted_graph()
+
+@pytest.mark.parametrize('algorithm', sorted(SOLVERS))
+def test_solvers_give_the_same_answers_on_the_view(algorithm):
+    rng = random.Random(1)
+    weighted = algorithm in WEIGHTED_SOLVERS
+    maze = looped_maze(14, 10, seed=1, costs=weighted)
+    graph = maze.to_weighted_graph() if weighted else maze.to_graph()
+    view = maze.graph_view(weighted)
+    solver = SOLVERS[algorithm]
+    for start, end in random_pairs(rng, maze.width, maze.height, 10):
+        assert solver(view, start, end) == solver(graph, start, end)
+
+def test_lookups_outside_the_maze():
+    view = looped_maze(4, 3, seed=2).graph_view()
+    assert len(view) == 12 and list(view)[:2] == [(0, 0), (1, 0)]
+    for node in [(4, 0), (0, -1), 'ab', None, (1, 2, 3)]:
+        assert node not in view
+        assert view.get(node, 'missing') == 'missing'
+        with pytest.raises(KeyError):
+            view[node]
+    assert (3, 2) in view
+    assert 'graph view of 4x3' in repr(view)
+
+def test_wall_edits_show_up_at_once():
+    maze = looped_maze(3, 3, seed=3)
+    view = maze.graph_view()
+    if maze.has_wall((0, 0), (1, 0)):
+        maze.open_wall((0, 0), (1, 0))
+    assert (1, 0) in view[(0, 0)]
+    maze.close_wall((0, 0), (1, 0))
+    assert (1, 0) not in view[(0, 0)]
+    assert (0, 0) not in view[(1, 0)]
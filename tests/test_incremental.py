@@ -0,0 +1,96 @@
+import random
+
+import pytest
+
+from maze import Maze, N_BIT, S_BIT, W_BIT, E_BIT
+from incremental import LPAStar
+from helpers import looped_maze, bfs_distances, assert_valid_path
+
+def random_wall(rng, maze):
+    """
+    Returns a random pair of neighboring cells.
+    """
+    x, y = rng.randrange(maze.width), rng.randrange(maze.height)
+    options = [(x + dx, y + dy) for dx, dy in ((1, 0), (0, 1), (-1, 0), (0, -1))
+               if 0 <= x + dx < maze.width and 0 <= y + dy < maze.height]
+    return (x, y), rng.choice(options)
+
+@pytest.mark.parametrize('seed', range(6))
+def test_paths_stay_shortest_under_random_edits(seed):
+    rng = random.Random(seed)
+    maze = looped_maze(rng.randint(2, 12), rng.randint(2, 12), seed, loops=0.2)
+    start = (rng.randrange(maze.width), rng.randrange(maze.height))
+    end = (rng.randrange(maze.width), rng.randrange(maze.height))
+    planner = LPAStar(maze, start, end)
+    try:
+        for _ in range(40):
+            # Several edits may pile up between two solves.
+            for _ in range(rng.randint(1, 3)):
+                a, b = random_wall(rng, maze)
+                if maze.has_wall(a, b):
+                    maze.open_wall(a, b)
+                else:
+                    maze.close_wall(a, b)
+            path, _ = planner.solve()
+            graph = maze.to_graph()
+            distances = bfs_distances(graph, start)
+            if end in distances:
+                assert_valid_path(graph, path, start, end)
+                assert len(path) - 1 == distances[end]
+            else:
+                assert path == []
+    finally:
+        planner.close()
+
+def test_repairs_are_local_and_free_when_nothing_changed():
+    maze = looped_maze(30, 30, seed=1, loops=0.3)
+    planner = LPAStar(maze, (0, 0), (29, 29))
+    path, first = planner.solve()
+    assert planner.solve() == (path, set())
+
+    # Closing and reopening the first step leaves the distances as they
+    # were, and the repair revisits less than the first search.
+    maze.close_wall(path[0], path[1])
+    maze.open_wall(path[0], path[1])
+    again, repaired = planner.solve()
+    assert len(again) == len(path)
+    assert len(repaired) < len(first)
+    planner.close()
+
+def test_close_stops_following_edits():
+    maze = Maze(2, 1)
+    planner = LPAStar(maze, (0, 0), (1, 0))
+    assert planner.solve()[0] == []
+    planner.close()
+    maze.open_wall((0, 0), (1, 0))
+    assert planner.solve()[0] == []
+    assert LPAStar(maze, (0, 0), (1, 0)).solve()[0] == [(0, 0), (1, 0)]
+
+def test_start_is_end():
+    maze = Maze.generate(3, 3, seed=2)
+    assert LPAStar(maze, (1, 1), (1, 1)).solve()[0] == [(1, 1)]
+    # Even when walled in.
+    assert LPAStar(Maze(3, 3), (1, 1), (1, 1)).solve()[0] == [(1, 1)]
+
+def test_single_row_cut_and_reconnected():
+    maze = Maze.generate(6, 1, seed=1)
+    planner = LPAStar(maze, (0, 0), (5, 0))
+    row = [(x, 0) for x in range(6)]
+    assert planner.solve()[0] == row
+    maze.close_wall((2, 0), (3, 0))
+    assert planner.solve()[0] == []
+    maze.open_wall((2, 0), (3, 0))
+    assert planner.solve()[0] == row
+    planner.close()
+
+def test_inconsistent_distances_are_not_walked_silently():
+    maze = Maze(3, 1)
+    maze.open_wall((0, 0), (1, 0))
+    maze.open_wall((1, 0), (2, 0))
+    planner = LPAStar(maze, (0, 0), (2, 0))
+    assert planner.solve()[0] == [(0, 0), (1, 0), (2, 0)]
+    # Bypass the edit hooks, so the distances no longer match the walls.
+    planner.close()
+    maze.grid[1] |= N_BIT | S_BIT | W_BIT | E_BIT
+    with pytest.raises(AssertionError):
+        planner._path()
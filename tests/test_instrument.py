@@ -0,0 +1,65 @@
+import pytest
+
+from maze import Maze
+from instrument import SolveResult
+from dijkstra import dijkstra, dijkstra_instrumented, dijkstra_animated
+from astar import astar, astar_instrumented, astar_animated
+from helpers import looped_maze
+
+PAIRS = [(dijkstra, dijkstra_instrumented), (astar, astar_instrumented)]
+
+@pytest.mark.parametrize('plain, instrumented', PAIRS)
+@pytest.mark.parametrize('end', [(9, 9), (4, 0), (0, 0)])
+def test_same_search_as_the_plain_solver(plain, instrumented, end):
+    graph = looped_maze(10, 10, seed=6, loops=0.3).to_graph()
+    expanded = []
+    result = instrumented(graph, (0, 0), end,
+                          on_expand=lambda node, distance, size: expanded.append(node))
+    path, visited = result
+    assert (path, visited) == plain(graph, (0, 0), end)
+    assert expanded[0] == (0, 0) and expanded[-1] == end
+    assert set(expanded) == visited
+    # Every pop is an expansion or a stale entry; pushes bound pops.
+    assert result.heap_pops == len(visited) + result.stale_pops
+    assert result.heap_pops <= result.heap_pushes
+    assert 1 <= result.peak_frontier <= result.heap_pushes
+    assert set(result.timings) == {'search', 'path'}
+
+@pytest.mark.parametrize('plain, instrumented', PAIRS)
+def test_single_row_counts(plain, instrumented):
+    # Along a corridor every cell is pushed and popped once, one at a time.
+    result = instrumented(Maze.generate(6, 1, seed=0).to_graph(), (0, 0), (5, 0))
+    assert len(result.path) == 6
+    assert (result.heap_pushes, result.heap_pops, result.stale_pops,
+            result.peak_frontier) == (6, 6, 0, 1)
+
+@pytest.mark.parametrize('plain, instrumented', PAIRS)
+def test_unreachable_end(plain, instrumented):
+    graph = {(0, 0): [(1, 0)], (1, 0): [(0, 0)], (5, 5): []}
+    result = instrumented(graph, (0, 0), (5, 5))
+    assert result.path == []
+    assert result.visited == {(0, 0), (1, 0)}
+
+@pytest.mark.parametrize('animated, instrumented', [(dijkstra_animated, dijkstra_instrumented),
+                                                     (astar_animated, astar_instrumented)])
+@pytest.mark.parametrize('end', [(9, 9), (4, 0), (0, 0)])
+def test_animated_solvers_count_the_same_work(animated, instrumented, end):
+    graph = looped_maze(10, 10, seed=6, loops=0.3).to_graph()
+    result = SolveResult([], set())
+    steps = list(animated(graph, (0, 0), end, result))
+    expected = instrumented(graph, (0, 0), end)
+    assert steps[-1] == result.path == expected.path
+    assert result.visited == expected.visited
+    assert (result.heap_pushes, result.heap_pops, result.stale_pops, result.peak_frontier) == \
+        (expected.heap_pushes, expected.heap_pops, expected.stale_pops, expected.peak_frontier)
+    assert set(result.timings) == {'search', 'path'}
+    # Without `result` the same nodes are yielded.
+    assert list(animated(graph, (0, 0), end)) == steps
+
+def test_counters():
+    result = SolveResult([(0, 0), (1, 0)], {(0, 0), (1, 0)}, 3, 2, 0, 2,
+                         {'search': 0.5, 'path': 0.25})
+    assert result.counters() == {'path_length': 2, 'visited': 2, 'heap_pushes': 3,
+                                 'heap_pops': 2, 'stale_pops': 0, 'peak_frontier': 2,
+                                 'search_seconds': 0.5, 'path_seconds': 0.25}
+    assert 'pushes=3' in repr(result)
@@ -0,0 +1,45 @@
+import pytest
+
+from maze import Maze, Cell, N, S, W, E, WALL_BITS, ALL_WALLS
+from helpers import assert_perfect_maze
+
+def test_new_maze_has_every_wall():
+    maze = Maze(4, 3)
+    assert isinstance(maze.grid, bytearray)
+    assert list(maze.grid) == [ALL_WALLS] * 12
+    assert all(cell.is_full() for cell in maze.cells)
+    assert maze[1, 2].walls == frozenset((N, S, W, E))
+
+def test_grid_is_row_major():
+    maze = Maze(4, 3)
+    maze[2, 1].connect(maze[3, 1])
+    assert maze.grid[2 + 1 * 4] == ALL_WALLS & ~WALL_BITS[E]
+    assert maze.grid[3 + 1 * 4] == ALL_WALLS & ~WALL_BITS[W]
+    assert E not in maze[2, 1] and W not in maze[3, 1]
+    assert N in maze[2, 1]
+
+def test_connect_twice_raises():
+    maze = Maze(2, 2)
+    maze[0, 0].connect(maze[0, 1])
+    with pytest.raises(KeyError):
+        maze[0, 0].connect(maze[0, 1])
+
+def test_grid_size_is_checked():
+    with pytest.raises(ValueError):
+        Maze(3, 3, bytearray(8))
+
+def test_cells_and_lookup():
+    maze = Maze(3, 2)
+    assert len(maze.cells) == 6
+    assert maze.cells[-1] == Cell(maze, 2, 1)
+    assert [(cell.x, cell.y) for cell in maze.cells][:4] == [(0, 0), (1, 0), (2, 0), (0, 1)]
+    assert maze[3, 0] is None and maze[0, -1] is None
+    assert [(c.x, c.y) for c in maze.neighbors(maze[0, 0])] == [(0, 1), (1, 0)]
+
+@pytest.mark.parametrize('width, height', [(1, 1), (1, 7), (9, 1), (12, 8)])
+def test_randomize_builds_a_perfect_maze(width, height):
+    assert_perfect_maze(Maze.generate(width, height, seed=width * 100 + height))
+
+def test_same_seed_same_maze():
+    assert Maze.generate(15, 9, seed=4).grid == Maze.generate(15, 9, seed=4).grid
+    assert Maze.generate(15, 9, seed=4).grid != Maze.generate(15, 9, seed=5).grid
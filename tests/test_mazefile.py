@@ -0,0 +1,94 @@
+import pickle
+import struct
+
+import pytest
+
+import mazefile
+from maze import Maze
+from helpers import looped_maze
+
+@pytest.mark.parametrize('use_mmap', [False, True])
+@pytest.mark.parametrize('costs', [False, True])
+def test_save_load_round_trip(tmp_path, use_mmap, costs):
+    maze = looped_maze(23, 9, seed=3, costs=costs)
+    path = str(tmp_path / 'maze.bin')
+    maze.save(path)
+    loaded = Maze.load(path, mmap=use_mmap)
+    try:
+        assert (loaded.width, loaded.height, loaded.seed) == (23, 9, 3)
+        assert bytes(loaded.grid) == bytes(maze.grid)
+        if costs:
+            assert bytes(loaded.costs) == bytes(maze.costs)
+        else:
+            assert loaded.costs is None
+        assert loaded.fingerprint() == maze.fingerprint()
+        assert loaded.to_graph() == maze.to_graph()
+    finally:
+        loaded.close()
+
+def test_file_layout(tmp_path):
+    path = str(tmp_path / 'maze.bin')
+    maze = Maze.generate(5, 4, seed=7)
+    maze.save(path)
+    data = open(path, 'rb').read()
+    assert len(data) == mazefile.HEADER.size + 20
+    assert mazefile.unpack_header(data) == (5, 4, 7, False)
+    assert data[mazefile.HEADER.size:] == bytes(maze.grid)
+
+    Maze(5, 4).save(path)
+    assert Maze.load(path).seed is None
+
+def test_mmap_edits_stay_in_memory(tmp_path):
+    path = str(tmp_path / 'maze.bin')
+    Maze(3, 3).save(path)
+    maze = Maze.load(path, mmap=True)
+    maze.open_wall((0, 0), (1, 0))
+    assert not maze.has_wall((0, 0), (1, 0))
+    maze.close()
+    assert Maze.load(path).has_wall((0, 0), (1, 0))
+
+def test_mmap_maze_pickles(tmp_path):
+    path = str(tmp_path / 'maze.bin')
+    looped_maze(8, 8, seed=4, costs=True).save(path)
+    maze = Maze.load(path, mmap=True)
+    # Unmodified: mapped again from the file on the other side.
+    copy = pickle.loads(pickle.dumps(maze))
+    assert bytes(copy.grid) == bytes(maze.grid)
+    assert bytes(copy.costs) == bytes(maze.costs)
+    copy.close()
+    # Modified: sent by value.
+    maze.close_wall((0, 0), (0, 1))
+    maze.open_wall((0, 0), (0, 1))
+    copy = pickle.loads(pickle.dumps(maze))
+    assert isinstance(copy.grid, bytearray)
+    assert bytes(copy.grid) == bytes(maze.grid)
+    maze.close()
+
+@pytest.mark.parametrize('use_mmap', [False, True])
+def test_bad_files_are_rejected(tmp_path, use_mmap):
+    path = tmp_path / 'maze.bin'
+    header = mazefile.pack_header(4, 4, seed=1)
+
+    path.write_bytes(header + bytes(15))
+    with pytest.raises(ValueError, match='truncated'):
+        Maze.load(str(path), mmap=use_mmap)
+
+    path.write_bytes(header[:10])
+    with pytest.raises(ValueError, match='truncated'):
+        Maze.load(str(path), mmap=use_mmap)
+
+    path.write_bytes(b'MAZX' + header[4:] + bytes(16))
+    with pytest.raises(ValueError, match='magic'):
+        Maze.load(str(path), mmap=use_mmap)
+
+    version = struct.pack('<H', mazefile.FORMAT_VERSION + 1)
+    path.write_bytes(header[:4] + version + header[6:] + bytes(16))
+    with pytest.raises(ValueError, match='version'):
+        Maze.load(str(path), mmap=use_mmap)
+
+def test_write_rows_checks_the_shape(tmp_path):
+    path = str(tmp_path / 'maze.bin')
+    with pytest.raises(ValueError):
+        mazefile.write_rows(path, 3, 2, [bytearray(3), bytearray(2)])
+    with pytest.raises(ValueError):
+        mazefile.write_rows(path, 3, 2, [bytearray(3)])
@@ -0,0 +1,67 @@
+import random
+
+import pytest
+
+from maze import Maze
+from multi import multi_dijkstra, multi_astar, PairPath
+from helpers import looped_maze, bfs_distances, assert_valid_path
+
+SOLVERS = [multi_dijkstra, multi_astar]
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('solver', SOLVERS)
+def test_nearest_and_all_targets_match_bfs_on_looped_mazes(solver, seed):
+    rng = random.Random(seed)
+    width, height = rng.randint(1, 14), rng.randint(1, 14)
+    maze = looped_maze(width, height, seed, loops=rng.choice([0, 0.3]))
+    graph = maze.to_graph()
+    cells = [(x, y) for y in range(height) for x in range(width)]
+    sources = rng.sample(cells, min(len(cells), rng.randint(1, 4)))
+    targets = rng.sample(cells, min(len(cells), rng.randint(1, 6)))
+    from_sources = [bfs_distances(graph, source) for source in sources]
+    expected = {target: min(distances[target] for distances in from_sources)
+                for target in targets}
+
+    results, visited = solver(graph, sources, targets)
+    assert len(results) == 1
+    nearest = results[0]
+    assert nearest.distance == min(expected.values())
+    assert nearest.source in sources and nearest.target in targets
+    assert_valid_path(graph, nearest.path, nearest.source, nearest.target)
+    assert nearest.target in visited
+
+    results, _ = solver(graph, sources, targets, find_all=True)
+    assert {result.target: result.distance for result in results} == expected
+    assert [r.distance for r in results] == sorted(r.distance for r in results)
+    for result in results:
+        assert_valid_path(graph, result.path, result.source, result.target)
+        # Each target is answered from its nearest source.
+        assert from_sources[sources.index(result.source)][result.target] == result.distance
+
+@pytest.mark.parametrize('solver', SOLVERS)
+def test_unreachable_targets_are_left_out(solver):
+    graph = {(0, 0): [(1, 0)], (1, 0): [(0, 0)], (2, 0): []}
+    results, _ = solver(graph, [(0, 0)], [(2, 0), (1, 0)], find_all=True)
+    assert [(r.source, r.target, r.path) for r in results] == [((0, 0), (1, 0), [(0, 0), (1, 0)])]
+    assert solver(graph, [(0, 0)], [(2, 0)])[0] == []
+
+@pytest.mark.parametrize('solver', SOLVERS)
+def test_source_on_a_target(solver):
+    graph = {(0, 0): [(1, 0)], (1, 0): [(0, 0)]}
+    (result,), _ = solver(graph, [(1, 0), (0, 0)], [(0, 0)])
+    assert isinstance(result, PairPath)
+    assert (result.source, result.target, result.distance) == ((0, 0), (0, 0), 0)
+
+@pytest.mark.parametrize('solver', SOLVERS)
+def test_single_row_answers_each_target_from_the_nearer_end(solver):
+    graph = Maze.generate(9, 1, seed=2).to_graph()
+    results, _ = solver(graph, [(0, 0), (8, 0)], [(2, 0), (3, 0), (7, 0)], find_all=True)
+    assert [(r.source, r.target, r.distance) for r in results] == [
+        ((8, 0), (7, 0), 1), ((0, 0), (2, 0), 2), ((0, 0), (3, 0), 3)]
+
+@pytest.mark.parametrize('solver', SOLVERS)
+def test_empty_ends_are_rejected(solver):
+    with pytest.raises(ValueError):
+        solver({}, [], [(0, 0)])
+    with pytest.raises(ValueError):
+        solver({}, [(0, 0)], [])
@@ -0,0 +1,54 @@
+import io
+import random
+
+import pytest
+
+import maze as maze_module
+from maze import Maze
+from dijkstra import dijkstra
+from helpers import looped_maze
+
+np = pytest.importorskip('numpy')
+
+def plain(monkeypatch, render):
+    """
+    Returns what `render()` gives without NumPy.
+    """
+    with monkeypatch.context() as patch:
+        patch.setattr(maze_module, '_numpy', None)
+        return render()
+
+@pytest.mark.parametrize('seed', range(12))
+def test_numpy_repr_matches_the_plain_renderer(monkeypatch, seed):
+    rng = random.Random(seed)
+    maze = looped_maze(rng.randint(1, 14), rng.randint(1, 14), seed, loops=rng.choice([0, 0.3]))
+    assert repr(maze) == plain(monkeypatch, lambda: repr(maze))
+
+@pytest.mark.parametrize('seed', range(12))
+@pytest.mark.parametrize('char', ['*', 'O', ' ', '#'])
+def test_numpy_draw_path_matches_the_plain_renderer(monkeypatch, seed, char):
+    rng = random.Random(seed)
+    maze = looped_maze(rng.randint(1, 14), rng.randint(1, 14), seed)
+    end = (rng.randrange(maze.width), rng.randrange(maze.height))
+    path = dijkstra(maze.to_graph(), (0, 0), end)[0]
+    assert maze.draw_path(path, char) == plain(monkeypatch, lambda: maze.draw_path(path, char))
+
+@pytest.mark.parametrize('band_height', [1, 2, 5, 256])
+def test_bands_join_seamlessly(monkeypatch, band_height):
+    maze = looped_maze(9, 13, seed=4)
+    path = dijkstra(maze.to_graph(), (0, 0), (8, 12))[0]
+    expected = plain(monkeypatch, lambda: maze.draw_path(path))
+    lines = list(maze.iter_lines(path, band_height=band_height))
+    assert len(lines) == 2 * maze.height + 1
+    assert ''.join(lines) == expected
+
+    stream = io.StringIO()
+    maze.write(stream)
+    assert stream.getvalue() == repr(maze)
+
+def test_docstring_example_shape():
+    text = repr(Maze.generate(5, 5, seed=1))
+    lines = text.splitlines()
+    assert len(lines) == 11
+    assert all(len(line) == 21 for line in lines)
+    assert lines[0][0] == '┌' and lines[-1][-1] == '┘'
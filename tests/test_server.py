@@ -0,0 +1,225 @@
+import asyncio
+import json
+import os
+import signal
+import time
+
+from server import MazeServer
+
+def request(server, **fields):
+    return server.handle_line(json.dumps(fields))
+
+def test_drop_waits_for_offloaded_solves():
+    async def scenario():
+        server = MazeServer(workers=2, inline_max_cells=100)
+        try:
+            response = await request(server, op='generate', name='big', width=100,
+                                     height=100, seed=1)
+            shared_name = response['shared_name']
+            solves = [asyncio.ensure_future(request(server, op='solve', name='big',
+                                                    start=[0, 0], end=[99, 99],
+                                                    include_path=False))
+                      for _ in range(40)]
+            await asyncio.sleep(0)
+            assert (await request(server, op='drop', name='big'))['ok']
+            responses = await asyncio.gather(*solves)
+            assert [r['error'] for r in responses if not r['ok']] == []
+            assert len({r['path_length'] for r in responses}) == 1
+            # Released once the last solve finished.
+            assert not os.path.exists('/dev/shm/' + shared_name)
+            assert server.in_flight == {} and server.retired == set()
+
+            # The pool is still healthy.
+            await request(server, op='generate', name='other', width=100, height=100, seed=2)
+            response = await request(server, op='solve', name='other', start=[0, 0],
+                                     end=[5, 5], include_path=False)
+            assert response['ok']
+        finally:
+            server.close()
+    asyncio.run(scenario())
+
+def test_replace_waits_for_offloaded_solves():
+    async def scenario():
+        server = MazeServer(workers=2, inline_max_cells=100)
+        try:
+            await request(server, op='generate', name='big', width=100, height=100, seed=1)
+            solves = [asyncio.ensure_future(request(server, op='solve', name='big',
+                                                    start=[0, 0], end=[99, 99],
+                                                    include_path=False))
+                      for _ in range(20)]
+            await asyncio.sleep(0)
+            response = await request(server, op='generate', name='big', width=100,
+                                     height=100, seed=2)
+            assert response['ok']
+            responses = await asyncio.gather(*solves)
+            assert all(r['ok'] for r in responses)
+        finally:
+            server.close()
+    asyncio.run(scenario())
+
+def test_pool_restarts_after_a_worker_dies():
+    async def scenario():
+        server = MazeServer(workers=1, inline_max_cells=100)
+        try:
+            await request(server, op='generate', name='big', width=30, height=30, seed=1)
+            solve = dict(op='solve', name='big', start=[0, 0], end=[29, 29])
+            assert (await request(server, **solve))['ok']
+            pool = server.pool
+            for process in list(pool._processes.values()):
+                os.kill(process.pid, signal.SIGKILL)
+            deadline = time.monotonic() + 10
+            while not pool._broken and time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+            assert (await request(server, **solve))['ok']
+            assert server.pool is not pool
+        finally:
+            server.close()
+    asyncio.run(scenario())
+
+def test_load_reads_files_off_the_event_loop(tmp_path, monkeypatch):
+    import threading
+    from maze import Maze
+
+    path = str(tmp_path / 'saved.maze')
+    Maze.generate(20, 10, seed=3).save(path)
+    loop_thread = threading.get_ident()
+    load = Maze.load
+    threads = []
+
+    def spy(*args, **kwargs):
+        threads.append(threading.get_ident())
+        return load(*args, **kwargs)
+    monkeypatch.setattr(Maze, 'load', staticmethod(spy))
+
+    async def scenario():
+        server = MazeServer(workers=1)
+        try:
+            response = await request(server, op='load', name='saved', path=path)
+            assert response['ok'] and response['width'] == 20
+            missing = await request(server, op='load', name='x', path=path + '.missing')
+            assert not missing['ok']
+            assert not (await request(server, op='load', name='x', path=[1]))['ok']
+        finally:
+            server.close()
+    asyncio.run(scenario())
+    assert threads and loop_thread not in threads
+
+def test_malformed_requests_get_clear_errors():
+    async def scenario():
+        server = MazeServer(workers=1)
+        try:
+            assert (await request(server, op='generate', name='m', width=8, height=6,
+                                  seed=1))['ok']
+            cases = [
+                (dict(op='generate', name='g', width='ten', height=5), 'width must be an integer'),
+                (dict(op='generate', name='g', width=5.5, height=5), 'width must be an integer'),
+                (dict(op='generate', name='g', width=0, height=5), 'positive'),
+                (dict(op='generate', name='g', width=5, height=5, seed=[1]), 'seed'),
+                (dict(op='generate', name='g', width=5, height=5, generator='x'), 'unknown generator'),
+                (dict(op='generate', name=['g'], width=5, height=5), 'name must be a string'),
+                (dict(op='generate', width=5, height=5), "missing field 'name'"),
+                (dict(op='solve', name='m', start='12', end=[1, 1]), 'start must be [x, y]'),
+                (dict(op='solve', name='m', start=[1, 2, 3], end=[1, 1]), 'start must be [x, y]'),
+                (dict(op='solve', name='m', start=[0, 0], end=[1.5, 1]), 'end must be [x, y]'),
+                (dict(op='solve', name='m', start=[0, 0], end=[8, 0]), 'outside'),
+                (dict(op='solve', name='m', start=[0, 0], end=[1, 1], algorithm='x'), 'unknown algorithm'),
+                (dict(op='solve', name='nope', start=[0, 0], end=[1, 1]), 'unknown maze'),
+                (dict(op='teleport'), 'unknown op'),
+            ]
+            for fields, message in cases:
+                response = await request(server, id=7, **fields)
+                assert response['ok'] is False and response['id'] == 7
+                assert message in response['error'], (fields, response)
+                assert 'ValueError' not in response['error']
+
+            assert 'invalid JSON' in (await server.handle_line(b'{nope'))['error']
+            assert 'JSON objects' in (await server.handle_line(b'[1]'))['error']
+            stats = await request(server, op='stats')
+            assert stats['operations']['solve']['errors'] == 6
+            assert stats['operations']['invalid']['count'] == 3
+        finally:
+            server.close()
+    asyncio.run(scenario())
+
+def test_in_flight_requests_are_capped_per_connection(tmp_path):
+    from server import MazeClient
+
+    async def scenario():
+        server = MazeServer(workers=1, max_in_flight=3)
+        handle_line = server.handle_line
+        running = [0, 0]
+
+        async def slow_handle_line(line):
+            running[0] += 1
+            running[1] = max(running)
+            try:
+                await asyncio.sleep(0.01)
+                return await handle_line(line)
+            finally:
+                running[0] -= 1
+        server.handle_line = slow_handle_line
+
+        socket_path = str(tmp_path / 'server.sock')
+        listener = await server.start(unix_path=socket_path)
+        try:
+            client = await MazeClient.connect(unix_path=socket_path)
+            responses = await asyncio.gather(*(client.request('ping') for _ in range(30)))
+            await client.close()
+        finally:
+            listener.close()
+            await listener.wait_closed()
+            server.close()
+        assert all(r['ok'] for r in responses)
+        assert running[1] == 3
+    asyncio.run(scenario())
+
+def test_protocol_round_trip(tmp_path):
+    from server import MazeClient, percentiles
+    from maze import Maze
+    from helpers import bfs_distances
+
+    async def scenario():
+        server = MazeServer(workers=2, inline_max_cells=400)
+        socket_path = str(tmp_path / 'server.sock')
+        listener = await server.start(unix_path=socket_path)
+        maze_path = str(tmp_path / 'small.maze')
+        Maze.generate(6, 6, seed=3).save(maze_path)
+        try:
+            client = await MazeClient.connect(unix_path=socket_path)
+            assert (await client.request('ping'))['ok']
+            small = await client.request('load', name='small', path=maze_path)
+            assert small['shared_name'] is None and small['seed'] == 3
+            big = await client.request('generate', name='big', width=30, height=30, seed=4)
+            assert big['shared_name'] is not None
+
+            # Served inline and in the pool, both shortest paths.
+            for name, size, seed in (('small', 6, 3), ('big', 30, 4)):
+                maze = Maze.generate(size, size, seed=seed)
+                expected = bfs_distances(maze.to_graph(), (0, 0))[(size - 1, size - 1)]
+                response = await client.request('solve', name=name, start=[0, 0],
+                                                end=[size - 1, size - 1], algorithm='dijkstra')
+                assert response['ok'], response
+                assert response['path_length'] == expected + 1
+                assert response['path'][0] == [0, 0]
+                assert response['visited'] >= response['path_length']
+
+            copy = await client.request('attach', name='copy', shared_name=big['shared_name'])
+            assert copy['fingerprint'] == big['fingerprint']
+            listed = await client.request('list')
+            assert [m['name'] for m in listed['mazes']] == ['small', 'big', 'copy']
+            assert (await client.request('drop', name='copy'))['ok']
+
+            stats = await client.request('stats')
+            assert stats['mazes'] == 2 and stats['workers'] == 2
+            assert stats['operations']['solve']['count'] == 2
+            assert stats['operations']['solve']['p50_ms'] is not None
+            await client.close()
+        finally:
+            listener.close()
+            await listener.wait_closed()
+            server.close()
+    asyncio.run(scenario())
+
+    assert percentiles([]) == {'p50_ms': None, 'p90_ms': None, 'p99_ms': None}
+    assert percentiles([i / 1000 for i in range(1, 101)]) == {
+        'p50_ms': 50.0, 'p90_ms': 90.0, 'p99_ms': 99.0}
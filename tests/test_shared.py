@@ -0,0 +1,114 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from maze import Maze
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def shm_exists(name):
+    return os.path.exists('/dev/shm/' + name.lstrip('/'))
+
+def test_attach_sees_the_same_walls_without_copying():
+    maze = Maze.generate(30, 20, seed=5)
+    maze.randomize_costs()
+    owner = Maze(30, 20, bytearray(maze.grid), maze.seed, bytearray(maze.costs))
+    name = owner.share()
+    try:
+        assert owner.share() == name and owner.shared_name == name
+        reader = Maze.attach(name)
+        assert (reader.width, reader.height, reader.seed) == (30, 20, 5)
+        assert bytes(reader.grid) == bytes(maze.grid)
+        assert bytes(reader.costs) == bytes(maze.costs)
+        # Edits show up in every view.
+        owner.close_wall((0, 0), (1, 0))
+        assert reader.has_wall((0, 0), (1, 0))
+        owner.open_wall((0, 0), (1, 0))
+        assert not reader.has_wall((0, 0), (1, 0))
+        reader.close()
+        # Closing a reader leaves the block to the others.
+        assert Maze.attach(name).fingerprint() == owner.fingerprint()
+    finally:
+        owner.close()
+    assert not shm_exists(name)
+    with pytest.raises(FileNotFoundError):
+        Maze.attach(name)
+
+def test_attached_process_exit_does_not_unlink_the_block():
+    owner = Maze.generate(10, 10, seed=1)
+    name = owner.share()
+    try:
+        code = ('import sys; sys.path.insert(0, {!r}); from maze import Maze; '
+                'maze = Maze.attach({!r}); print(maze.fingerprint())').format(ROOT, name)
+        output = subprocess.run([sys.executable, '-c', code], check=True,
+                                capture_output=True, text=True)
+        assert output.stdout.strip() == owner.fingerprint()
+        assert 'leaked' not in output.stderr
+        assert shm_exists(name)
+        Maze.attach(name).close()
+    finally:
+        owner.close()
+
+def test_shared_maze_pickles_by_name():
+    import pickle
+
+    owner = Maze.generate(200, 200, seed=2)
+    name = owner.share()
+    try:
+        data = pickle.dumps(owner)
+        assert len(data) < 1000
+        copy = pickle.loads(data)
+        assert copy.shared_name == name and copy.fingerprint() == owner.fingerprint()
+        copy.close()
+        assert shm_exists(name)
+    finally:
+        owner.close()
+
+def test_truncated_block_is_rejected():
+    from multiprocessing import shared_memory
+
+    block = shared_memory.SharedMemory(create=True, size=8)
+    try:
+        with pytest.raises(ValueError):
+            Maze.attach(block.name)
+    finally:
+        block.close()
+        block.unlink()
+
+def test_attach_leaves_the_resource_tracker_alone(monkeypatch):
+    from multiprocessing import resource_tracker
+
+    owner = Maze.generate(10, 10, seed=1)
+    name = owner.share()
+    calls = []
+    monkeypatch.setattr(resource_tracker, 'register', lambda *args: calls.append(args))
+    monkeypatch.setattr(resource_tracker, 'unregister', lambda *args: calls.append(args))
+    try:
+        Maze.attach(name).close()
+    finally:
+        monkeypatch.undo()
+        owner.close()
+    assert calls == []
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_attaching_in_the_owner_process_tree_leaves_no_tracker_errors(workers):
+    # The owner's process and its pool workers share one resource tracker,
+    # which complains on stderr if a reader unregistered the owner's block.
+    code = """
+import sys
+sys.path.insert(0, {!r})
+from maze import Maze
+from batch import solve_many
+maze = Maze.generate(40, 40, seed=3)
+owner = Maze(40, 40, bytearray(maze.grid))
+Maze.attach(owner.share()).close()
+owner.close()
+results = list(solve_many(maze, [((0, 0), (39, 39))] * 4, 'astar', workers={}))
+assert len(results) == 4
+print('ok')
+""".format(ROOT, workers)
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+    assert output.returncode == 0 and output.stdout.strip() == 'ok', output.stderr
+    assert 'Traceback' not in output.stderr and 'leaked' not in output.stderr
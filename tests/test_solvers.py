@@ -0,0 +1,144 @@
+"""
+The one equivalence test shared by every solver: on seeded random mazes,
+each must return a valid path that is as short as the reference search's,
+or as cheap with terrain costs. Per-solver edge cases stay in each
+solver's own test file.
+"""
+import random
+
+import pytest
+
+from dijkstra import (dijkstra, dijkstra_animated, dijkstra_csr, dijkstra_instrumented,
+                      dijkstra_weighted, dial_dijkstra)
+from astar import (astar, astar_animated, astar_csr, astar_instrumented, astar_weighted,
+                   dial_astar)
+from bidirectional import bidirectional_bfs, bidirectional_astar
+from contraction import CorridorGraph
+from tree_index import TreeIndex
+from incremental import LPAStar
+from multi import multi_dijkstra, multi_astar
+from cache import SolverCache
+from batch import solve_many, SOLVERS as BATCH_SOLVERS, WEIGHTED_SOLVERS
+from generators import GENERATORS
+from cli import random_pairs
+from helpers import looped_maze, weighted_distances, path_cost, assert_valid_path
+
+def on_graph(solver):
+    """
+    Adapts a `(graph, start, end)` solver to take the maze.
+    """
+    def solve(maze, start, end):
+        path, _ = solver(maze.to_graph(), start, end)
+        return path
+    return solve
+
+def on_weighted_graph(solver):
+    """
+    Adapts a `(graph, start, end)` solver of weighted graphs to take the maze.
+    """
+    def solve(maze, start, end):
+        path, _ = solver(maze.to_weighted_graph(), start, end)
+        return path
+    return solve
+
+def animated(solver):
+    """
+    Adapts an animated solver: the path is the last thing it yields.
+    """
+    return lambda maze, start, end: list(solver(maze.to_graph(), start, end))[-1]
+
+def on_csr(solver):
+    """
+    Adapts a CSR solver, taking `(offsets, targets, width, start, end)` with
+    integer nodes, to take the maze and cells.
+    """
+    def solve(maze, start, end):
+        offsets, targets = maze.to_csr()
+        width = maze.width
+        path, _ = solver(offsets, targets, width,
+                         start[0] + start[1] * width, end[0] + end[1] * width)
+        return [(node % width, node // width) for node in path]
+    return solve
+
+def batched(algorithm, lazy_graph=False):
+    """
+    Adapts a solver name of the batch API, run in the current process.
+    """
+    def solve(maze, start, end):
+        (path, _), = solve_many(maze, [(start, end)], algorithm, workers=1,
+                                lazy_graph=lazy_graph)
+        return path
+    return solve
+
+def lpa_star(maze, start, end):
+    """
+    Solves once with a fresh `LPAStar`, then stops it following the maze.
+    """
+    planner = LPAStar(maze, start, end)
+    path, _ = planner.solve()
+    planner.close()
+    return path
+
+def single_pair(solver):
+    """
+    Adapts a multi-source, multi-target solver to one source and one target.
+    """
+    def solve(maze, start, end):
+        (result,), _ = solver(maze.to_graph(), [start], [end])
+        return result.path
+    return solve
+
+# Every solver as `solve(maze, start, end)`, returning the path.
+SOLVERS = {'dijkstra': on_graph(dijkstra),
+           'astar': on_graph(astar),
+           'dijkstra_animated': animated(dijkstra_animated),
+           'astar_animated': animated(astar_animated),
+           'dijkstra_csr': on_csr(lambda offsets, targets, width, start, end:
+                                  dijkstra_csr(offsets, targets, start, end)),
+           'astar_csr': on_csr(astar_csr),
+           'dijkstra_instrumented': on_graph(dijkstra_instrumented),
+           'astar_instrumented': on_graph(astar_instrumented),
+           'dijkstra_weighted': on_weighted_graph(dijkstra_weighted),
+           'astar_weighted': on_weighted_graph(astar_weighted),
+           'dial_dijkstra': on_weighted_graph(dial_dijkstra),
+           'dial_astar': on_weighted_graph(dial_astar),
+           'bidirectional_bfs': on_graph(bidirectional_bfs),
+           'bidirectional_astar': on_graph(bidirectional_astar),
+           'corridor_graph': lambda maze, start, end:
+               CorridorGraph(maze.to_graph()).solve(start, end)[0],
+           'lpa_star': lpa_star,
+           'multi_dijkstra': single_pair(multi_dijkstra),
+           'multi_astar': single_pair(multi_astar),
+           'tree_index': lambda maze, start, end: TreeIndex(maze.to_graph()).path(start, end)}
+
+# Shared by all tests, so equal mazes also exercise the cached answers.
+CACHE = SolverCache()
+SOLVERS['solver_cache'] = lambda maze, start, end: CACHE.solve(maze, start, end, 'astar')[0]
+
+# Solvers that read terrain costs, tested on mazes that have them.
+WEIGHTED = {'dijkstra_weighted', 'astar_weighted', 'dial_dijkstra', 'dial_astar'}
+
+for algorithm in BATCH_SOLVERS:
+    SOLVERS['solve_many_' + algorithm] = batched(algorithm)
+    # Same search over a `Maze.graph_view`.
+    SOLVERS['solve_many_lazy_' + algorithm] = batched(algorithm, lazy_graph=True)
+    if algorithm in WEIGHTED_SOLVERS:
+        WEIGHTED.update(['solve_many_' + algorithm, 'solve_many_lazy_' + algorithm])
+
+# Solvers that only work on perfect mazes, tested without loops.
+PERFECT_ONLY = {'tree_index'}
+
+@pytest.mark.parametrize('seed', range(12))
+@pytest.mark.parametrize('name', sorted(SOLVERS))
+def test_paths_are_shortest(name, seed):
+    rng = random.Random(seed)
+    width, height = rng.randint(1, 14), rng.randint(1, 14)
+    algorithm = rng.choice(sorted(GENERATORS))
+    loops = 0 if name in PERFECT_ONLY else rng.choice([0, 0.1, 0.3])
+    maze = looped_maze(width, height, seed, loops=loops, algorithm=algorithm,
+                       costs=name in WEIGHTED)
+    graph = maze.to_graph()
+    for start, end in random_pairs(rng, width, height, 8):
+        path = SOLVERS[name](maze, start, end)
+        assert_valid_path(graph, path, start, end)
+        assert path_cost(maze, path) == weighted_distances(maze, start)[end]
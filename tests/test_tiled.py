@@ -0,0 +1,25 @@
+import pytest
+
+from generators import generate_tiled
+from helpers import assert_perfect_maze
+
+@pytest.mark.parametrize('algorithm', ['backtracker', 'kruskal', 'wilson'])
+@pytest.mark.parametrize('width, height, tile_size', [
+    (1, 1, 4), (10, 1, 3), (1, 10, 3), (20, 13, 4), (20, 13, 1), (9, 9, 9), (9, 9, 64)])
+def test_tiles_join_into_a_perfect_maze(algorithm, width, height, tile_size):
+    maze = generate_tiled(width, height, algorithm, seed=3, workers=1, tile_size=tile_size)
+    assert (maze.width, maze.height, maze.seed) == (width, height, 3)
+    assert_perfect_maze(maze)
+
+def test_workers_do_not_change_the_maze():
+    serial = generate_tiled(40, 30, 'kruskal', seed=5, workers=1, tile_size=8)
+    pooled = generate_tiled(40, 30, 'kruskal', seed=5, workers=2, tile_size=8)
+    assert pooled.grid == serial.grid
+    assert_perfect_maze(pooled)
+    assert generate_tiled(40, 30, 'kruskal', seed=6, workers=1, tile_size=8).grid != serial.grid
+
+def test_bad_arguments():
+    with pytest.raises(ValueError):
+        generate_tiled(10, 10, tile_size=0)
+    with pytest.raises(ValueError):
+        generate_tiled(10, 10, 'prim')
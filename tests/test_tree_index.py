@@ -0,0 +1,37 @@
+import pytest
+
+from maze import Maze
+from tree_index import TreeIndex
+from helpers import looped_maze
+
+def test_lca_on_a_small_tree():
+    #   a - b - c
+    #       |
+    #       d - e
+    graph = {'a': ['b'], 'b': ['a', 'c', 'd'], 'c': ['b'], 'd': ['b', 'e'], 'e': ['d']}
+    index = TreeIndex(graph, 'a')
+    assert index.lca('c', 'e') == 'b'
+    assert index.lca('e', 'd') == 'd'
+    assert index.path('c', 'e') == ['c', 'b', 'd', 'e']
+    assert index.distance('a', 'a') == 0
+
+def test_single_row_rooted_in_the_middle():
+    index = TreeIndex(Maze.generate(7, 1, seed=3).to_graph(), (3, 0))
+    assert index.lca((0, 0), (6, 0)) == (3, 0)
+    assert index.lca((0, 0), (2, 0)) == (2, 0)
+    assert index.distance((6, 0), (0, 0)) == 6
+    assert index.path((1, 0), (5, 0)) == [(x, 0) for x in range(1, 6)]
+
+def test_single_cell():
+    index = TreeIndex(Maze(1, 1).to_graph())
+    assert index.path((0, 0), (0, 0)) == [(0, 0)]
+    assert index.distance((0, 0), (0, 0)) == 0
+    assert index.lca((0, 0), (0, 0)) == (0, 0)
+
+def test_graphs_that_are_not_trees_are_rejected():
+    with pytest.raises(ValueError):
+        TreeIndex(looped_maze(6, 6, seed=1, loops=0.3).to_graph())
+    # Right edge count, but one cycle and one cut-off node.
+    graph = {0: [1, 2], 1: [0, 2], 2: [0, 1], 3: []}
+    with pytest.raises(ValueError):
+        TreeIndex(graph, 0)
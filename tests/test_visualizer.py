@@ -0,0 +1,155 @@
+import os
+
+import pytest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+pygame = pytest.importorskip('pygame')
+
+import visualizer
+from visualizer import MazeVisualizer
+from dijkstra import dijkstra_instrumented
+from astar import astar_instrumented
+
+@pytest.fixture
+def app():
+    app = MazeVisualizer(15, 15)
+    yield app
+    app._stop_editing()
+
+def finish_animation(app):
+    for _ in range(100000):
+        if app.state == 'SEARCHING':
+            app._step_search()
+        elif app.state == 'DRAWING_PATH':
+            app._step_path()
+        else:
+            return
+
+def set_endpoints(app, start, end):
+    app._set_endpoint(1, start)
+    app._set_endpoint(3, end)
+    app.state = 'READY_TO_RUN'
+
+def test_stats_belong_to_the_solver_that_ran(app):
+    set_endpoints(app, (0, 0), (14, 14))
+    app.algorithm = 'Dijkstra'
+    app._start_search()
+    # T pressed while the search is animated.
+    app.algorithm = 'Bidirectional BFS'
+    finish_animation(app)
+    assert app.state == 'FINISHED'
+    expected = dijkstra_instrumented(app.maze.to_graph(), (0, 0), (14, 14))
+    assert app.solve_result.heap_pushes == expected.heap_pushes
+    assert app.path_stats['length'] == len(expected.path)
+
+    app.state = 'READY_TO_RUN'
+    app.algorithm = 'Bidirectional A*'
+    app._start_search()
+    app.algorithm = 'A*'
+    finish_animation(app)
+    # Bidirectional solvers are not instrumented.
+    assert app.solve_result is None
+
+def test_stats_come_from_the_animated_search(app, monkeypatch):
+    expected = astar_instrumented(app.maze.to_graph(), (0, 0), (14, 14))
+
+    def search_again(*args, **kwargs):
+        raise AssertionError('the search ran twice')
+    monkeypatch.setattr('astar.astar_instrumented', search_again)
+    monkeypatch.setattr('dijkstra.dijkstra_instrumented', search_again)
+
+    set_endpoints(app, (0, 0), (14, 14))
+    app.algorithm = 'A*'
+    app._start_search()
+    finish_animation(app)
+    assert app.state == 'FINISHED'
+    assert app.solve_result.path == expected.path
+    assert app.solve_result.heap_pushes == expected.heap_pushes
+    assert app.solve_result.stale_pops == expected.stale_pops
+    assert app.solve_result.peak_frontier == expected.peak_frontier
+    assert app.solve_result.timings['search'] >= 0
+
+def test_heatmap_off_in_edit_mode_keeps_the_replanned_path(app):
+    set_endpoints(app, (0, 0), (14, 14))
+    app._start_editing()
+    path = list(app.final_path)
+    app._toggle_heatmap()
+    assert app.show_heatmap
+    app._toggle_heatmap()
+    assert not app.show_heatmap
+    assert app.replanner is not None
+    assert app.state == 'FINISHED'
+    assert app.final_path == path
+
+def test_heatmap_off_outside_edit_mode_is_ready_to_run(app):
+    set_endpoints(app, (0, 0), (14, 14))
+    app._toggle_heatmap()
+    assert app.state == 'FINISHED'
+    app._toggle_heatmap()
+    assert app.state == 'READY_TO_RUN'
+    assert app.final_path == []
+
+def test_info_panel_fits_a_short_window():
+    app = MazeVisualizer(40, 4)
+    assert app.height < 100
+    set_endpoints(app, (0, 0), (39, 3))
+    app.algorithm = 'Dijkstra'
+    app._start_search()
+    finish_animation(app)
+    assert app.solve_result is not None
+    assert app._draw_info_panel() <= app.screen_height
+
+def test_maze_layer_is_rendered_once_per_maze(app):
+    layer = app.maze_layer
+    set_endpoints(app, (0, 0), (14, 14))
+    app._start_search()
+    finish_animation(app)
+    assert app.maze_layer is layer
+    # A wall edge drawn on the cached layer shows through on screen.
+    app._draw_all()
+    assert app.screen.get_at((1, 0))[:3] == visualizer.WALL_COLOR
+    app._reset_visualization()
+    assert app.maze_layer is not layer
+
+def test_only_changed_cells_are_pushed(app, monkeypatch):
+    updates = []
+    monkeypatch.setattr(pygame.display, 'update', lambda rects: updates.append(list(rects)))
+    app._update_display()
+    assert updates == []
+
+    app.highlight_cell((3, 4), visualizer.VISITED_COLOR)
+    rect = app._cell_rect((3, 4))
+    assert app.screen.get_at(rect.center)[:3] == visualizer.VISITED_COLOR
+    app._update_display()
+    assert updates == [[rect]]
+    assert app.dirty_rects == []
+
+    # Clearing puts back the maze layer underneath.
+    app.clear_cell((3, 4))
+    assert app.screen.get_at(rect.center) == app.maze_layer.get_at(rect.center)
+    assert app.dirty_rects == [rect]
+
+@pytest.mark.parametrize('algorithm', list(visualizer.ANIMATED_SOLVERS))
+def test_search_advances_within_its_time_budget(app, monkeypatch, algorithm):
+    # With no budget each frame visits a single node.
+    monkeypatch.setattr(visualizer, 'SEARCH_BUDGET_MS', 0)
+    set_endpoints(app, (0, 0), (14, 14))
+    app.algorithm = algorithm
+    app._start_search()
+    frames = 0
+    while app.state == 'SEARCHING':
+        before = len(app.visited_nodes)
+        app._step_search()
+        frames += 1
+        assert len(app.visited_nodes) <= before + 1
+    assert frames > 1
+    assert app.state == 'DRAWING_PATH'
+
+    frames = 0
+    while app.state == 'DRAWING_PATH':
+        app._step_path()
+        frames += 1
+    assert frames <= visualizer.PATH_ANIMATION_SECONDS * visualizer.MAX_FPS + 1
+    expected = dijkstra_instrumented(app.maze.to_graph(), (0, 0), (14, 14)).path
+    assert len(app.final_path) == len(expected)
+    assert app.final_path[0] == (0, 0) and app.final_path[-1] == (14, 14)
@@ -0,0 +1,73 @@
+import pytest
+
+import mazefile
+from maze import Maze, MAX_COST
+from dijkstra import dijkstra_weighted, dial_dijkstra
+from astar import astar_weighted, dial_astar
+from helpers import looped_maze, weighted_distances, path_cost
+
+WEIGHTED = [dijkstra_weighted, dial_dijkstra, astar_weighted, dial_astar]
+
+@pytest.mark.parametrize('solver', WEIGHTED)
+def test_cheaper_detour_beats_the_short_way(solver):
+    # A ring of four cells, one of them expensive to enter.
+    maze = Maze(2, 2, costs=bytearray([1, 9, 1, 1]))
+    for a, b in [((0, 0), (1, 0)), ((1, 0), (1, 1)), ((1, 1), (0, 1)), ((0, 1), (0, 0))]:
+        maze.open_wall(a, b)
+    graph = maze.to_weighted_graph()
+    assert solver(graph, (0, 0), (1, 1))[0] == [(0, 0), (0, 1), (1, 1)]
+    assert solver(graph, (1, 1), (0, 0))[0] == [(1, 1), (0, 1), (0, 0)]
+
+@pytest.mark.parametrize('solver', WEIGHTED)
+def test_single_row_edge_cases(solver):
+    maze = Maze.generate(5, 1, seed=1)
+    maze.set_costs(bytearray([MAX_COST, 1, MAX_COST, 1, MAX_COST]))
+    graph = maze.to_weighted_graph()
+    path, _ = solver(graph, (4, 0), (0, 0))
+    assert path == [(4, 0), (3, 0), (2, 0), (1, 0), (0, 0)]
+    assert path_cost(maze, path) == 2 * MAX_COST + 2
+    assert solver(graph, (2, 0), (2, 0))[0] == [(2, 0)]
+    graph[(2, 0)] = []
+    assert solver(graph, (2, 0), (0, 0))[0] == []
+
+def test_costs_out_of_range_are_rejected():
+    for bad in (0, MAX_COST + 1, 40):
+        costs = bytearray([1]) * 9
+        costs[4] = bad
+        with pytest.raises(ValueError):
+            Maze(3, 3, costs=costs)
+        with pytest.raises(ValueError):
+            Maze(3, 3).set_costs(costs)
+    with pytest.raises(ValueError):
+        Maze(3, 3, costs=bytearray([1]) * 8)
+
+@pytest.mark.parametrize('use_mmap', [False, True])
+def test_files_with_costs_out_of_range_are_rejected(tmp_path, use_mmap):
+    path = str(tmp_path / 'bad.maze')
+    maze = Maze.generate(4, 4, seed=1)
+    costs = bytearray([3]) * 16
+    costs[7] = 20
+    mazefile.write_grid(path, 4, 4, maze.grid, costs=costs)
+    with pytest.raises(ValueError):
+        Maze.load(path, mmap=use_mmap)
+
+def test_dial_solvers_refuse_costs_outside_the_ring():
+    graph = {(0, 0): [((1, 0), 20)], (1, 0): [((0, 0), 20)]}
+    with pytest.raises(ValueError):
+        dial_dijkstra(graph, (0, 0), (1, 0))
+    with pytest.raises(ValueError):
+        dial_astar(graph, (0, 0), (1, 0))
+
+def test_unweighted_solvers_are_refused_on_costed_mazes():
+    from batch import build_graph, solve_many
+    from cache import SolverCache
+
+    maze = looped_maze(5, 5, 0, costs=True)
+    with pytest.raises(ValueError):
+        build_graph(maze, 'astar')
+    with pytest.raises(ValueError):
+        list(solve_many(maze, [((0, 0), (4, 4))], 'dijkstra', workers=1))
+    with pytest.raises(ValueError):
+        SolverCache().solve(maze, (0, 0), (4, 4), 'astar')
+    path, _ = SolverCache().solve(maze, (0, 0), (4, 4), 'dial_astar')
+    assert path_cost(maze, path) == weighted_distances(maze, (0, 0))[(4, 4)]
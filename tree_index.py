@@ -0,0 +1,122 @@
+from array import array
+from collections import deque
+
+class TreeIndex(object):
+    """
+    Precomputed index for answering path queries on a perfect maze, where the
+    graph is a spanning tree and every pair of cells has exactly one path.
+
+    Built once from `Maze.to_graph()`: the tree is rooted, each node gets its
+    depth and a binary lifting table of ancestors, so the lowest common
+    ancestor (LCA) of any two nodes is found in O(log n).
+    """
+
+    def __init__(self, graph, root=None):
+        """
+        Indexes the given adjacency list. Raises ValueError if the graph is
+        not a tree (it has cycles or is disconnected).
+        """
+        self.nodes = list(graph)
+        self.ids = {node: i for i, node in enumerate(self.nodes)}
+        if root is None:
+            root = self.nodes[0]
+        self.root = root
+
+        n_nodes = len(self.nodes)
+        n_edges = sum(len(neighbors) for neighbors in graph.values()) // 2
+        if n_edges != n_nodes - 1:
+            raise ValueError('graph is not a tree: {} nodes, {} edges'.format(
+                n_nodes, n_edges))
+
+        root_id = self.ids[root]
+        parent = array('i', [-1]) * n_nodes
+        depth = array('i', [-1]) * n_nodes
+        parent[root_id] = root_id
+        depth[root_id] = 0
+
+        # Breadth-first walk to root the tree.
+        queue = deque([root])
+        n_reached = 1
+        while queue:
+            node = queue.popleft()
+            node_id = self.ids[node]
+            for neighbor in graph[node]:
+                neighbor_id = self.ids[neighbor]
+                if depth[neighbor_id] == -1:
+                    depth[neighbor_id] = depth[node_id] + 1
+                    parent[neighbor_id] = node_id
+                    queue.append(neighbor)
+                    n_reached += 1
+
+        if n_reached != n_nodes:
+            raise ValueError('graph is not a tree: only {} of {} nodes are '
+                             'reachable from the root'.format(n_reached, n_nodes))
+
+        self.depth = depth
+
+        # up[k][v] is the 2**k-th ancestor of v (the root is its own parent).
+        self.up = [parent]
+        for _ in range(max(1, (max(depth) or 1).bit_length()) - 1):
+            previous = self.up[-1]
+            self.up.append(array('i', [previous[p] for p in previous]))
+
+    def _lca(self, a, b):
+        """
+        Returns the id of the lowest common ancestor of node ids `a` and `b`.
+        """
+        depth, up = self.depth, self.up
+        if depth[a] < depth[b]:
+            a, b = b, a
+
+        # Lift `a` to the depth of `b`.
+        difference = depth[a] - depth[b]
+        k = 0
+        while difference:
+            if difference & 1:
+                a = up[k][a]
+            difference >>= 1
+            k += 1
+
+        if a == b:
+            return a
+
+        for level in reversed(up):
+            if level[a] != level[b]:
+                a = level[a]
+                b = level[b]
+        return up[0][a]
+
+    def lca(self, a, b):
+        """
+        Returns the lowest common ancestor of the two given nodes.
+        """
+        return self.nodes[self._lca(self.ids[a], self.ids[b])]
+
+    def distance(self, start, end):
+        """
+        Returns the number of steps between the two given nodes, in O(log n).
+        """
+        a, b = self.ids[start], self.ids[end]
+        depth = self.depth
+        return depth[a] + depth[b] - 2 * depth[self._lca(a, b)]
+
+    def path(self, start, end):
+        """
+        Returns the path from `start` to `end`, inclusive, in time
+        proportional to its length.
+        """
+        a, b = self.ids[start], self.ids[end]
+        ancestor = self._lca(a, b)
+        parent = self.up[0]
+
+        head = []
+        while a != ancestor:
+            head.append(a)
+            a = parent[a]
+        tail = []
+        while b != ancestor:
+            tail.append(b)
+            b = parent[b]
+
+        nodes = self.nodes
+        return [nodes[i] for i in head] + [nodes[ancestor]] + [nodes[i] for i in reversed(tail)]
@@ -1,7 +1,15 @@
+import math
+import time
+
 import pygame
-from maze import Maze
-from dijkstra import dijkstra
-from astar import astar
+from maze import Maze, N_BIT, S_BIT, W_BIT, E_BIT
+from cache import SolverCache
+from dijkstra import dijkstra_animated
+from astar import astar_animated
+from bidirectional import bidirectional_bfs_animated, bidirectional_astar_animated
+from incremental import LPAStar
+from distance_field import distance_field
+from instrument import SolveResult
 
 # --- UI Configuration ---
 # Colors
@@ -15,207 +23,549 @@ SOLUTION_PATH_COLOR = (255, 235, 59) # Yellow
 TEXT_COLOR = (236, 239, 244)
 INFO_PANEL_COLOR = (44, 52, 68)
 WATERMARK_COLOR = (255, 255, 255, 20) # White with low alpha
+# Heatmap of distances from the start, from nearest to farthest.
+HEATMAP_NEAR_COLOR = (38, 166, 154) # Teal
+HEATMAP_FAR_COLOR = (171, 71, 188)  # Purple
 
 # Dimensions
 INFO_PANEL_WIDTH = 250
 MIN_MAZE_SIZE = 600
+# Info panel layout: outer margin, space after a title or between sections,
+# and extra space between body lines.
+PANEL_MARGIN = 20
+SECTION_SPACING = 16
+LINE_SPACING = 6
+# Most stats lines the panel shows, for an instrumented solver.
+MAX_STATS_LINES = 6
+
+# Key bindings listed in the info panel.
+CONTROLS = ["L-Click: Set Start",
+            "R-Click: Set End",
+            "Space: Run Algorithm",
+            "T: Toggle Algorithm",
+            "E: Edit Walls",
+            "H: Distance Heatmap",
+            "R: Reset Maze"]
+
+# Upper bound on redraws per second. When nothing is animating the loop
+# sleeps until the next event instead.
+MAX_FPS = 60
+
+# Milliseconds of search work done per frame while a search is animated, so
+# input stays responsive however large the maze is.
+SEARCH_BUDGET_MS = 4
+# Seconds the solution path takes to draw, whatever its length.
+PATH_ANIMATION_SECONDS = 1.5
+
+# Step-by-step solvers by display name. They yield each visited node and
+# finally the path (a list, empty if there is none). T cycles through them in
+# this order.
+ANIMATED_SOLVERS = {'Dijkstra': dijkstra_animated,
+                    'A*': astar_animated,
+                    'Bidirectional BFS': bidirectional_bfs_animated,
+                    'Bidirectional A*': bidirectional_astar_animated}
 
-# Fonts
-pygame.font.init()
-try:
-    TITLE_FONT = pygame.font.SysFont('Segoe UI', 32, bold=True)
-    BODY_FONT = pygame.font.SysFont('Segoe UI', 16)
-    WATERMARK_FONT = pygame.font.SysFont('Segoe UI', 80, bold=True)
-except:
-    TITLE_FONT = pygame.font.Font(None, 40)
-    BODY_FONT = pygame.font.Font(None, 24)
-    WATERMARK_FONT = pygame.font.Font(None, 100)
+# Animated solvers that also fill in a SolveResult with heap and frontier
+# counters for the stats panel, passed as their `result` argument. The others
+# only report path length and visited.
+COUNTED_SOLVERS = {'Dijkstra', 'A*'}
 
-# Cardinal directions
-N, S, W, E = ('n', 's', 'w', 'e')
+# Fonts, loaded by `_load_fonts` when the first visualizer is created so that
+# importing this module stays cheap.
+TITLE_FONT = None
+BODY_FONT = None
+WATERMARK_FONT = None
+
+def _load_fonts():
+    global TITLE_FONT, BODY_FONT, WATERMARK_FONT
+    if TITLE_FONT is not None:
+        return
+    pygame.font.init()
+    try:
+        TITLE_FONT = pygame.font.SysFont('Segoe UI', 32, bold=True)
+        BODY_FONT = pygame.font.SysFont('Segoe UI', 16)
+        WATERMARK_FONT = pygame.font.SysFont('Segoe UI', 80, bold=True)
+    except:
+        TITLE_FONT = pygame.font.Font(None, 40)
+        BODY_FONT = pygame.font.Font(None, 24)
+        WATERMARK_FONT = pygame.font.Font(None, 100)
 
 
 class MazeVisualizer:
     def __init__(self, maze_width=25, maze_height=25):
+        _load_fonts()
         self.maze = Maze(maze_width, maze_height)
         self.cell_size = MIN_MAZE_SIZE // max(maze_width, maze_height)
         self.width = self.maze.width * self.cell_size
         self.height = self.maze.height * self.cell_size
         
         self.screen_width = self.width + INFO_PANEL_WIDTH
-        self.screen_height = self.height
+        # Short mazes get a taller window so the info panel still fits.
+        self.screen_height = max(self.height, self._info_panel_height())
         
         self.screen = pygame.display.set_mode((self.screen_width, self.screen_height))
         pygame.display.set_caption("Pathfinding Visualizer | Navdeep")
 
         self.start_node = None
         self.end_node = None
-        self.state = 'IDLE' # IDLE, READY_TO_RUN, FINISHED
+        self.state = 'IDLE' # IDLE, READY_TO_RUN, SEARCHING, DRAWING_PATH, FINISHED
         self.algorithm = 'Dijkstra'
         self.path_stats = {}
         self.final_path = []
         self.visited_nodes = set()
+        self.solver_cache = SolverCache()
+        # Running search generator, the SolveResult it fills in if its solver
+        # counts its work, and the path being drawn once it is done.
+        self.search = None
+        self.search_result = None
+        self.found_path = []
+        self.path_step = 1
+        self.solve_result = None
+        # Incremental solver of the wall edit mode, None outside of it.
+        self.replanner = None
+        # Distance heatmap from the start: whether it is shown, and the last
+        # one built as (maze fingerprint, source, field, surface).
+        self.show_heatmap = False
+        self.heatmap = None
+
+        self.clock = pygame.time.Clock()
+        self.watermark = WATERMARK_FONT.render("Navdeep", True, WATERMARK_COLOR)
+        # Static walls and watermark, rendered once per maze.
+        self.maze_layer = None
+        # Screen areas changed since the display was last updated.
+        self.dirty_rects = []
 
         self._reset_visualization()
 
     def _reset_visualization(self):
+        self._stop_editing()
+        self.show_heatmap = False
+        self.heatmap = None
         self.start_node = None
         self.end_node = None
         self.state = 'IDLE'
         self.path_stats = {}
         self.final_path = []
         self.visited_nodes = set()
+        self.search = None
+        self.search_result = None
+        self.found_path = []
+        self.solve_result = None
         self.maze = Maze.generate(self.maze.width, self.maze.height)
+        self.maze_layer = self._render_maze_layer()
         self._draw_all()
 
     def _draw_all(self):
+        """
+        Redraws the whole window from the cached maze layer and flips it.
+        Only needed when most of the screen changes; smaller changes go
+        through `dirty_rects` and `_update_display`.
+        """
         self.screen.fill(BACKGROUND_COLOR)
-        self._draw_maze()
+        self.screen.blit(self._base_layer(), (0, 0))
+        self._draw_overlays()
         self._draw_info_panel()
         pygame.display.flip()
+        self.dirty_rects = []
 
-    def _draw_maze(self):
+    def _update_display(self):
+        """
+        Pushes only the changed screen areas to the display.
+        """
+        if self.dirty_rects:
+            pygame.display.update(self.dirty_rects)
+            self.dirty_rects = []
+
+    def _render_maze_layer(self, background=None):
+        """
+        Renders the background, watermark and every wall of the current maze
+        into a new surface. `background` is an optional surface drawn instead
+        of the plain floor color.
+        """
         maze_surface = pygame.Surface((self.width, self.height))
-        maze_surface.fill(PATH_COLOR)
+        if background is None:
+            maze_surface.fill(PATH_COLOR)
+        else:
+            maze_surface.blit(background, (0, 0))
         self._draw_background_watermark(maze_surface)
 
-        for cell in self.maze.cells:
-            x, y = cell.x * self.cell_size, cell.y * self.cell_size
-            walls = cell.walls
-            if N in walls: pygame.draw.line(maze_surface, WALL_COLOR, (x, y), (x + self.cell_size, y), 2)
-            if S in walls: pygame.draw.line(maze_surface, WALL_COLOR, (x, y + self.cell_size), (x + self.cell_size, y + self.cell_size), 2)
-            if W in walls: pygame.draw.line(maze_surface, WALL_COLOR, (x, y), (x, y + self.cell_size), 2)
-            if E in walls: pygame.draw.line(maze_surface, WALL_COLOR, (x + self.cell_size, y), (x + self.cell_size, y + self.cell_size), 2)
-        
-        self.screen.blit(maze_surface, (0, 0))
+        size = self.cell_size
+        for i, walls in enumerate(self.maze.grid):
+            x, y = (i % self.maze.width) * size, (i // self.maze.width) * size
+            if walls & N_BIT: pygame.draw.line(maze_surface, WALL_COLOR, (x, y), (x + size, y), 2)
+            if walls & S_BIT: pygame.draw.line(maze_surface, WALL_COLOR, (x, y + size), (x + size, y + size), 2)
+            if walls & W_BIT: pygame.draw.line(maze_surface, WALL_COLOR, (x, y), (x, y + size), 2)
+            if walls & E_BIT: pygame.draw.line(maze_surface, WALL_COLOR, (x + size, y), (x + size, y + size), 2)
+
+        return maze_surface
+
+    def _distance_field(self):
+        """
+        Returns the distance field from the start of the current maze,
+        together with its heatmap surface, both built once per maze content
+        and start.
+        """
+        key = (self.maze.fingerprint(), self.start_node)
+        if self.heatmap is None or self.heatmap[:2] != key:
+            field = distance_field(self.maze, self.start_node)
+            self.heatmap = key + (field, self._render_heatmap(field))
+        return self.heatmap[2]
+
+    def _render_heatmap(self, field):
+        """
+        Renders the maze layer over a heatmap of the field, one pixel per
+        cell scaled up to the maze area. Unreachable cells keep the floor
+        color.
+        """
+        palette = []
+        for i in range(256):
+            color = [near + (far - near) * i // 255
+                     for near, far in zip(HEATMAP_NEAR_COLOR, HEATMAP_FAR_COLOR)]
+            palette.append(bytes(color))
+        unreachable = bytes(PATH_COLOR)
+        scale = max(field.max_distance, 1)
+        pixels = b''.join(palette[distance * 255 // scale] if distance >= 0 else unreachable
+                          for distance in field.flat_distances)
+        cells = pygame.image.frombuffer(pixels, (self.maze.width, self.maze.height), 'RGB')
+        return self._render_maze_layer(pygame.transform.scale(cells, (self.width, self.height)))
+
+    def _base_layer(self):
+        """
+        Returns the surface the overlays are drawn on: the heatmap when it is
+        shown, the plain maze layer otherwise.
+        """
+        if self.show_heatmap and self.start_node:
+            self._distance_field()
+            return self.heatmap[3]
+        return self.maze_layer
+
+    def _show_field_path(self):
+        """
+        Shows the path from the start to the end straight from the distance
+        field, without searching.
+        """
+        field = self._distance_field()
+        path = field.path(self.end_node) if self.end_node else []
+        self.visited_nodes = set()
+        self.final_path = self.found_path = path
+        self.path_stats = {'length': len(path),
+                           'visited': sum(1 for distance in field.flat_distances if distance >= 0)}
+        self.solve_result = None
+        self.state = 'FINISHED' if self.end_node else 'IDLE'
+        self._draw_all()
+
+    def _toggle_heatmap(self):
+        self.show_heatmap = not self.show_heatmap
+        if self.show_heatmap:
+            self._show_field_path()
+        elif self.replanner is not None:
+            # Still in wall edit mode: back to the path LPA* keeps.
+            self._replan()
+        else:
+            self.visited_nodes = set()
+            self.final_path = []
+            self.state = 'READY_TO_RUN' if self.start_node and self.end_node else 'IDLE'
+            self._draw_all()
+
+    def _draw_overlays(self):
+        """
+        Draws visited cells, the solution path and the start and end cells
+        on top of the maze layer.
+        """
+        for node in self.visited_nodes:
+            if node != self.start_node and node != self.end_node:
+                self.highlight_cell(node, VISITED_COLOR)
+        for start_pos, end_pos in zip(self.final_path, self.final_path[1:]):
+            self.draw_path_segment(start_pos, end_pos)
+        self.highlight_cell(self.start_node, START_COLOR)
+        self.highlight_cell(self.end_node, END_COLOR)
+
+    def _refresh_info_panel(self):
+        self._draw_info_panel()
+        self.dirty_rects.append(pygame.Rect(self.width, 0, INFO_PANEL_WIDTH, self.screen_height))
+
+    @staticmethod
+    def _info_panel_height():
+        """
+        Returns the height the info panel needs with every line shown: the
+        controls, the algorithm and the longest stats.
+        """
+        title = TITLE_FONT.get_linesize() + SECTION_SPACING
+        body = BODY_FONT.get_linesize() + LINE_SPACING
+        lines = len(CONTROLS) + 1 + MAX_STATS_LINES
+        return 2 * PANEL_MARGIN + 2 * title + lines * body + SECTION_SPACING
+
+    def _draw_panel_line(self, font, text, y):
+        """
+        Draws one line of the info panel at height `y` and returns the
+        height of the next one.
+        """
+        self.screen.blit(font.render(text, True, TEXT_COLOR), (self.width + PANEL_MARGIN, y))
+        if font is TITLE_FONT:
+            return y + font.get_linesize() + SECTION_SPACING
+        return y + font.get_linesize() + LINE_SPACING
 
     def _draw_info_panel(self):
+        """
+        Draws the info panel top to bottom and returns the height below its
+        last line.
+        """
         panel_rect = pygame.Rect(self.width, 0, INFO_PANEL_WIDTH, self.screen_height)
         pygame.draw.rect(self.screen, INFO_PANEL_COLOR, panel_rect)
-        
-        title_text = TITLE_FONT.render("Controls", True, TEXT_COLOR)
-        self.screen.blit(title_text, (self.width + 20, 20))
 
-        instructions = [
-            "L-Click: Set Start",
-            "R-Click: Set End",
-            "Space: Run Algorithm",
-            "T: Toggle Algorithm",
-            "R: Reset Maze",
-        ]
-        for i, instruction in enumerate(instructions):
-            text_surface = BODY_FONT.render(instruction, True, TEXT_COLOR)
-            self.screen.blit(text_surface, (self.width + 20, 80 + i * 30))
+        y = self._draw_panel_line(TITLE_FONT, "Controls", PANEL_MARGIN)
+        for instruction in CONTROLS:
+            y = self._draw_panel_line(BODY_FONT, instruction, y)
 
-        algo_text = BODY_FONT.render(f"Algorithm: {self.algorithm}", True, TEXT_COLOR)
-        self.screen.blit(algo_text, (self.width + 20, 250))
+        algorithm = 'LPA* (click walls)' if self.replanner is not None else self.algorithm
+        y = self._draw_panel_line(BODY_FONT, f"Algorithm: {algorithm}", y + SECTION_SPACING)
 
         if self.state == 'FINISHED':
-            stats_title = TITLE_FONT.render("Stats", True, TEXT_COLOR)
-            self.screen.blit(stats_title, (self.width + 20, 320))
-            
+            y = self._draw_panel_line(TITLE_FONT, "Stats", y + SECTION_SPACING)
             stats = [
                 f"Path Length: {self.path_stats.get('length', 'N/A')}",
                 f"Nodes Visited: {self.path_stats.get('visited', 'N/A')}",
             ]
-            for i, stat in enumerate(stats):
-                text_surface = BODY_FONT.render(stat, True, TEXT_COLOR)
-                self.screen.blit(text_surface, (self.width + 20, 380 + i * 30))
+            if self.solve_result is not None:
+                stats += [
+                    f"Heap Pushes: {self.solve_result.heap_pushes}",
+                    f"Stale Pops: {self.solve_result.stale_pops}",
+                    f"Peak Frontier: {self.solve_result.peak_frontier}",
+                    f"Search Time: {self.solve_result.timings['search'] * 1000:.1f} ms",
+                ]
+            for stat in stats:
+                y = self._draw_panel_line(BODY_FONT, stat, y)
+        return y
 
     def _draw_background_watermark(self, surface):
-        watermark_text = WATERMARK_FONT.render("Navdeep", True, WATERMARK_COLOR)
-        text_rect = watermark_text.get_rect(center=(self.width // 2, self.height // 2))
-        surface.blit(watermark_text, text_rect)
+        text_rect = self.watermark.get_rect(center=(self.width // 2, self.height // 2))
+        surface.blit(self.watermark, text_rect)
+
+    def _cell_rect(self, node):
+        x, y = node
+        return pygame.Rect(x * self.cell_size + 2, y * self.cell_size + 2, self.cell_size - 3, self.cell_size - 3)
 
     def highlight_cell(self, node, color):
         if not node: return
-        x, y = node
-        rect = pygame.Rect(x * self.cell_size + 2, y * self.cell_size + 2, self.cell_size - 3, self.cell_size - 3)
+        rect = self._cell_rect(node)
         pygame.draw.rect(self.screen, color, rect)
+        self.dirty_rects.append(rect)
 
-    def draw_path(self, path):
-        if not path or len(path) < 2: return
-        # This animation draws the final path segment by segment
-        for i in range(len(path) - 1):
-            start_pos = path[i]
-            end_pos = path[i+1]
-            
-            start_center = (start_pos[0] * self.cell_size + self.cell_size // 2, start_pos[1] * self.cell_size + self.cell_size // 2)
-            end_center = (end_pos[0] * self.cell_size + self.cell_size // 2, end_pos[1] * self.cell_size + self.cell_size // 2)
-            
-            # Check for quit events to keep the window responsive
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    return
+    def clear_cell(self, node):
+        """
+        Restores a cell to its plain look from the maze layer.
+        """
+        if not node: return
+        rect = self._cell_rect(node)
+        self.screen.blit(self._base_layer(), rect, rect)
+        self.dirty_rects.append(rect)
+
+    def _set_endpoint(self, button, node):
+        """
+        Moves the start (left button) or end (right button) marker to `node`.
+        """
+        old_start, old_end = self.start_node, self.end_node
+        if button == 1: self.start_node = node
+        elif button == 3: self.end_node = node
+        else: return
+        for old_node in (old_start, old_end):
+            if old_node not in (self.start_node, self.end_node):
+                self.clear_cell(old_node)
+        self.highlight_cell(self.start_node, START_COLOR)
+        self.highlight_cell(self.end_node, END_COLOR)
+
+    def draw_path_segment(self, start_pos, end_pos):
+        start_center = (start_pos[0] * self.cell_size + self.cell_size // 2, start_pos[1] * self.cell_size + self.cell_size // 2)
+        end_center = (end_pos[0] * self.cell_size + self.cell_size // 2, end_pos[1] * self.cell_size + self.cell_size // 2)
+        self.dirty_rects.append(pygame.draw.line(self.screen, SOLUTION_PATH_COLOR, start_center, end_center, 4))
+
+    def _is_animating(self):
+        return self.state in ('SEARCHING', 'DRAWING_PATH')
+
+    def _start_search(self):
+        """
+        Starts the selected step-by-step solver. It is advanced a little
+        every frame by `_step_search`.
+        """
+        graph = self.solver_cache.graph(self.maze)
+        solver = ANIMATED_SOLVERS[self.algorithm]
+        if self.algorithm in COUNTED_SOLVERS:
+            self.search_result = SolveResult([], set())
+            self.search = solver(graph, self.start_node, self.end_node, self.search_result)
+        else:
+            self.search_result = None
+            self.search = solver(graph, self.start_node, self.end_node)
+        self.visited_nodes = set()
+        self.final_path = []
+        self.state = 'SEARCHING'
+
+    def _step_search(self):
+        """
+        Advances the search for at most SEARCH_BUDGET_MS, highlighting each
+        visited node.
+        """
+        deadline = time.perf_counter() + SEARCH_BUDGET_MS / 1000
+        for item in self.search:
+            if isinstance(item, list):
+                self._finish_search(item)
+                return
+            if item not in self.visited_nodes:
+                self.visited_nodes.add(item)
+                if item != self.start_node and item != self.end_node:
+                    self.highlight_cell(item, VISITED_COLOR)
+            if time.perf_counter() >= deadline:
+                return
+
+    def _finish_search(self, path):
+        self.search = None
+        # Counted by the search itself as it ran, so it belongs to that
+        # solver even if T was pressed meanwhile.
+        self.solve_result = self.search_result
+        self.search_result = None
+        self.found_path = path
+        self.path_stats = {
+            'length': len(path),
+            'visited': len(self.visited_nodes)
+        }
+        # Spread the path over a fixed time, whatever its length.
+        self.path_step = max(1, math.ceil(len(path) / (PATH_ANIMATION_SECONDS * MAX_FPS)))
+        self.state = 'DRAWING_PATH'
+
+    def _step_path(self):
+        """
+        Draws the next few segments of the solution path.
+        """
+        drawn = max(len(self.final_path), 1)
+        shown = min(drawn + self.path_step, len(self.found_path))
+        for i in range(drawn - 1, shown - 1):
+            self.draw_path_segment(self.found_path[i], self.found_path[i + 1])
+        self.final_path = self.found_path[:shown]
+        if shown >= len(self.found_path):
+            self.state = 'FINISHED'
+            self.highlight_cell(self.start_node, START_COLOR)
+            self.highlight_cell(self.end_node, END_COLOR)
+            self._refresh_info_panel()
+
+    def _start_editing(self):
+        """
+        Enters wall edit mode: the path between the current endpoints is
+        kept up to date by LPA* while walls are clicked.
+        """
+        self.replanner = LPAStar(self.maze, self.start_node, self.end_node)
+        self._replan()
+
+    def _stop_editing(self):
+        """
+        Leaves wall edit mode, keeping the edited maze, ready for a regular
+        search.
+        """
+        if self.replanner is None:
+            return
+        self.replanner.close()
+        self.replanner = None
+        self.visited_nodes = set()
+        self.final_path = []
+        self.state = 'READY_TO_RUN'
+        self._draw_all()
+
+    def _replan(self):
+        """
+        Repairs the path after a wall edit and redraws it, with the cells
+        the repair had to expand shown as visited.
+        """
+        path, repaired = self.replanner.solve()
+        self.visited_nodes = repaired
+        self.final_path = self.found_path = path
+        self.path_stats = {'length': len(path), 'visited': len(repaired)}
+        self.solve_result = None
+        self.state = 'FINISHED'
+        self._draw_all()
 
-            pygame.draw.line(self.screen, SOLUTION_PATH_COLOR, start_center, end_center, 4)
-            pygame.display.flip()
-            pygame.time.wait(25) # Delay for smooth animation
+    def _wall_at(self, pos):
+        """
+        Returns the two cells on either side of the wall nearest to the
+        screen position `pos`, or None on the outer border.
+        """
+        x, y = pos
+        size = self.cell_size
+        cell = (x // size, y // size)
+        offset_x, offset_y = x % size, y % size
+        # Distance to each side of the cell, with the step to the cell there.
+        sides = [(offset_y, (0, -1)), (size - offset_y, (0, 1)),
+                 (offset_x, (-1, 0)), (size - offset_x, (1, 0))]
+        _, (dx, dy) = min(sides)
+        other = (cell[0] + dx, cell[1] + dy)
+        if not (0 <= other[0] < self.maze.width and 0 <= other[1] < self.maze.height):
+            return None
+        return cell, other
+
+    def _toggle_wall(self, pos):
+        wall = self._wall_at(pos)
+        if wall is None:
+            return
+        if self.maze.has_wall(*wall):
+            self.maze.open_wall(*wall)
+        else:
+            self.maze.close_wall(*wall)
+        self.maze_layer = self._render_maze_layer()
+        self._replan()
 
     def run(self):
         running = True
         while running:
-            self._draw_all()
+            if self._is_animating():
+                events = pygame.event.get()
+            else:
+                # Nothing animates between events, so sleep until the next one
+                # instead of redrawing an unchanged window.
+                events = [pygame.event.wait()] + pygame.event.get()
 
-            for event in pygame.event.get():
+            for event in events:
                 if event.type == pygame.QUIT:
                     running = False
 
+                if event.type == pygame.MOUSEBUTTONDOWN and self.replanner is not None:
+                    if event.button == 1 and event.pos[0] < self.width and event.pos[1] < self.height:
+                        self._toggle_wall(event.pos)
+                    continue
+
                 if event.type == pygame.MOUSEBUTTONDOWN:
-                    if self.state == 'FINISHED': continue
+                    if self._is_animating(): continue
+                    if self.state == 'FINISHED' and not self.show_heatmap: continue
                     x, y = event.pos
-                    if x < self.width:
+                    if x < self.width and y < self.height:
                         grid_x, grid_y = x // self.cell_size, y // self.cell_size
-                        if event.button == 1: self.start_node = (grid_x, grid_y)
-                        elif event.button == 3: self.end_node = (grid_x, grid_y)
+                        self._set_endpoint(event.button, (grid_x, grid_y))
                         if self.start_node and self.end_node: self.state = 'READY_TO_RUN'
+                        if self.show_heatmap: self._show_field_path()
 
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_t:
-                        self.algorithm = 'A*' if self.algorithm == 'Dijkstra' else 'Dijkstra'
+                        names = list(ANIMATED_SOLVERS)
+                        self.algorithm = names[(names.index(self.algorithm) + 1) % len(names)]
+                        self._refresh_info_panel()
                     
+                    if event.key == pygame.K_e and not self._is_animating():
+                        if self.replanner is not None:
+                            self._stop_editing()
+                        elif self.start_node and self.end_node:
+                            self._start_editing()
+
+                    if event.key == pygame.K_h and not self._is_animating() and self.start_node:
+                        self._toggle_heatmap()
+
                     if event.key == pygame.K_SPACE and self.state == 'READY_TO_RUN':
-                        graph = self.maze.to_graph()
-                        # Run algorithm to get results instantly
-                        if self.algorithm == 'Dijkstra':
-                            final_path_result, visited_nodes_result = dijkstra(graph, self.start_node, self.end_node)
-                        else:
-                            final_path_result, visited_nodes_result = astar(graph, self.start_node, self.end_node)
-                        
-                        self.visited_nodes = visited_nodes_result
-                        self.path_stats = {
-                            'length': len(final_path_result) if final_path_result else 0,
-                            'visited': len(self.visited_nodes)
-                        }
-                        self.state = 'FINISHED'
-
-                        # Redraw visited nodes before starting the path animation
-                        self._draw_all()
-                        for node in self.visited_nodes:
-                            if node != self.start_node and node != self.end_node:
-                                self.highlight_cell(node, VISITED_COLOR)
-                        self.highlight_cell(self.start_node, START_COLOR)
-                        self.highlight_cell(self.end_node, END_COLOR)
-                        pygame.display.flip()
-
-                        # Animate the final path
-                        if final_path_result:
-                            self.draw_path(final_path_result)
+                        self._start_search()
 
                     if event.key == pygame.K_r:
                         self._reset_visualization()
 
-            # --- Continuous Drawing ---
-            for node in self.visited_nodes:
-                if node != self.start_node and node != self.end_node:
-                    self.highlight_cell(node, VISITED_COLOR)
-            
-            # The final path is now drawn via the animation, so this is no longer needed here
+            if self.state == 'SEARCHING':
+                self._step_search()
+            elif self.state == 'DRAWING_PATH':
+                self._step_path()
 
-            self.highlight_cell(self.start_node, START_COLOR)
-            self.highlight_cell(self.end_node, END_COLOR)
-            
-            pygame.display.flip()
+            self._update_display()
+            self.clock.tick(MAX_FPS)
 
         pygame.quit()